@@ -1,20 +1,35 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
-import threading
 import pandas as pd
-import numpy as np
-import yfinance as yf
-from finta import TA
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.dates as mdates
-from stock_util import get_stock_history
+import perf
+from bar_schema import format_bytes
+from bar_store import migrate_csv_cache, STORE_SUFFIX
+from history_cache import fetch_bars, session_date
+from intraday_buffer import IntradayBuffer
+from lru_cache import ByteLRU
+from minute_archive import get_archive
+from pyramid import PyramidCache
+from crosshair import BlitManager
+from chart_view import ChartView, ChartSettings, interval_settings, WINDOWS
+from fetch_scheduler import FetchScheduler
+from fetch_orchestrator import get_orchestrator
+from grid_view import ChartGrid, MAX_VISIBLE_ROWS
+from metadata_cache import MetadataCache, title_fields
+from providers import get_provider
+from screener import cached_tickers, load_panel, screen
 from datetime import datetime, timedelta
 import queue
+import threading
+import time
 import ctypes
+import math
 from pathlib import Path
 import glob
+import shutil
 
 # Enable High DPI Awareness for Windows
 try:
@@ -27,6 +42,36 @@ except Exception:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# HUD refresh period (ms)
+PERF_HUD_INTERVAL = 500
+# Memory for the 1m sessions of recent 1D tickers (~50 KB each)
+INTRADAY_BUFFER_BYTES = 4 << 20
+# Pause between grid tile draws (ms), so input is handled while a grid fills in
+GRID_DRAW_DELAY = 1
+
+
+class TimedCanvas(FigureCanvasTkAgg):
+    """Tk canvas whose full redraws (draw() and the idle draws behind draw_idle()) are timed."""
+
+    def draw(self):
+        with perf.span("canvas.draw"):
+            super().draw()
+
+
+class TileCanvas(TimedCanvas):
+    """Canvas of a grid tile: idle redraws (after a resize) wait while the tile is scrolled out of view."""
+
+    def __init__(self, tile, master):
+        self.tile = tile
+        super().__init__(tile.fig, master=master)
+
+    def draw_idle(self):
+        if not self.tile.visible:
+            self.tile.needs_draw = True
+            return
+        super().draw_idle()
+
+
 class StockChartApp:
     def __init__(self, root):
         self.root = root
@@ -38,6 +83,11 @@ class StockChartApp:
         self.current_ticker = ""
         self.history_df = pd.DataFrame()
         self.data_queue = queue.Queue()
+        # Downloads run on a fixed pool; superseded requests are cancelled or their results dropped
+        self.fetch_scheduler = FetchScheduler(self._download_worker, self._post_result)
+        # Company profile / fundamentals / quote fields, each group with its own TTL
+        self.metadata_cache = MetadataCache(self._fetch_info, Path("cache") / "info")
+        self.company_name = ""
         self.previous_close = 0.0 
         self.current_price = 0.0 # Store metadata price for Title accuracy
 
@@ -48,7 +98,15 @@ class StockChartApp:
         
         self.raw_df = pd.DataFrame()
         self.current_data_interval = "1d"
+        self.loaded_key = None # (ticker, interval) of raw_df
         self.current_resample_rule = None
+        self.bar_pyramids = PyramidCache() # Resampled bars + indicators per (ticker, interval, rule)
+        # 1m session per recent 1D ticker, extended by each refresh (or revisit)
+        self.intraday_buffers = ByteLRU(INTRADAY_BUFFER_BYTES, sizeof=IntradayBuffer.nbytes)
+        # One load at a time per (ticker, interval): the chart's scheduler and the grid's pool
+        # can ask for the same series, and the second load then reuses what the first cached
+        self._load_locks = {}
+        self._load_locks_lock = threading.Lock()
         
         # Indicator Vars
         self.show_ma5 = tk.BooleanVar(value=True)
@@ -74,12 +132,24 @@ class StockChartApp:
         self.panel_x = None
         self.panel_y = None
         
-        # Crosshair refs
-        
-        # Crosshair refs
-        self.crosshair_lines = {}
-        self.crosshair_texts = {}
+        # Crosshair state (the lines and labels themselves belong to the chart view)
         self.is_dragging = False # Track mouse button state
+        
+        # Retained chart state (artists are built once per layout by the chart view)
+        self._chart_key = None
+        self._data_version = 0
+
+        # Grid of small charts (several tickers typed at once)
+        self.show_grid = tk.BooleanVar(value=False)
+        self._grid_draw_scheduled = False
+
+        # Screener window (filters over every cached daily series)
+        self.screener_window = None
+        self.screen_filter_var = tk.StringVar(value="RSI < 30")
+
+        # Pipeline timings (F12): recording starts with the HUD unless CHART_PERF already did
+        self.perf_hud_shown = False
+        self._perf_started_by_hud = False
 
         # Setup UI
         self._setup_ui()
@@ -87,6 +157,10 @@ class StockChartApp:
         # Handle Closure
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         self.root.bind("<Destroy>", self.on_destroy)
+        self.root.bind("<F12>", self.toggle_perf_hud)
+        
+        # One-time conversion of legacy CSV cache files to the columnar store
+        migrate_csv_cache(Path("csv"), Path("cache"), remove=True)
         
         # Auto-start with SPY
         self.ticker_entry.insert(0, "SPY")
@@ -100,39 +174,47 @@ class StockChartApp:
         self._cleanup_old_cache()
 
     def _cleanup_old_cache(self):
-        """Removes CSV files in the cache directory older than 7 days."""
+        """Removes bar store entries in the cache directory older than 7 days."""
         try:
-             csv_dir = Path("csv")
-             if not csv_dir.exists():
+             cache_dir = Path("cache")
+             if not cache_dir.exists():
                  return
                  
              now = datetime.now()
              cutoff = now - timedelta(days=7)
              
              count = 0
-             for csv_file in csv_dir.glob("*.csv"):
+             for entry in cache_dir.glob(f"*{STORE_SUFFIX}"):
                  try:
-                     mtime = datetime.fromtimestamp(csv_file.stat().st_mtime)
+                     mtime = datetime.fromtimestamp(entry.stat().st_mtime)
                      if mtime < cutoff:
-                         csv_file.unlink()
+                         shutil.rmtree(entry)
                          count += 1
                  except Exception as e:
-                     logger.warning(f"Failed to delete old cache file {csv_file}: {e}")
+                     logger.warning(f"Failed to delete old cache entry {entry}: {e}")
                      
              if count > 0:
-                 logger.info(f"Cleaned up {count} old cache files.")
+                 logger.info(f"Cleaned up {count} old cache entries.")
         except Exception as e:
              logger.error(f"Error during cache cleanup: {e}")
 
     def fetch_data(self, event=None, interval=None, silent=False):
-        ticker = self.ticker_entry.get().upper().strip()
-        if not ticker:
+        tickers = self.ticker_entry.get().upper().replace(",", " ").split()
+        if not tickers:
             return
+        if len(tickers) > 1:
+            # Several tickers: small multiples, each tile loaded on the grid's pool
+            self._show_grid(tickers)
+            return
+        ticker = tickers[0]
+        if self.show_grid.get():
+            self.show_grid.set(False)
+            self.toggle_grid()
         
         # Handle Event object (from bind) or missing arg
         if interval is None or hasattr(interval, 'widget'):
              window = self.time_window_var.get()
-             interval, rule = self._get_interval_settings(window)
+             interval, rule = interval_settings(window)
              self.current_resample_rule = rule
         
         self.current_ticker = ticker
@@ -146,33 +228,81 @@ class StockChartApp:
             self.ticker_entry.config(state="disabled")
             self.root.update_idletasks() # Force UI update
         
-        # Start background thread
-        threading.Thread(target=self._download_worker, args=(ticker, interval), daemon=True).start()
+        # Queue on the fetch pool (identical in-flight requests are shared)
+        self.fetch_scheduler.submit(ticker, interval)
+        # Expired metadata fields are refreshed off the bar path. An expired quote alone
+        # is not worth a provider call: the title falls back to the chart's last bar
+        self.metadata_cache.refresh_async(ticker, self._post_info, ignore={'price'})
+
+    def _fetch_info(self, ticker):
+        # Full info for sidebar (runs on the metadata cache's thread)
+        return get_provider().info(ticker)
+
+    def _post_info(self, ticker, info):
+        self.data_queue.put(('info', (ticker, info), None))
+
+    def _apply_info(self, ticker, info, redraw=True):
+        if ticker != self.current_ticker:
+            return # Metadata of a ticker no longer shown
+        old = (self.company_name, self.previous_close, self.current_price)
+        self.stock_info = info or {}
+        self.company_name, self.previous_close, self.current_price = title_fields(ticker, self.stock_info)
+        self.update_info_panel()
+        self.root.title(f"DIY - Interactive Stock Chart - {self.company_name} ({ticker})")
+        
+        # The chart title shows the name (and on 1D the quote change): rebuild only if those moved
+        if redraw and not self.history_df.empty and old != (self.company_name, self.previous_close, self.current_price):
+            self._chart_key = None
+            self.update_chart()
+
+    def _post_result(self, generation, message):
+        # Called on a worker thread: hand the result to the Tk thread
+        msg_type, content = message
+        self.data_queue.put((msg_type, content, generation))
+
+    def _unlock_ui(self):
+        self.root.config(cursor="")
+        self.go_btn.config(state="normal")
+        self.ticker_entry.config(state="normal")
 
     def _process_queue(self):
         try:
             while True:
-                msg_type, content = self.data_queue.get_nowait()
+                msg_type, content, generation = self.data_queue.get_nowait()
+                if msg_type == 'info':
+                    # Metadata refreshed in the background: fill in panel and title
+                    self._apply_info(*content)
+                    continue
+                if msg_type == 'screen':
+                    self._show_screen_results(*content)
+                    continue
+                if not self.fetch_scheduler.is_current(generation):
+                    # A newer request was made after this one: never let it overwrite newer data
+                    logger.debug(f"Dropped superseded {msg_type} result (generation {generation})")
+                    continue
+                
                 # Restore UI state
-                self.root.config(cursor="")
-                self.go_btn.config(state="normal")
-                self.ticker_entry.config(state="normal")
+                self._unlock_ui()
                 
                 if msg_type == 'data':
-                    df, company_name, interval, prev_close, curr_price, info_dict = content
+                    df, interval, first_changed = content
                     if df is not None and not df.empty:
+                        # Bars added to the series on screen (1D refresh): update the chart in place
+                        in_place = first_changed > 0 and self.loaded_key == (self.current_ticker, interval)
                         self.raw_df = df
                         self.current_data_interval = interval
-                        self.company_name = company_name
-                        self.previous_close = prev_close
-                        self.current_price = curr_price
-                        self.stock_info = info_dict or {}
-                        self.update_info_panel()
+                        self.loaded_key = (self.current_ticker, interval)
+                        self.bar_pyramids.store(self.current_ticker, interval, df)
                         
-                        self.root.title(f"DIY - Interactive Stock Chart - {company_name} ({self.current_ticker})")
+                        # Whatever metadata is still valid in the cache; the rest arrives as 'info'
+                        self._apply_info(self.current_ticker, self.metadata_cache.get(self.current_ticker), redraw=False)
                         
-                        # Initial Process based on current window
-                        self._apply_resampling()
+                        if in_place:
+                            self._apply_tail(first_changed)
+                        else:
+                            # Initial Process based on current window
+                            self._apply_resampling()
+                            self._log_memory()
                     else:
                         messagebox.showwarning("No Data", f"No data found for {self.current_ticker}")
                         self.root.title("DIY - Interactive Stock Chart")
@@ -182,11 +312,17 @@ class StockChartApp:
         except queue.Empty:
             pass
         finally:
+            # Finished grid loads are applied here too, then drawn tile by tile
+            if self.grid.poll():
+                self._schedule_grid_draw()
             self.root.after(100, self._process_queue)
 
     def _auto_refresh_loop(self):
         # Refresh only if enabled, ticker exists, and strictly in 1D view (1m interval)
-        if self.auto_refresh.get() and self.current_ticker:
+        if self.auto_refresh.get() and self.show_grid.get():
+             # Only 1D tiles on screen; hidden ones reload when scrolled back into view
+             self.grid.refresh()
+        elif self.auto_refresh.get() and self.current_ticker:
              try:
                  if self.time_window_var.get() == "1D":
                     logger.info(f"Auto-refreshing {self.current_ticker}...")
@@ -199,6 +335,10 @@ class StockChartApp:
 
     def on_closing(self):
         try:
+            self.fetch_scheduler.shutdown()
+            self.grid.shutdown()
+            self.metadata_cache.shutdown()
+            perf.disable() # Closes the CHART_PERF_LOG file
             self.root.quit()
             self.root.destroy()
         except:
@@ -214,222 +354,101 @@ class StockChartApp:
                 sys.exit(0)
             except: pass
 
+    def _load_bars(self, ticker, interval):
+        """Bars of (ticker, interval) and the first row that changed since the last load (worker threads)."""
+        with self._load_locks_lock:
+            lock = self._load_locks.setdefault((ticker, interval), threading.Lock())
+        with lock:
+            if interval == '1m':
+                # The session buffer downloads only the minutes since its last bar
+                buffer = self.intraday_buffers.get(ticker)
+                if buffer is None:
+                    buffer = IntradayBuffer(ticker, interval, archive=get_archive())
+                    self.intraday_buffers.put(ticker, buffer)
+                return buffer.refresh()
+
+            # A recently shown series that is still current is served from memory;
+            # other intervals refresh the cached series incrementally
+            df = self.bar_pyramids.current_bars(ticker, interval, session_date())
+            if df is None:
+                df = fetch_bars(ticker, interval, Path("cache"))
+            return df, 0
+
+    @perf.timed("download")
     def _download_worker(self, ticker, interval):
         try:
-            # Check for cached data (Skip for 1m interval)
-            csv_dir = Path("csv")
-            csv_dir.mkdir(exist_ok=True)
-            
-            # Weekend Logic: Snap to Friday if Sat/Sun to avoid redownloading
-            now = datetime.now()
-            if now.weekday() == 5: # Saturday
-                now -= timedelta(days=1)
-            elif now.weekday() == 6: # Sunday
-                now -= timedelta(days=2)
-            today_str = now.strftime('%Y-%m-%d')
-            
-            cache_file = csv_dir / f"{ticker}_{interval}_{today_str}.csv"
-            
-            df = None
-            
-            # BYPASS CACHE for 1m interval (Day Chart)
-            if interval != '1m':
-                if cache_file.exists():
-                    try:
-                        df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-                        # Normalize columns to lowercase immediately
-                        df.columns = df.columns.str.lower()
-                        
-                        # Enforce data types to prevent "Blank Screen" or "Range" issues
-                        df.index = pd.to_datetime(df.index, utc=True)
-                        try:
-                            df.index = df.index.tz_convert('US/Eastern')
-                        except:
-                            pass
-                        for col in ['open', 'high', 'low', 'close', 'volume']:
-                            if col in df.columns:
-                                df[col] = pd.to_numeric(df[col], errors='coerce')
-                        df = df.dropna()
-                        logger.info(f"Loaded {ticker} from cache.")
-                    except Exception as e:
-                        logger.warning(f"Failed to load cache for {ticker}: {e}")
-                        df = None # Force redownload
-            
-            if df is None:
-                # Download max history depending on interval
-                if interval == '1m':
-                     # 1m data: Get full 1 day (Intraday)
-                     import yfinance as yf
-                     # Use auto_adjust=False to get RAW price (matches IBKR/Screen)
-                     df = yf.Ticker(ticker).history(period="1d", interval="1m", auto_adjust=False)
-                else:
-                    start_date = "2000-01-01"
-                    if interval == '1h':
-                         # 1h data limit ~730 days
-                         start_date = (datetime.today() - timedelta(days=729)).strftime('%Y-%m-%d')
-                    elif interval in ['2m', '5m', '15m', '30m', '90m']:
-                         # Intraday limits ~60 days
-                         start_date = (datetime.today() - timedelta(days=59)).strftime('%Y-%m-%d')
-                    
-                    df = get_stock_history(ticker, start=start_date, end=today_str, interval=interval)
-                
-                if df is not None and not df.empty:
-                    df.columns = df.columns.str.lower()
-                    # Ensure Index is Datetime and Convert to Eastern
-                    df.index = pd.to_datetime(df.index, utc=True)
-                    try:
-                        df.index = df.index.tz_convert('US/Eastern')
-                    except:
-                        pass
-                
-                # Cache it (Skip for 1m)
-                if df is not None and not df.empty and interval != '1m':
-                     df.to_csv(cache_file)
-                     # Cleanup old files
-                     for f in csv_dir.glob(f"{ticker}_{interval}_*.csv"):
-                        if f != cache_file:
-                            try:
-                                f.unlink()
-                            except: pass
-                        
-            # Try to fetch Company Name, Metadata, etc
-            company_name = ticker
-            prev_close = 0.0
-            curr_price = 0.0
-            info_dict = {}
-            try:
-                import yfinance as yf
-                t = yf.Ticker(ticker)
-                # Fetch FULL info for sidebar
-                info_dict = t.info
-                company_name = info_dict.get('shortName', info_dict.get('longName', ticker))
-                prev_close = info_dict.get('previousClose', 0.0)
-                curr_price = info_dict.get('currentPrice') or info_dict.get('regularMarketPrice') or 0.0
-            except Exception as e:
-                logger.warning(f"Failed to fetch metadata: {e}")
-
-            # Put in queue
+            df, first_changed = self._load_bars(ticker, interval)
+
+            # Metadata (company name, sidebar info) is fetched separately by the
+            # metadata cache, so bars are posted without waiting for it
+            # Returned to the scheduler, which posts it to the queue with its generation
             if df is None or df.empty:
-                 self.data_queue.put(('error', f"No data found for {ticker}"))
-            else:
-                 self.data_queue.put(('data', (df, company_name, interval, prev_close, curr_price, info_dict)))
+                 return ('error', f"No data found for {ticker}")
+            return ('data', (df, interval, first_changed))
                  
         except Exception as e:
             logger.error(f"Download thread error: {e}")
-            self.data_queue.put(('error', str(e)))
-
-    def _get_interval_settings(self, window):
-        target_interval = "1d"
-        resample_rule = None
-        
-        if window == "10Y":
-             target_interval = "1d"
-             resample_rule = "1ME"
-        elif window == "5Y":
-             target_interval = "1d"
-             resample_rule = "1W"
-        elif window == "3Y":
-             target_interval = "1d"
-             resample_rule = "3D"
-        elif window == "2Y":
-            target_interval = "1d"
-            resample_rule = "2D"
-        elif window == "1WK":
-            # Fetch 5m data, but Resample to 10m as requested
-            target_interval = "5m"
-            resample_rule = "10min"
-        elif window == "YTD":
-            # Dynamic interval for YTD
-            today = datetime.now()
-            start_year = datetime(today.year, 1, 1)
-            days = (today - start_year).days
-            # Less than ~3 months (90 days) -> Hourly, else Daily
-            if days <= 90:
-                 target_interval = "1h"
-            else:
-                 target_interval = "1d"
-        elif window == "1D":
-             target_interval = "1m"
-        elif window == "1Y" or window == "6M":
-            target_interval = "1d"
-        elif window == "3M" or window == "1M" or window == "1WK":
-            target_interval = "1h"
-            
-        return target_interval, resample_rule
+            return ('error', str(e))
 
     def on_window_change(self):
         window = self.time_window_var.get()
-        target_interval, resample_rule = self._get_interval_settings(window)
+        if self.show_grid.get():
+            # Every tile follows the window buttons (right-click a tile for its own)
+            self.grid.set_window(window)
+            return
+        target_interval, resample_rule = interval_settings(window)
             
         self.current_resample_rule = resample_rule
         
-        # If interval change needed, re-fetch
-        if target_interval != self.current_data_interval:
+        # If the loaded series does not match (new interval, or a ticker still loading), re-fetch
+        if (self.current_ticker, target_interval) != self.loaded_key:
             self.fetch_data(interval=target_interval)
         else:
+            # A download for a previously clicked window may still be running: drop it
+            self.fetch_scheduler.invalidate()
+            self._unlock_ui()
             # Just re-process (resample if needed)
             self._apply_resampling()
             
+    @perf.timed("apply_resampling")
     def _apply_resampling(self):
         if self.raw_df.empty: return
         
-        df = self.raw_df.copy()
+        # Each resample level (with indicators) is built once per fetch and then
+        # looked up, so window switches on the same interval skip the regrouping
+        df = self.bar_pyramids.get(self.current_ticker, self.current_data_interval, self.current_resample_rule)
+        if df is None:
+            pyramid = self.bar_pyramids.store(self.current_ticker, self.current_data_interval, self.raw_df)
+            df = pyramid.level(self.current_resample_rule)
         
-        if self.current_resample_rule and self.current_resample_rule.endswith("D"):
-            # Custom Integer-based Resampling (Trading Days)
-            # This ensures consistent bar counts (every 2 or 3 trading days) ignoring weekends
-            try:
-                n_days = int(self.current_resample_rule[:-1])
-                
-                # Assign grouping ID based on integer position
-                # Reset index to treat Date as data
-                df.index.name = 'Date_Index'
-                df = df.reset_index()
-                
-                # Create group ID
-                df['group_id'] = df.index // n_days
-                
-                # Define aggregation
-                # Define aggregation
-                logic = {
-                    'Date_Index': 'last', # Timestamp of the closed bar
-                    'period_start': 'first', # Start of the bar
-                    'open': 'first',
-                    'high': 'max',
-                    'low': 'min',
-                    'close': 'last',
-                    'volume': 'sum'
-                }
-                
-                # Filter for existing columns (we added period_start by copying Date_Index)
-                df['period_start'] = df['Date_Index']
-                
-                agg_dict = {k: v for k, v in logic.items() if k in df.columns}
-                
-                # Aggregate
-                df = df.groupby('group_id').agg(agg_dict)
-                
-                # Restore Index
-                df = df.set_index('Date_Index')
-                df.index.name = 'Date'
-                
-            except ValueError:
-                pass # Fallback if rule parsing fails
-                
-        elif self.current_resample_rule:
-            # Standard Time-based resampling fallback
-            logic = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
-            cols = {k: v for k, v in logic.items() if k in df.columns}
-            if cols:
-                df = df.resample(self.current_resample_rule).agg(cols).dropna()
-        
-        self.history_df = df
-        self._calculate_indicators(self.history_df)
+        if df is not self.history_df:
+            self.history_df = df
+            self._data_version += 1
         self.update_chart()
 
         
         # Initial Toggle State
         self.toggle_info_panel()
+
+    @perf.timed("apply_tail")
+    def _apply_tail(self, first_changed):
+        # Bars from first_changed on were revised or appended (1D auto-refresh):
+        # indicators step through just those bars, and a 1D chart on screen is
+        # updated in place instead of rebuilt
+        if first_changed >= len(self.raw_df):
+            return # Nothing new since the last refresh
+        settings = self._chart_settings()
+        drawn = self._chart_key is not None and self._chart_key == self._layout_key(settings)
+        df = self.bar_pyramids.get(self.current_ticker, self.current_data_interval, self.current_resample_rule)
+        self.history_df = df
+        self._data_version += 1
+        if not drawn or not self.chart_view.update_tail(
+                df, settings, first_changed, raw_df=self.raw_df, company=self.company_name or self.current_ticker,
+                previous_close=self.previous_close, current_price=self.current_price):
+            self._build_chart(settings)
+            return
+        self._chart_key = self._layout_key(settings)
+        self.canvas.draw_idle()
         
     def _apply_panel_position(self):
         if not self.show_info.get():
@@ -466,6 +485,212 @@ class StockChartApp:
         )
         self.info_frame.lift()
 
+    def _show_grid(self, tickers):
+        for tile in self.grid.set_tickers(tickers, self.time_window_var.get()):
+            tile.canvas.get_tk_widget().destroy() # Tickers no longer in the grid
+        self.show_grid.set(True)
+        self.toggle_grid()
+        logger.info(f"Grid of {len(self.grid.tiles)} tickers: {self.grid.summary()}")
+
+    def toggle_grid(self):
+        if self.show_grid.get() and self.grid.tiles:
+            self.chart_frame.pack_forget()
+            self.grid_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+            self.root.title(f"DIY - Interactive Stock Chart - {len(self.grid.tiles)} tickers")
+            self.root.update_idletasks() # The viewport needs its size before tiles are laid out
+            self._layout_grid()
+        else:
+            self.show_grid.set(False)
+            self.grid_frame.pack_forget()
+            self.chart_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+            self.grid.set_visible([])
+            if self.current_ticker:
+                self.root.title(f"DIY - Interactive Stock Chart - {self.company_name or self.current_ticker} ({self.current_ticker})")
+            # Indicator toggles made while the grid was shown
+            self.update_chart()
+
+    def _make_tile_canvas(self, tile):
+        canvas = TileCanvas(tile, master=self.grid_inner)
+        widget = canvas.get_tk_widget()
+        widget.bind("<Double-Button-1>", lambda e: self._open_tile(tile))
+        widget.bind("<Button-3>", lambda e: self._tile_menu(e, tile))
+        widget.bind("<MouseWheel>", lambda e: self.grid_viewport.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        return canvas
+
+    def _layout_grid(self, event=None):
+        if not self.show_grid.get():
+            return
+        rows, cols = self.grid.shape
+        if not cols:
+            return
+        # Up to MAX_VISIBLE_ROWS rows share the height; more scroll
+        tile_w = max(1, self.grid_viewport.winfo_width() // cols)
+        tile_h = max(1, self.grid_viewport.winfo_height() // min(rows, MAX_VISIBLE_ROWS))
+        for i, tile in enumerate(self.grid.tiles):
+            widget = tile.canvas.get_tk_widget()
+            widget.config(width=tile_w, height=tile_h)
+            widget.grid(row=i // cols, column=i % cols)
+        self.grid_viewport.itemconfigure(self._grid_window, width=tile_w * cols, height=tile_h * rows)
+        self.grid_viewport.config(scrollregion=(0, 0, tile_w * cols, tile_h * rows), yscrollincrement=tile_h)
+        self._update_grid_visibility()
+
+    def _on_grid_scroll(self, first, last):
+        self.grid_scrollbar.set(first, last)
+        self._update_grid_visibility()
+
+    def _update_grid_visibility(self):
+        if not self.show_grid.get():
+            return
+        rows, cols = self.grid.shape
+        top, bottom = self.grid_viewport.yview()
+        first_row, last_row = int(top * rows), math.ceil(bottom * rows)
+        self.grid.set_visible([tile for i, tile in enumerate(self.grid.tiles) if first_row <= i // cols < last_row])
+        self._schedule_grid_draw()
+
+    def _schedule_grid_draw(self):
+        if not self._grid_draw_scheduled:
+            self._grid_draw_scheduled = True
+            self.root.after(GRID_DRAW_DELAY, self._draw_grid_step)
+
+    def _draw_grid_step(self):
+        # One tile per event-loop turn, so scrolling and clicks are handled while the grid fills in
+        self._grid_draw_scheduled = False
+        if self.show_grid.get() and self.grid.draw_next(self._chart_settings()):
+            self._schedule_grid_draw()
+
+    def _open_tile(self, tile):
+        # Double-click: the tile's ticker and window in the main chart (bars come from memory)
+        self.time_window_var.set(tile.window)
+        self.ticker_entry.delete(0, tk.END)
+        self.ticker_entry.insert(0, tile.ticker)
+        self.fetch_data()
+
+    def _tile_menu(self, event, tile):
+        menu = tk.Menu(self.root, tearoff=0)
+        for window in WINDOWS:
+            menu.add_command(label=window, command=lambda w=window: self.grid.set_window(w, [tile]))
+        menu.add_separator()
+        menu.add_command(label="Open in Chart", command=lambda: self._open_tile(tile))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def open_screener(self):
+        if self.screener_window is not None and self.screener_window.winfo_exists():
+            self.screener_window.lift()
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Screener")
+        win.geometry("640x480")
+        self.screener_window = win
+
+        top = ttk.Frame(win, padding="5")
+        top.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(top, text="Filter:").pack(side=tk.LEFT, padx=5)
+        entry = ttk.Entry(top, textvariable=self.screen_filter_var)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        entry.bind('<Return>', self.run_screener)
+        self.screen_btn = ttk.Button(top, text="Run", command=self.run_screener)
+        self.screen_btn.pack(side=tk.LEFT, padx=5)
+
+        self.screen_status = ttk.Label(win, padding="5",
+                                       text='e.g. "close crosses above MA50", "RSI < 30 and close > MA200"')
+        self.screen_status.pack(side=tk.TOP, fill=tk.X)
+
+        table = ttk.Frame(win)
+        table.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        columns = [("ticker", "Ticker", 80), ("score", "Score", 70), ("close", "Close", 80),
+                   ("change", "Chg %", 70), ("rsi", "RSI", 60), ("bb_pos", "BB Pos", 70)]
+        self.screen_tree = ttk.Treeview(table, columns=[c[0] for c in columns], show="headings")
+        for col, title, width in columns:
+            self.screen_tree.heading(col, text=title)
+            self.screen_tree.column(col, width=width, anchor=tk.W if col == "ticker" else tk.E)
+        scrollbar = ttk.Scrollbar(table, orient=tk.VERTICAL, command=self.screen_tree.yview)
+        self.screen_tree.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.screen_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Double-click (or Enter): the ticker in the main chart
+        self.screen_tree.bind("<Double-1>", self._open_screen_result)
+        self.screen_tree.bind("<Return>", self._open_screen_result)
+        entry.focus_set()
+
+    def run_screener(self, event=None):
+        expression = self.screen_filter_var.get().strip()
+        if not expression:
+            return
+        self.screen_btn.config(state="disabled")
+        self.screen_status.config(text="Screening...")
+        threading.Thread(target=self._screen_worker, args=(expression,), daemon=True).start()
+
+    def _screen_worker(self, expression):
+        # Off the Tk thread: the store reads and indicator pass take a fraction of a second per 500 tickers
+        t0 = time.perf_counter()
+        try:
+            panel = load_panel(cached_tickers(Path("cache")), cache_dir=Path("cache"))
+            results = screen(panel, expression)
+            status = (f"{len(results)} matches among {int(panel.current.sum())} cached daily series "
+                      f"in {time.perf_counter() - t0:.2f}s")
+        except ValueError as e:
+            results, status = [], str(e)
+        except Exception as e:
+            logger.error(f"Screener failed: {e}")
+            results, status = [], f"Screener failed: {e}"
+        self.data_queue.put(('screen', (results, status), None))
+
+    def _show_screen_results(self, results, status):
+        if self.screener_window is None or not self.screener_window.winfo_exists():
+            return # Closed while screening
+        self.screen_btn.config(state="normal")
+        self.screen_status.config(text=status)
+        self.screen_tree.delete(*self.screen_tree.get_children())
+        for r in results:
+            self.screen_tree.insert("", tk.END, iid=r.ticker, values=(
+                r.ticker, f"{r.score:.3f}", f"{r.close:.2f}", f"{r.change:+.2f}", f"{r.rsi:.1f}", f"{r.bb_pos:.2f}"))
+
+    def _open_screen_result(self, event=None):
+        ticker = self.screen_tree.focus()
+        if not ticker:
+            return
+        self.ticker_entry.config(state="normal")
+        self.ticker_entry.delete(0, tk.END)
+        self.ticker_entry.insert(0, ticker)
+        self.fetch_data()
+
+    def toggle_perf_hud(self, event=None):
+        self.perf_hud_shown = not self.perf_hud_shown
+        if self.perf_hud_shown:
+            self._perf_started_by_hud = perf.get_recorder() is None
+            perf.enable()
+            self.perf_hud.place(relx=1.0, rely=0.0, x=-10, y=40, anchor="ne")
+            self.perf_hud.lift()
+            self._update_perf_hud()
+        else:
+            self.perf_hud.place_forget()
+            if self._perf_started_by_hud:
+                perf.disable()
+
+    def _memory_summary(self):
+        usage = self.bar_pyramids.memory_usage()
+        current = usage.get(self.loaded_key, 0)
+        return f"{format_bytes(current)} for {' '.join(self.loaded_key or ())}; {format_bytes(sum(usage.values()))} in {len(usage)} series"
+
+    def _log_memory(self):
+        logger.info(f"Bars in memory: {self._memory_summary()} (cache: {self.bar_pyramids.summary()})")
+
+    def _update_perf_hud(self):
+        if not self.perf_hud_shown:
+            return
+        recorder = perf.get_recorder()
+        if recorder is not None:
+            lines = [f"{recorder.fps():5.1f} redraws/s", f"{'stage':<22}{'last':>8}{'mean':>8}{'max':>8}{'n':>5}"]
+            for t in recorder.summary():
+                lines.append(f"{t.name:<22}{t.last_ms:>8.1f}{t.mean_ms:>8.1f}{t.max_ms:>8.1f}{t.count:>5}")
+            lines.append(f"memory: {self._memory_summary()}")
+            lines.append(f"cache: {self.bar_pyramids.summary()}")
+            lines.append(f"fetch: {get_orchestrator().summary()}")
+            if self.grid.tiles:
+                lines.append(f"grid: {self.grid.summary()}")
+            self.perf_hud.config(text="\n".join(lines))
+        self.root.after(PERF_HUD_INTERVAL, self._update_perf_hud)
+
     def toggle_info_panel(self, event=None):
         if self.show_info.get():
              self._apply_panel_position()
@@ -732,13 +957,14 @@ class StockChartApp:
         self.ticker_entry.bind('<Return>', self.fetch_data)
         self.go_btn = ttk.Button(control_frame, text="Go", command=self.fetch_data)
         self.go_btn.pack(side=tk.LEFT, padx=5)
+        # Typing several tickers ("SPY, QQQ, AAPL") opens the grid; this switches back and forth
+        ttk.Checkbutton(control_frame, text="Grid", variable=self.show_grid, command=self.toggle_grid).pack(side=tk.LEFT, padx=5)
         
         # Time Window Buttons
         ttk.Label(control_frame, text="| Time:").pack(side=tk.LEFT, padx=10)
         time_frame = ttk.Frame(control_frame)
         time_frame.pack(side=tk.LEFT, padx=5)
-        windows = ["10Y", "5Y", "3Y", "2Y", "1Y", "YTD", "6M", "3M", "1M", "1WK", "1D"]
-        for w in windows:
+        for w in WINDOWS:
             # Use Toolbutton for "Active" look
             btn = ttk.Radiobutton(time_frame, text=w, variable=self.time_window_var, value=w, command=self.on_window_change, style='Toolbutton')
             btn.pack(side=tk.LEFT, padx=0)
@@ -784,12 +1010,13 @@ class StockChartApp:
         vp_pos_cb.bind("<<ComboboxSelected>>", lambda e: self.update_chart())
         
         ttk.Label(indicator_frame, text="Res:").pack(side=tk.LEFT, padx=2)
-        vp_mode_cb = ttk.Combobox(indicator_frame, textvariable=self.vp_mode_var, values=["100 Bins", "200 Bins", "400 Bins"], width=10, state="readonly")
+        vp_mode_cb = ttk.Combobox(indicator_frame, textvariable=self.vp_mode_var, values=["100 Bins", "200 Bins", "400 Bins", "1000 Bins", "2000 Bins"], width=10, state="readonly")
         vp_mode_cb.pack(side=tk.LEFT)
         vp_mode_cb.bind("<<ComboboxSelected>>", lambda e: self.update_chart())
         
         # Info Toggle (Checkbox)
         ttk.Checkbutton(indicator_frame, text="Show Info", variable=self.show_info, command=self.toggle_info_panel).pack(side=tk.RIGHT, padx=10)
+        ttk.Button(indicator_frame, text="Screener", command=self.open_screener).pack(side=tk.RIGHT, padx=5)
         # Chart Area (Standard Pack)
         self.chart_frame = ttk.Frame(self.root)
         self.chart_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
@@ -824,9 +1051,13 @@ class StockChartApp:
             self.info_frame.place(relx=0.5, rely=0.5, anchor="center", relwidth=0.8, relheight=0.8)
         
         self.fig = plt.figure(figsize=(10, 8))
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
+        self.canvas = TimedCanvas(self.fig, master=self.chart_frame)
+        self.chart_view = ChartView(self.fig)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         
+        # Crosshair is blitted over a cached background instead of redrawing the chart
+        self.crosshair_blitter = BlitManager(self.canvas)
+        
         # Bind Mouse Events for Crosshair
         self.canvas.mpl_connect('motion_notify_event', self._on_mouse_move)
         self.canvas.mpl_connect('button_press_event', self._on_mouse_down)
@@ -836,379 +1067,87 @@ class StockChartApp:
         toolbar = NavigationToolbar2Tk(self.canvas, self.chart_frame)
         toolbar.update()
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        
+        # Performance HUD (F12): a Tk label over the canvas, so showing it never redraws the chart
+        self.perf_hud = tk.Label(self.chart_frame, font=('Consolas', 8), justify=tk.LEFT, anchor="nw",
+                                 bg="#202020", fg="#7CFC00", padx=6, pady=4)
 
-    def _filter_data_by_window(self, df, window):
-        end_date = df.index.max()
-        if window == "10Y": start_date = end_date - pd.DateOffset(years=10)
-        elif window == "5Y": start_date = end_date - pd.DateOffset(years=5)
-        elif window == "3Y": start_date = end_date - pd.DateOffset(years=3)
-        elif window == "2Y": start_date = end_date - pd.DateOffset(years=2)
-        elif window == "1Y": start_date = end_date - pd.DateOffset(years=1)
-        elif window == "YTD": 
-            start_date = pd.Timestamp(year=end_date.year, month=1, day=1)
-            if end_date.tz is not None:
-                start_date = start_date.tz_localize(end_date.tz)
-        elif window == "6M": start_date = end_date - pd.DateOffset(months=6)
-        elif window == "3M": start_date = end_date - pd.DateOffset(months=3)
-        elif window == "1M": start_date = end_date - pd.DateOffset(months=1)
-        elif window == "1WK": start_date = end_date - pd.DateOffset(weeks=1)
-        elif window == "1D":
-             # Should be caught by 1m logic, but ensure we don't filter out everything
-             # 1D loads only current day, so filtering is just checking start of day?
-             # Actually if we loaded 1d period, just show all.
-             start_date = df.index.min()
-        else: start_date = df.index.min()
-        
-        # FIX: return copy to avoid SettingWithCopyWarning
-        return df[df.index >= pd.Timestamp(start_date)].copy()
-
-    def _setup_date_axis(self, ax, df, window):
-        major_indices = []
-        major_labels = []
-        minor_indices = []
-        minor_labels = []
-        
-        dates = df.index
-        years = dates.year
-        months = dates.month
-        days = dates.day
-        
-        # Define Modes
-        is_long_term = window in ["10Y", "5Y", "3Y", "2Y"]
-        is_hourly = (self.current_data_interval == '1h') or (window == "1WK")
-        
-        prev_year = -1
-        prev_month = -1
-        prev_day = -1
-        prev_hour = -1
-        
-        for i, (date, y, m, d) in enumerate(zip(dates, years, months, days)):
-            
-            # --- 1D MODE (Minute Data) ---
-            if window == "1D":
-                # Show Hours
-                curr_hour = date.hour
-                if curr_hour != prev_hour:
-                     major_indices.append(i)
-                     major_labels.append(date.strftime("%H:%M"))
-                     prev_hour = curr_hour
-                continue
-
-            # --- HOURLY MODE (Day Grid) ---
-            if is_hourly:
-                if d != prev_day:
-                    major_indices.append(i)
-                    # Label Logic
-                    if window == "3M":
-                        # Sparse Labels: Month Name on change, else Day Num on Mondays
-                        if m != prev_month:
-                            major_labels.append(date.strftime("%b %d"))
-                        elif date.weekday() == 0: # Monday
-                            major_labels.append(f"{d}")
-                        else:
-                            major_labels.append("") # Grid line only
-                    elif window in ["1M", "YTD"]:
-                        # Month + Day
-                        if m != prev_month:
-                            major_labels.append(date.strftime("%b %d"))
-                        else:
-                             major_labels.append(date.strftime("%d"))
-                    else:
-                        # 1WK: Full Detail
-                        major_labels.append(date.strftime("%a %d"))
-                        
-                    prev_day = d
-                    prev_month = m
-                    prev_year = y
-                continue # Skip standard logic
-            
-            # --- DAILY/LONG TERM MODE ---
-            # Year Change Logic
-            if y != prev_year:
-                if is_long_term:
-                    # Skip the very first index to avoid "previous year creep" at the left edge
-                    if i > 5: 
-                        major_indices.append(i)
-                        major_labels.append(str(y))
-                # For short term, we suppress years
-                prev_year = y
-                
-            # Month Change Logic
-            if m != prev_month:
-                if is_long_term:
-                    # Minor Ticks: 2-Digit Months
-                    if window in ["10Y", "5Y"]: # Show Quarters
-                         if m in [1, 4, 7, 10]:
-                             minor_indices.append(i)
-                             minor_labels.append(f"{m:02d}")
-                    else: # 2Y, 3Y show all months
-                         minor_indices.append(i)
-                         minor_labels.append(f"{m:02d}")
-                else: 
-                    # Short Term (Daily): Major Ticks = Month Names
-                    major_indices.append(i)
-                    major_labels.append(dates[i].strftime('%b'))
-                    
-                prev_month = m
-                
-        # Apply Major Ticks
-        ax.set_xticks(major_indices)
-        ax.set_xticklabels(major_labels, fontsize=self.font_size_var.get(), fontweight='bold')
-        
-        # Apply Minor Ticks
-        if is_long_term:
-            ax.set_xticks(minor_indices, minor=True)
-            ax.set_xticklabels(minor_labels, minor=True, fontsize=self.font_size_var.get()-2)
-            # Ticks styling
-            ax.tick_params(axis='x', which='major', length=15, width=1.5, pad=5) # Years lower
-            ax.tick_params(axis='x', which='minor', length=8, width=1) # Months
-        else:
-             # Short term / Hourly
-             ax.set_xticks([], minor=True)
-             ax.tick_params(axis='x', which='major', length=8, width=1) # Standard
-
-        # Enable Grid for Intraday/Short Term (User Request)
-        if window in ["1D", "1WK", "1M"]:
-            ax.grid(True, linestyle='--', alpha=0.3)
+        # Grid Area (packed instead of the chart area): tile canvases in a scrollable frame
+        self.grid_frame = ttk.Frame(self.root)
+        self.grid_scrollbar = ttk.Scrollbar(self.grid_frame, orient=tk.VERTICAL)
+        self.grid_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.grid_viewport = tk.Canvas(self.grid_frame, highlightthickness=0, yscrollcommand=self._on_grid_scroll)
+        self.grid_viewport.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.grid_scrollbar.config(command=self.grid_viewport.yview)
+        self.grid_inner = ttk.Frame(self.grid_viewport)
+        self._grid_window = self.grid_viewport.create_window(0, 0, window=self.grid_inner, anchor="nw")
+        self.grid_viewport.bind("<Configure>", self._layout_grid)
+        # Tiles share the bar pyramids (and memory cache) of the main chart
+        self.grid = ChartGrid(self._load_bars, self.bar_pyramids, self._make_tile_canvas)
 
+    def _chart_settings(self):
+        """Current GUI state of every chart control."""
+        ma_cols = [
+            (self.show_ma5, 'ma5'), (self.show_ma20, 'ma20'),
+            (self.show_ma50, 'ma50'), (self.show_ma60, 'ma60'),
+            (self.show_ma100, 'ma100'), (self.show_ma120, 'ma120'),
+            (self.show_ma200, 'ma200')
+        ]
+        try:
+             vp_bins = int(self.vp_mode_var.get().split()[0])
+        except:
+             vp_bins = 100 # Default
+        return ChartSettings(
+            window=self.time_window_var.get(),
+            font_size=self.font_size_var.get(),
+            mas=tuple(col for var, col in ma_cols if var.get()),
+            show_bbands=self.show_bbards.get(),
+            show_volume=self.show_volume.get(),
+            show_macd=self.show_macd.get(),
+            show_rsi=self.show_rsi.get(),
+            show_vp=self.show_vp.get(),
+            vp_bins=vp_bins,
+            vp_position=self.vp_position.get(),
+        )
 
+    def _layout_key(self, settings):
+        """Everything that needs a full figure rebuild when it changes."""
+        return (self._data_version,) + settings.layout_key()
 
+    @perf.timed("update_chart")
     def update_chart(self, *args):
+        if self.show_grid.get():
+            # Tiles pick up the indicator toggles (only those on screen are redrawn)
+            self._schedule_grid_draw()
+            return
         if self.history_df.empty:
             return
-            
-        # Update Global Font Size
-        base_font_size = self.font_size_var.get()
-        plt.rcParams.update({'font.size': base_font_size})
+        settings = self._chart_settings()
         
-        # Filter Data
-        df = self._filter_data_by_window(self.history_df, self.time_window_var.get())
-        if df.empty:
+        # Retained Mode: indicator toggles on an unchanged layout only flip artist
+        # visibility (or swap VP data) instead of rebuilding the figure
+        if self._chart_key is not None and self._chart_key == self._layout_key(settings):
+            self.chart_view.refresh(settings)
+            self.canvas.draw_idle()
             return
+        
+        self._build_chart(settings)
 
-        if df.empty:
+    def _build_chart(self, settings):
+        self._chart_key = None
+        
+        # Figure construction lives in ChartView so it also runs headless (render_charts.py)
+        built = self.chart_view.build(self.history_df, settings, self.current_data_interval,
+                                      raw_df=self.raw_df, company=self.company_name or self.current_ticker,
+                                      previous_close=self.previous_close, current_price=self.current_price)
+        if not built:
             return
-
-        # --- 1D Fixed Scale Logic ---
-        if self.time_window_var.get() == "1D":
-             # Force full day index (09:30 - 16:00 ET)
-             try:
-                 # Get the date from data
-                 current_date = df.index.min().date()
-                 
-                 # Construct start/end for this date
-                 start_ts = pd.Timestamp(f"{current_date} 09:30:00").tz_localize("US/Eastern")
-                 end_ts = pd.Timestamp(f"{current_date} 16:00:00").tz_localize("US/Eastern")
-                 
-                 # Create Full Index
-                 full_index = pd.date_range(start=start_ts, end=end_ts, freq="1min")
-                 
-                 # Reindex (Keep existing data, fill rest with NaN)
-                 # This ensures X-axis always spans 09:30 to 16:00
-                 df = df.reindex(full_index)
-             except Exception as e:
-                 print(f"Failed to apply fixed 1D scale: {e}")
-
-        # Prepare Indicators (Calculated globally now)
-        # self._calculate_indicators(df) 
-        
-        # Clear Figure
-        self.fig.clear()
-        self.crosshair_lines = {} # Reset refs
-        self.crosshair_texts = {}
-        
-        # Determine active layouts
-        panels = ['price']
-        if self.show_macd.get(): panels.append('macd')
-        if self.show_rsi.get(): panels.append('rsi')
         
-        num_panels = len(panels)
-        
-        
-        # Dynamic Height Ratios (Fixed Weight: Others=15%, Price=Remainder)
-        num_others = num_panels - 1
-        other_weight = 15
-        price_weight = 100 - (other_weight * num_others)
-        ratios = [price_weight] + [other_weight] * num_others
-        
-        # Calculate Stats (Handle NaNs from Reindexing)
-        company = getattr(self, 'company_name', self.current_ticker)
-        
-        valid_closes = df['close'].dropna()
-        if not valid_closes.empty:
-            start_price = valid_closes.iloc[0]
-            end_price = valid_closes.iloc[-1]
-            
-            # Use Previous Close for 1D Daily Change
-            if self.time_window_var.get() == "1D":
-                if self.previous_close > 0: start_price = self.previous_close
-                if self.current_price > 0: end_price = self.current_price
-        else:
-            start_price = 0.0
-            end_price = 0.0
-            
-        change = end_price - start_price
-        pct_change = (change / start_price) * 100 if start_price != 0 else 0
-        sign = "+" if change >= 0 else ""
-        color = "green" if change >= 0 else "red"
-        
-        # Draw Titles (1-Liner)
-        # Draw Titles (1-Liner)
-        title_text = f"{company} ({self.time_window_var.get()})   {end_price:.2f} {sign}{change:.2f} ({sign}{pct_change:.2f}%)"
-        if self.time_window_var.get() == "1D":
-             title_text += "   (15min Delayed)"
-        self.fig.suptitle(title_text, fontsize=base_font_size+4, fontweight='bold', color=color, y=0.98)
-        
-        # Create GridSpec (Adjust top for title)
-        # Create GridSpec (Adjust top for title)
-        # Increased bottom margin for FHD screens (0.05 -> 0.10)
-        gs = self.fig.add_gridspec(num_panels, 1, height_ratios=ratios, hspace=0.01, 
-                                   left=0.05, right=0.95, top=0.94, bottom=0.08)
-        
-        axes = {}
-        shared_ax = None
-        
-        # Create X-axis index (0, 1, 2...) for Gapless Plotting
-        x_indices = np.arange(len(df))
-        self.current_df_dates = df.index # Store for lookup
-        
-        for i, panel_name in enumerate(panels):
-            if i == 0:
-                ax = self.fig.add_subplot(gs[i])
-                shared_ax = ax
-            else:
-                ax = self.fig.add_subplot(gs[i], sharex=shared_ax)
-            axes[panel_name] = ax
-            
-            # Remove title
-            ax.set_title("")
-            
-            # Vertical Titles on the LEFT - REMOVED
-
-            # Tick parameters
-            if i < num_panels - 1:
-                plt.setp(ax.get_xticklabels(), visible=False)
-                ax.tick_params(axis='x', labelbottom=False)
-            
-            # Price Axis on LEFT
-            if panel_name == 'price':
-                ax.yaxis.set_label_position("left")
-                ax.yaxis.tick_left()
-            else:
-                 ax.yaxis.set_label_position("left")
-                 ax.yaxis.tick_left()
-
-        # Plot Price
-        ax_price = axes['price']
-        
-        # Overlay Volume (Bottom 20%)
-        if self.show_volume.get():
-             self._plot_volume_overlay(ax_price, df, x_indices)
-        
-        self._plot_candles(ax_price, df, x_indices)
-        self._plot_ma(ax_price, df, x_indices)
-        self._plot_bbands(ax_price, df, x_indices)
-        if self.show_vp.get():
-             # Use RAW High-Res Data for Volume Profile if available
-             # Filter raw_df to match the chart's time window start
-             if not self.raw_df.empty:
-                 start_date = df.index.min()
-                 vp_data = self.raw_df[self.raw_df.index >= start_date]
-                 self._plot_volume_profile(ax_price, vp_data)
-             else:
-                 self._plot_volume_profile(ax_price, df)
-            
-        ax_price.grid(True, alpha=0.3)
-        if any([v.get() for v in [self.show_ma5, self.show_ma20, self.show_ma50, self.show_ma60, self.show_ma100, self.show_ma120, self.show_ma200]]):
-             ax_price.legend(loc='upper left', prop={'size': base_font_size},  bbox_to_anchor=(0.02, 0.98), ncol=2)
-
-        # Calculate Price Limits explicitly to avoid 0 artefacts
-        y_min = df['low'].min()
-        y_max = df['high'].max()
-        
-        # Include BBands in range if shown
-        if self.show_bbards.get() and 'bb_upper' in df.columns:
-            y_max = max(y_max, df['bb_upper'].max())
-            y_min = min(y_min, df['bb_lower'].min())
-            
-        # Include MAs in range if shown (Fix for long-term charts)
-        ma_cols = [
-            (self.show_ma5, 'ma5'), (self.show_ma20, 'ma20'), 
-            (self.show_ma50, 'ma50'), (self.show_ma60, 'ma60'),
-            (self.show_ma100, 'ma100'), (self.show_ma120, 'ma120'),
-            (self.show_ma200, 'ma200')
-        ]
-        for var, col in ma_cols:
-            if var.get() and col in df.columns:
-                 # Filter out NaN/Inf which might happen with rolling averages at start
-                 valid_ma = df[col].dropna()
-                 if not valid_ma.empty:
-                     y_max = max(y_max, valid_ma.max())
-                     y_min = min(y_min, valid_ma.min())
-            
-        # Add padding
-        pad = (y_max - y_min) * 0.05
-        ax_price.set_ylim(y_min - pad, y_max + pad)
-
-        # Plot Other Panels
-        if 'macd' in axes:
-            self._plot_macd(axes['macd'], df, x_indices)
-        if 'rsi' in axes:
-            self._plot_rsi(axes['rsi'], df, x_indices)
-            
-        # Format X-Axis on the Bottom Panel
-        bottom_panel = panels[-1]
-        bottom_ax = axes[bottom_panel]
-        self._setup_date_axis(bottom_ax, df, self.time_window_var.get())
-        
-        # Set margins to 0
-        bottom_ax.set_xlim(-0.5, len(df) - 0.5)
-        
-        # Setup Crosshair Labels (Hidden by default)
-        # One Y-label per panel
-        self.panel_labels = {}
-        for name, ax in axes.items():
-             lbl = ax.text(1.01, 0.5, "", transform=ax.transAxes, 
-                           color='black', bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='black'), ha='left',
-                           fontsize=base_font_size)
-             lbl.set_visible(False)
-             self.panel_labels[ax] = {'label': lbl, 'name': name}
-
-        # Date Label (Always on Price panel top)
-        self.crosshair_date_lbl = ax_price.text(0.5, 1.01, "", transform=ax_price.transAxes, 
-                                                color='black', ha='center', fontsize=base_font_size,
-                                                bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='none'))
-        self.crosshair_date_lbl.set_visible(False)
-        
-        # Volume Label (Moved to Bottom Right of Bottom Panel)
-        bottom_panel = panels[-1]
-        bottom_ax = axes[bottom_panel]
-        self.crosshair_vol_lbl = bottom_ax.text(0.99, 0.02, "", transform=bottom_ax.transAxes,
-                                               color='black', ha='right', va='bottom', fontsize=base_font_size, fontweight='bold',
-                                               bbox=dict(boxstyle='round', facecolor='white', alpha=0.8, edgecolor='none'))
-        self.crosshair_vol_lbl.set_visible(False)
-        
-        # Setup Crosshair Lines (Manual, Hidden by default)
-        self.crosshair_lines['vert'] = []
-        self.crosshair_lines['horiz'] = []
-        
-        # Init value for lines (non-zero to avoid autoscaling issues)
-        init_price = df['close'].iloc[-1]
-        
-        for ax in axes.values():
-            # Vertical Line (shared x)
-            vl = ax.axvline(x=len(df)-1, color='red', lw=0.5, visible=False)
-            self.crosshair_lines['vert'].append(vl)
-            
-            # Horizontal Line (per axis)
-            curr_y = init_price if ax == ax_price else 0
-            hl = ax.axhline(y=curr_y, color='red', lw=0.5, visible=False)
-            self.crosshair_lines['horiz'].append(hl)
-
-        self.axes_dict = axes 
+        # Register overlay artists before drawing so the cached background excludes them
+        self.crosshair_blitter.set_artists(self.chart_view.overlay_artists())
+        self._chart_key = self._layout_key(settings)
         self.canvas.draw()
-        
-        # Removed MultiCursor
+
 
     def _on_mouse_down(self, event):
         if not event.inaxes or self.history_df.empty:
@@ -1220,7 +1159,7 @@ class StockChartApp:
         
         # Handle Twin Axes Remapping
         target_axis = event.inaxes
-        ax_price = self.axes_dict.get('price')
+        ax_price = self.chart_view.axes.get('price')
         if ax_price and target_axis != ax_price:
              if target_axis.get_position().bounds == ax_price.get_position().bounds:
                  target_axis = ax_price
@@ -1230,15 +1169,16 @@ class StockChartApp:
     def _on_mouse_up(self, event):
         self.is_dragging = False
         # Hide crosshair
-        if hasattr(self, 'panel_labels'):
-             for info in self.panel_labels.values():
+        if self.chart_view.panel_labels:
+             for info in self.chart_view.panel_labels.values():
                  info['label'].set_visible(False)
-             self.crosshair_date_lbl.set_visible(False)
-             self.crosshair_vol_lbl.set_visible(False)
+             self.chart_view.crosshair_date_lbl.set_visible(False)
+             self.chart_view.crosshair_vol_lbl.set_visible(False)
              
-             for line in self.crosshair_lines['vert'] + self.crosshair_lines['horiz']:
+             for line in self.chart_view.crosshair_lines['vert'] + self.chart_view.crosshair_lines['horiz']:
                  line.set_visible(False)
-             self.canvas.draw_idle()
+             self.crosshair_blitter.update()
+             logger.debug(f"Crosshair frame time: {self.crosshair_blitter.mean_frame_time() * 1000:.2f} ms")
 
     def _on_mouse_move(self, event):
         if not event.inaxes or self.history_df.empty or not self.is_dragging:
@@ -1247,7 +1187,7 @@ class StockChartApp:
         # Handle Twin Axes (Volume Overlay, VP)
         # If event is on a twin axis, map it back to the main Price axis
         target_axis = event.inaxes
-        ax_price = self.axes_dict.get('price')
+        ax_price = self.chart_view.axes.get('price')
         
         # Check if it's a sibling of price axis (sharing x or y)
         if ax_price and target_axis != ax_price:
@@ -1257,22 +1197,23 @@ class StockChartApp:
 
         self._update_crosshair(event.xdata, event.ydata, target_axis)
 
+    @perf.timed("crosshair")
     def _update_crosshair(self, x_data, y_data, in_axes):
         # Get Index and Price
         x_idx = int(x_data + 0.5)
         price = y_data
         
         # Clip index for Data
-        safe_idx = max(0, min(x_idx, len(self.current_df_dates) - 1))
-        current_date = self.current_df_dates[safe_idx]
+        safe_idx = max(0, min(x_idx, len(self.chart_view.current_df_dates) - 1))
+        current_date = self.chart_view.current_df_dates[safe_idx]
 
         # Update Vertical Lines (Snap to candle center)
-        for line in self.crosshair_lines['vert']:
+        for line in self.chart_view.crosshair_lines['vert']:
             line.set_xdata([x_idx]) # Use integer index
             line.set_visible(True)
             
         # Update Horizontal Lines
-        for line in self.crosshair_lines['horiz']:
+        for line in self.chart_view.crosshair_lines['horiz']:
             if line.axes == in_axes:
                 line.set_ydata([price])
                 line.set_visible(True)
@@ -1280,13 +1221,13 @@ class StockChartApp:
                 line.set_visible(False)
         
         # Update Y Labels (Per Panel)
-        if hasattr(self, 'panel_labels'):
+        if self.chart_view.panel_labels:
             # Hide all first
-            for info in self.panel_labels.values():
+            for info in self.chart_view.panel_labels.values():
                 info['label'].set_visible(False)
                 
-            if in_axes in self.panel_labels:
-                info = self.panel_labels[in_axes]
+            if in_axes in self.chart_view.panel_labels:
+                info = self.chart_view.panel_labels[in_axes]
                 lbl = info['label']
                 name = info['name']
                 
@@ -1346,174 +1287,31 @@ class StockChartApp:
             else:
                 # Daily/Weekly/Monthly
                 date_str = current_date.strftime('%Y-%m-%d')
-            self.crosshair_date_lbl.set_text(date_str)
+            self.chart_view.crosshair_date_lbl.set_text(date_str)
             
             # Position X based on AX Price (Master X)
-            ax_price = self.axes_dict['price']
+            ax_price = self.chart_view.axes['price']
             xmin, xmax = ax_price.get_xlim()
             rng_x = xmax - xmin
             if rng_x == 0: rng_x = 1
             x_rel = (x_idx - xmin) / rng_x
             
-            self.crosshair_date_lbl.set_position((x_rel, 1.01))
-            self.crosshair_date_lbl.set_visible(True)
+            self.chart_view.crosshair_date_lbl.set_position((x_rel, 1.01))
+            self.chart_view.crosshair_date_lbl.set_visible(True)
             
             # Update Volume Label
             if self.show_volume.get():
                 vol = self.history_df['volume'].iloc[safe_idx]
                 if pd.notna(vol):
-                    self.crosshair_vol_lbl.set_text(f"Vol: {int(vol):,}")
-                    self.crosshair_vol_lbl.set_visible(True)
+                    self.chart_view.crosshair_vol_lbl.set_text(f"Vol: {int(vol):,}")
+                    self.chart_view.crosshair_vol_lbl.set_visible(True)
             
-            self.canvas.draw_idle()
+            # Only the crosshair artists are redrawn
+            self.crosshair_blitter.update()
+
 
-    def _calculate_indicators(self, df):
-        df.columns = map(str.lower, df.columns)
-        df.columns = map(str.lower, df.columns)
-        df['ma5'] = df['close'].rolling(window=5).mean()
-        df['ma20'] = df['close'].rolling(window=20).mean()
-        df['ma50'] = df['close'].rolling(window=50).mean()
-        df['ma60'] = df['close'].rolling(window=60).mean()
-        df['ma100'] = df['close'].rolling(window=100).mean()
-        df['ma120'] = df['close'].rolling(window=120).mean()
-        df['ma200'] = df['close'].rolling(window=200).mean()
-        
-        macd = TA.MACD(df)
-        df['macd'] = macd['MACD']
-        df['signal'] = macd['SIGNAL']
-        df['rsi'] = TA.RSI(df)
-        bb = TA.BBANDS(df)
-        df['bb_upper'] = bb['BB_UPPER']
-        df['bb_middle'] = bb['BB_MIDDLE']
-        df['bb_lower'] = bb['BB_LOWER']
-
-    def _plot_candles(self, ax, df, x_indices):
-        up = df['close'] >= df['open']
-        down = df['close'] < df['open']
-        
-        # Width logic: 0.8 is standard for no-gap
-        width = 0.6
-        
-        # Plot Up
-        up_idx = x_indices[up].astype(int)
-        ax.vlines(up_idx, df.loc[up, 'low'], df.loc[up, 'high'], color='green', linewidth=1)
-        ax.bar(up_idx, df.loc[up, 'close'] - df.loc[up, 'open'], width, bottom=df.loc[up, 'open'], color='white', edgecolor='green', linewidth=1, align='center')
-        
-        # Plot Down
-        down_idx = x_indices[down].astype(int)
-        ax.vlines(down_idx, df.loc[down, 'low'], df.loc[down, 'high'], color='red', linewidth=1)
-        ax.bar(down_idx, df.loc[down, 'open'] - df.loc[down, 'close'], width, bottom=df.loc[down, 'close'], color='red', edgecolor='red', linewidth=1, align='center')
-
-    def _plot_ma(self, ax, df, x_indices):        # Plot Indicators
-        if self.show_ma5.get(): ax.plot(x_indices, df['ma5'], label='MA5', color='yellow', linewidth=0.8, alpha=0.9)
-        if self.show_ma20.get(): ax.plot(x_indices, df['ma20'], label='MA20', color='green', linewidth=0.8, alpha=0.9)
-        if self.show_ma50.get(): ax.plot(x_indices, df['ma50'], label='MA50', color='purple', linewidth=0.8, alpha=0.9)
-        if self.show_ma60.get(): ax.plot(x_indices, df['ma60'], label='MA60', color='cyan', linewidth=0.8, alpha=0.9)
-        if self.show_ma100.get(): ax.plot(x_indices, df['ma100'], label='MA100', color='orange', linewidth=0.8, alpha=0.9)
-        if self.show_ma120.get(): ax.plot(x_indices, df['ma120'], label='MA120', color='magenta', linewidth=0.8, alpha=0.9)
-        if self.show_ma200.get(): ax.plot(x_indices, df['ma200'], label='MA200', color='red', linewidth=0.8, alpha=0.9)
-
-    def _plot_bbands(self, ax, df, x_indices):
-        if self.show_bbards.get():
-            ax.plot(x_indices, df['bb_upper'], color='gray', linestyle='--', alpha=0.5, linewidth=0.8)
-            ax.plot(x_indices, df['bb_lower'], color='gray', linestyle='--', alpha=0.5, linewidth=0.8)
-            ax.fill_between(x_indices, df['bb_upper'], df['bb_lower'], color='gray', alpha=0.1)
-
-    def _plot_volume_overlay(self, ax, df, x_indices):
-        colors = ['green' if c >= o else 'red' for c, o in zip(df['close'], df['open'])]
-        
-        ax_vol = ax.twinx()
-        ax_vol.bar(x_indices.astype(int), df['volume'], color=colors, width=0.6, align='center', alpha=0.3)
-        
-        # Scale Volume to Bottom 25%
-        max_vol = df['volume'].max()
-        if max_vol > 0:
-            ax_vol.set_ylim(0, max_vol * 4)
-            
-        ax_vol.set_yticks([]) # Hide ticks
-        ax_vol.set_zorder(0) # Behind
-        ax.set_zorder(1)
-        ax.patch.set_visible(False)
-
-    def _plot_macd(self, ax, df, x_indices):
-        ax.plot(x_indices, df['macd'], color='blue', label='MACD')
-        ax.plot(x_indices, df['signal'], color='orange', label='Signal')
-        colors = ['green' if val >= 0 else 'red' for val in (df['macd'] - df['signal'])]
-        ax.bar(x_indices.astype(int), df['macd'] - df['signal'], color=colors, width=1.0, align='center')
-        ax.grid(True, alpha=0.3)
-        ax.set_ylabel("") # Remove left title
-        ax.legend(loc='upper left', prop={'size': self.font_size_var.get()})
-
-    def _plot_rsi(self, ax, df, x_indices):
-        ax.plot(x_indices, df['rsi'], color='purple')
-        ax.axhline(70, color='red', linestyle='--', alpha=0.5)
-        ax.axhline(30, color='green', linestyle='--', alpha=0.5)
-        ax.grid(True, alpha=0.3)
-        ax.set_ylabel("") # Remove left title
-        # Inner Title at Bottom Left
-        ax.text(0.02, 0.05, "RSI", transform=ax.transAxes, fontweight='bold', fontsize=self.font_size_var.get(), color='purple')
-
-
-    def _plot_volume_profile(self, ax, df):
-        # VP needs to be drawn using Price Y-axis but shared geometry?
-        # Actually VP is usually drawn ON TOP of price.
-        # Since we use Index X-axis, we can't easily plot geometric VP bars unless we map them.
-        # But VP is horizontal bars on Y axis. Y axis is Price (Shared).
-        # The X-axis for VP is "Volume". We need a twinx or twiny?
-        # Standard VP: Price on Y. Volume on X (TwinY).
-        
-        price_min = df['low'].min()
-        price_max = df['high'].max()
-        
-        # --- Value Profile Binning Logic ---
-        # Parse mode (e.g. "100 Bins")
-        try:
-             mode_str = self.vp_mode_var.get()
-             num_bins = int(mode_str.split()[0])
-        except:
-             num_bins = 100 # Default
-             
-        # Calculate Bin Height
-        if num_bins <= 0: num_bins = 100
-        bin_height = (price_max - price_min) / num_bins
-        if bin_height == 0: return
-
-        bins = [price_min + i * bin_height for i in range(num_bins + 1)]
-        volume_profile = [0] * num_bins
-        
-        for index, row in df.iterrows():
-            start_bin = int((row['low'] - price_min) / bin_height)
-            end_bin = int((row['high'] - price_min) / bin_height)
-            start_bin = max(0, min(start_bin, num_bins - 1))
-            end_bin = max(0, min(end_bin, num_bins - 1))
-            
-            if start_bin == end_bin:
-                volume_profile[start_bin] += row['volume']
-            else:
-                vol_per = row['volume'] / (end_bin - start_bin + 1)
-                for i in range(start_bin, end_bin + 1):
-                    volume_profile[i] += vol_per
-                    
-        ax_vp = ax.twiny()
-        ax_vp.barh(bins[:-1], volume_profile, height=bin_height, alpha=0.2, color='blue', align='edge', edgecolor='blue', linewidth=0.5)
-        ax_vp.set_xticklabels([])
-        ax_vp.tick_params(left=False, labelleft=False, right=False, labelright=False, top=False, labeltop=False, bottom=False, labelbottom=False)
-        ax_vp.grid(False)
-        
-        # Ensure Main Axis is on TOP to capture events
-        ax_vp.set_zorder(0)
-        ax.set_zorder(1)
-        ax.patch.set_visible(False) # Transparent background to see VP behind
-        
-        # Limit VP width to 1/4 of the span
-        max_vol = max(volume_profile) if volume_profile else 0
-        if max_vol > 0:
-            ax_vp.set_xlim(0, max_vol * 4)
-        
-        if self.vp_position.get() == "Right":
-            ax_vp.invert_xaxis()
-            
 if __name__ == "__main__":
+    perf.enable_from_env()
     root = tk.Tk()
     app = StockChartApp(root)
     root.mainloop()
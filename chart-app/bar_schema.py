@@ -0,0 +1,84 @@
+# bar_schema.py
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# The only provider columns the charts use; dividends, stock splits and
+# adj close are dropped at ingest
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Largest float32 round-trip error accepted for prices (a hundredth of a cent).
+# Quotes up to ~$1000 pass; above that prices stay float64
+PRICE_TOLERANCE = 1e-4
+VOLUME_MAX_UINT32 = np.iinfo(np.uint32).max
+
+
+def _compact_prices(values: np.ndarray) -> np.ndarray:
+    narrow = values.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        error = np.abs(narrow.astype(np.float64) - values)
+    finite = np.isfinite(values)
+    if np.array_equal(np.isfinite(narrow), finite) and (not finite.any() or error[finite].max() <= PRICE_TOLERANCE):
+        return narrow
+    return values
+
+
+def _compact_volume(values: np.ndarray) -> np.ndarray:
+    if values.size == 0 or not np.isfinite(values).all():
+        return values # Gaps stay NaN (float)
+    if not np.array_equal(values, np.floor(values)):
+        return values
+    if values.min() >= 0 and values.max() <= VOLUME_MAX_UINT32:
+        return values.astype(np.uint32)
+    return values.astype(np.int64)
+
+
+def compact_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the bars in the compact in-memory schema.
+
+    Only BAR_COLUMNS are kept. The four price columns become float32 together
+    when every value survives the round trip within PRICE_TOLERANCE (most
+    provider quotes are float32 values already), and volume becomes uint32
+    when it is whole and fits, int64 otherwise.
+
+    Args:
+        df (pd.DataFrame): Normalized (lowercase) bars.
+
+    Returns:
+        pd.DataFrame: A new frame with the same index and attrs.
+    """
+    if df is None or df.empty:
+        return df
+    prices = [c for c in PRICE_COLUMNS if c in df.columns]
+    columns = {}
+    if prices:
+        block = df[prices].to_numpy(dtype=np.float64)
+        block = _compact_prices(block)
+        for i, col in enumerate(prices):
+            columns[col] = block[:, i]
+    if 'volume' in df.columns:
+        columns['volume'] = _compact_volume(df['volume'].to_numpy(dtype=np.float64, na_value=np.nan))
+    out = pd.DataFrame(columns, index=df.index)
+    out.attrs = dict(df.attrs)
+    return out
+
+
+def frame_nbytes(df: Optional[pd.DataFrame]) -> int:
+    """Bytes held by a frame's columns and index (0 for None)."""
+    if df is None:
+        return 0
+    itemsizes = [dtype.itemsize for dtype in df.dtypes if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM']
+    if len(itemsizes) < df.shape[1]:
+        # Object or extension columns: let pandas measure them (much slower)
+        return int(df.memory_usage(index=True, deep=False).sum())
+    return len(df) * sum(itemsizes) + int(df.index.nbytes)
+
+
+def format_bytes(n: int) -> str:
+    """Human-readable size (KiB / MiB)."""
+    if n >= 1 << 20:
+        return f"{n / (1 << 20):.1f} MiB"
+    return f"{n / 1024:.0f} KiB"
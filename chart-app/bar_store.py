@@ -0,0 +1,259 @@
+# bar_store.py
+import argparse
+import glob
+import json
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# On-disk layout of one store entry (a directory):
+#   meta.json   -> version, timezone, column names and dtypes, attrs
+#   index.npy   -> int64 epoch nanoseconds (UTC)
+#   col_N.npy   -> one typed array per column (float64 prices, int64 volume, ...)
+STORE_VERSION = 1
+STORE_SUFFIX = ".bars"
+META_FILE = "meta.json"
+INDEX_FILE = "index.npy"
+DEFAULT_TZ = "US/Eastern"
+# A load that finds the entry mid-replace retries this often, READ_RETRY_DELAY seconds apart
+READ_ATTEMPTS = 50
+READ_RETRY_DELAY = 0.01
+
+
+def save_bars(df: pd.DataFrame, path: Path, tz: str = DEFAULT_TZ, attrs: Optional[dict] = None) -> None:
+    """
+    Writes a bar DataFrame to a columnar store directory.
+
+    The write goes to a temporary sibling directory of its own first, and
+    replaces the entry with two renames (old entry aside, new one into
+    place), so a crash never leaves a half-written entry and several
+    writers of the same entry (app pools, a cron warm_cache) do not trip
+    over each other: the last rename wins.
+
+    Args:
+        df (pd.DataFrame): Bars with a DatetimeIndex (tz-aware or UTC-naive).
+        path (Path): Target store directory (e.g. cache/SPY_1d.bars).
+        tz (str): Timezone to restore on load when the index is naive.
+        attrs (dict): Small JSON-serializable metadata restored into DataFrame.attrs.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp"))
+    try:
+        _write_entry(df, tmp_path, tz, attrs)
+        _swap_into_place(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _write_entry(df: pd.DataFrame, tmp_path: Path, tz: str, attrs: Optional[dict]) -> None:
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        tz = str(index.tz)
+        index = index.tz_convert("UTC")
+    np.save(tmp_path / INDEX_FILE, index.as_unit("ns").asi8)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        arr = values.to_numpy()
+        np.save(tmp_path / f"col_{i}.npy", arr)
+        columns.append({"name": str(col), "file": f"col_{i}.npy", "dtype": arr.dtype.str})
+
+    meta = {"version": STORE_VERSION, "tz": tz, "rows": len(df), "columns": columns, "attrs": attrs or {}}
+    with open(tmp_path / META_FILE, "w") as f:
+        json.dump(meta, f)
+
+
+def _swap_into_place(tmp_path: Path, path: Path, attempts: int = 10) -> None:
+    """Renames tmp_path to path, moving whatever entry is there (another writer's, maybe just placed) aside."""
+    asides = []
+    try:
+        for attempt in range(attempts):
+            try:
+                tmp_path.rename(path)
+                return
+            except OSError:
+                # path exists: directories are not replaced by a rename
+                aside = tmp_path.with_name(f"{tmp_path.name}.old{attempt}")
+                try:
+                    path.rename(aside)
+                    asides.append(aside)
+                except FileNotFoundError:
+                    pass # Another writer moved it aside already
+        raise OSError(f"Could not replace {path}: other writers kept replacing it")
+    finally:
+        for aside in asides:
+            shutil.rmtree(aside, ignore_errors=True)
+
+
+def load_bars(path: Path, mmap: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Loads bars from a columnar store directory without any text parsing.
+
+    Args:
+        path (Path): Store directory written by save_bars.
+        mmap (bool): Memory-map the column files instead of reading them.
+                     Mapped frames are read-only and keep the files open,
+                     so only use this for short-lived readers.
+
+    Returns:
+        Optional[pd.DataFrame]: The bars with a tz-aware DatetimeIndex and the
+                                saved attrs, or None if the entry is missing or unreadable.
+    """
+    path = Path(path)
+    return _read(path, lambda: _read_entry(path, mmap))
+
+
+def _read(path: Path, read: Callable) -> Any:
+    """Runs read(), retrying while a save_bars has the entry moved aside; None if missing or unreadable."""
+    for _ in range(READ_ATTEMPTS):
+        try:
+            return read()
+        except FileNotFoundError:
+            # A save_bars in progress leaves its temporary directory next to the entry
+            if not any(path.parent.glob(f"{glob.escape(path.name)}.*.tmp*")):
+                return None
+            time.sleep(READ_RETRY_DELAY)
+        except Exception as e:
+            logger.warning(f"Failed to read bar store {path}: {e}")
+            return None
+    return None
+
+
+def _read_entry(path: Path, mmap: bool) -> Optional[pd.DataFrame]:
+    with open(path / META_FILE, "r") as f:
+        meta = json.load(f)
+    if meta.get("version") != STORE_VERSION:
+        logger.warning(f"Unsupported store version in {path}")
+        return None
+
+    mmap_mode = "r" if mmap else None
+    stamps = np.load(path / INDEX_FILE, mmap_mode=mmap_mode)
+    # Epoch ns -> UTC index is a reinterpretation, and tz_convert only swaps metadata
+    index = pd.DatetimeIndex(stamps.view("datetime64[ns]")).tz_localize("UTC").tz_convert(meta["tz"])
+
+    data = {c["name"]: np.load(path / c["file"], mmap_mode=mmap_mode) for c in meta["columns"]}
+    df = pd.DataFrame(data, index=index, copy=False)
+    df.attrs.update(meta.get("attrs", {}))
+    return df
+
+
+def load_tail(path: Path, columns: List[str], n: int) -> Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Reads the last n bars of some columns as plain arrays, without building a frame.
+
+    The files are memory-mapped and only the tail is copied, so scanning a
+    whole cache for its latest bars costs about the same per entry whatever
+    the history length.
+
+    Args:
+        path (Path): Store directory written by save_bars.
+        columns (List[str]): Column names to read.
+        n (int): Number of bars from the end.
+
+    Returns:
+        Optional[Tuple[np.ndarray, Dict[str, np.ndarray]]]: int64 epoch nanoseconds (UTC)
+            and one array per column, or None if the entry or a column is missing or unreadable.
+    """
+    path = Path(path)
+
+    def read():
+        with open(path / META_FILE, "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            logger.warning(f"Unsupported store version in {path}")
+            return None
+        files = {c["name"]: c["file"] for c in meta["columns"]}
+        if any(col not in files for col in columns):
+            return None
+        stamps = np.array(np.load(path / INDEX_FILE, mmap_mode="r")[-n:])
+        data = {col: np.array(np.load(path / files[col], mmap_mode="r")[-n:]) for col in columns}
+        return stamps, data
+
+    return _read(path, read)
+
+
+def load_csv_bars(csv_path: Path) -> pd.DataFrame:
+    """
+    Parses a legacy CSV cache file into the normalized bar format.
+
+    This is the pre-store load path, kept for migration and benchmarking.
+
+    Args:
+        csv_path (Path): CSV written by DataFrame.to_csv.
+
+    Returns:
+        pd.DataFrame: Lowercase columns, US/Eastern index, numeric OHLCV.
+    """
+    df = pd.read_csv(csv_path, index_col=0, parse_dates=True)
+    df.columns = df.columns.str.lower()
+    df.index = pd.to_datetime(df.index, utc=True)
+    try:
+        df.index = df.index.tz_convert(DEFAULT_TZ)
+    except Exception:
+        pass
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df.dropna()
+
+
+def migrate_csv_cache(csv_dir: Path, store_dir: Path, remove: bool = False) -> int:
+    """
+    Converts every legacy CSV cache file into a store entry of the same name.
+
+    Args:
+        csv_dir (Path): Directory holding {ticker}_{interval}_{date}.csv files.
+        store_dir (Path): Directory to write {ticker}_{interval}_{date}.bars entries to.
+        remove (bool): Delete each CSV once it has been converted.
+
+    Returns:
+        int: Number of files converted.
+    """
+    csv_dir = Path(csv_dir)
+    store_dir = Path(store_dir)
+    if not csv_dir.exists():
+        return 0
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    for csv_file in sorted(csv_dir.glob("*.csv")):
+        target = store_dir / (csv_file.stem + STORE_SUFFIX)
+        try:
+            if not target.exists():
+                save_bars(load_csv_bars(csv_file), target)
+                count += 1
+            if remove:
+                csv_file.unlink()
+        except Exception as e:
+            logger.warning(f"Failed to migrate {csv_file}: {e}")
+
+    if count > 0:
+        logger.info(f"Migrated {count} CSV cache files to {store_dir}")
+    return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Bar store maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="Convert legacy CSV cache files to the columnar store")
+    mig.add_argument("--csv-dir", default="csv")
+    mig.add_argument("--store-dir", default="cache")
+    mig.add_argument("--remove", action="store_true", help="Delete CSV files after conversion")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate_csv_cache(Path(args.csv_dir), Path(args.store_dir), remove=args.remove)
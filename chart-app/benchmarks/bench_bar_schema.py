@@ -0,0 +1,108 @@
+# benchmarks/bench_bar_schema.py
+"""
+Memory per resident ticker: provider-shaped bars vs the compact schema.
+
+Each interval's series is built the way the app holds it on screen: the
+raw bars in a BarPyramid plus every resample level (with indicator
+columns) that its windows draw. "provider" keeps what yfinance returns
+with auto_adjust=False (OHLCV, dividends, stock splits, adj close, all
+float64 but volume); "compact" is the same frame after compact_bars().
+A ticker in the background keeps only its bars (PyramidCache releases the
+levels of all but the last LEVELED_PYRAMIDS series), so a watchlist clicked
+through in the app is also measured, against keeping every level.
+
+Charts drawn from compact bars must match the provider-shaped ones up to
+anti-aliasing (float32 prices move lines by far less than a pixel).
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_bar_schema
+"""
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from bar_schema import compact_bars, format_bytes, frame_nbytes
+from chart_view import WINDOWS, ChartSettings, ChartView, interval_settings
+from pyramid import BarPyramid, PyramidCache
+from benchmarks.synthetic import make_bars
+
+# Bars per series, about what the provider serves for each interval
+SERIES = {'1d': 2_520, '1h': 3_500, '5m': 4_700, '1m': 390}
+CHARTS = ['1Y', '1M', '1WK']
+WATCHLIST = 8 # Tickers clicked through on 1Y, then 5Y
+
+
+def provider_frame(interval, n):
+    df = make_bars(interval, n, seed=7, start_price=180.0)
+    df['dividends'] = 0.0
+    df['stock splits'] = 0.0
+    df['adj close'] = df['close'] * 0.98
+    return df
+
+
+def resident_bytes(df, interval):
+    pyramid = BarPyramid(df)
+    for window in WINDOWS:
+        window_interval, rule = interval_settings(window)
+        if window_interval == interval:
+            pyramid.level(rule)
+    return pyramid.nbytes()
+
+
+def watchlist_bytes(compact, leveled):
+    cache = PyramidCache(leveled=leveled)
+    for t in range(WATCHLIST):
+        df = provider_frame('1d', SERIES['1d'])
+        cache.store(f"T{t}", '1d', compact_bars(df) if compact else df)
+        for window in ['1Y', '5Y']:
+            cache.get(f"T{t}", '1d', interval_settings(window)[1])
+    return sum(cache.memory_usage().values())
+
+
+def render(df, window):
+    interval, rule = interval_settings(window)
+    fig = Figure(figsize=(16, 9), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ChartView(fig).build(BarPyramid(df).level(rule), ChartSettings(window=window), interval, raw_df=df, company="SYN")
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).astype(np.int16)
+
+
+def main():
+    print("on screen (bars + levels with indicators), and in the background (bars only):")
+    print(f"{'interval':>8} {'bars':>6} {'provider':>10} {'compact':>10} {'saved':>6} "
+          f"{'background':>11} {'compact':>9} {'compact_bars':>13}")
+    totals = [0, 0]
+    frames = {}
+    for interval, n in SERIES.items():
+        df = provider_frame(interval, n)
+        t0 = time.perf_counter()
+        compact = compact_bars(df)
+        compact_ms = (time.perf_counter() - t0) * 1000
+        frames[interval] = (df, compact)
+        before, after = resident_bytes(df, interval), resident_bytes(compact, interval)
+        totals[0] += before
+        totals[1] += after
+        print(f"{interval:>8} {len(df):>6} {format_bytes(before):>10} {format_bytes(after):>10} "
+              f"{1 - after / before:>6.0%} {format_bytes(frame_nbytes(df)):>11} {format_bytes(frame_nbytes(compact)):>9} "
+              f"{compact_ms:>10.2f} ms")
+    print(f"compact dtypes: {', '.join(f'{c} {t}' for c, t in compact.dtypes.items())}")
+    print(f"on screen, all intervals: {format_bytes(totals[0])} -> {format_bytes(totals[1])}")
+
+    every_level = watchlist_bytes(compact=False, leveled=WATCHLIST)
+    released = watchlist_bytes(compact=True, leveled=PyramidCache().leveled)
+    print(f"{WATCHLIST} tickers on 1Y and 5Y (daily): provider bars with every level {format_bytes(every_level)}, "
+          f"compact bars with background levels released {format_bytes(released)} ({every_level / released:.1f}x less)")
+
+    for window in CHARTS:
+        interval, _ = interval_settings(window)
+        df, compact = frames[interval]
+        diff = np.abs(render(df, window) - render(compact, window)).max(axis=2)
+        print(f"{window} chart: {int((diff > 0).sum())} pixels differ, "
+              f"{int((diff > 32).sum())} by more than 32/255 (max {int(diff.max())})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_bar_store.py
+"""
+Load-time comparison of the legacy CSV cache and the columnar bar store.
+
+A last section saves one entry from WRITERS threads at once (the fetch
+pools and a cron warm_cache share entries) while a reader keeps loading
+it: no save may fail and every load must find the bars.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_bar_store
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from bar_store import save_bars, load_bars, load_csv_bars
+from benchmarks.synthetic import make_daily_bars
+
+SIZES = [2_500, 6_500, 25_000]  # 10Y and 25Y of daily bars, then a ~100Y stress size
+REPEATS = 5
+WRITERS = 4
+SAVES = 30
+
+
+def _best_of(fn, repeats=REPEATS):
+    best = float('inf')
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    print(f"{'bars':>8} {'csv load':>12} {'store load':>12} {'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for n in SIZES:
+            df = make_daily_bars(n)
+            csv_path = tmp / f"bench_{n}.csv"
+            store_path = tmp / f"bench_{n}.bars"
+            df.to_csv(csv_path)
+            save_bars(df, store_path)
+
+            # Both paths must produce the same frame
+            pd.testing.assert_frame_equal(load_csv_bars(csv_path), load_bars(store_path),
+                                          check_freq=False, check_index_type=False)
+
+            t_csv = _best_of(lambda: load_csv_bars(csv_path))
+            t_store = _best_of(lambda: load_bars(store_path))
+            print(f"{n:>8} {t_csv * 1000:>10.2f}ms {t_store * 1000:>10.2f}ms {t_csv / t_store:>8.1f}x")
+
+        df = make_daily_bars(SIZES[0])
+        path = tmp / "shared.bars"
+        save_bars(df, path)
+        errors, loads, misses = [], [0], [0]
+        stop = threading.Event()
+
+        def write():
+            for _ in range(SAVES):
+                try:
+                    save_bars(df, path)
+                except Exception as e:
+                    errors.append(e)
+
+        def read():
+            while not stop.is_set():
+                loads[0] += 1
+                misses[0] += load_bars(path) is None
+
+        writers = [threading.Thread(target=write) for _ in range(WRITERS)]
+        reader = threading.Thread(target=read)
+        reader.start()
+        for t in writers:
+            t.start()
+        for t in writers:
+            t.join()
+        stop.set()
+        reader.join()
+        print(f"{WRITERS} writers x {SAVES} saves: {len(errors)} failed; {misses[0]}/{loads[0]} loads missed; "
+              f"left {sorted(p.name for p in tmp.glob('shared*'))}")
+        assert not errors and misses[0] == 0, errors[:3]
+
+
+if __name__ == "__main__":
+    main()
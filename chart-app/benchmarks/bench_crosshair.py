@@ -0,0 +1,83 @@
+# benchmarks/bench_crosshair.py
+"""
+Crosshair frame time: full canvas redraw versus blitting over a cached background.
+
+Builds a price panel like the app's (candles, MAs, Bollinger fill, volume
+profile) at several bar counts and moves a crosshair across it.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_crosshair
+"""
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from crosshair import BlitManager
+from indicators import calculate_indicators
+from volume_profile import build_volume_profile
+from benchmarks.synthetic import make_daily_bars
+
+SIZES = [500, 5_000, 20_000]
+FRAMES = 30
+
+
+def build_chart(df):
+    fig = Figure(figsize=(19.2, 10.8), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    x = np.arange(len(df))
+    up = (df['close'] >= df['open']).to_numpy()
+    for mask, color in [(up, 'green'), (~up, 'red')]:
+        sub = df[mask]
+        ax.vlines(x[mask], sub['low'], sub['high'], color=color, linewidth=1)
+        ax.bar(x[mask], (sub['close'] - sub['open']).abs(), 0.6, bottom=np.minimum(sub['open'], sub['close']), color=color)
+    for col in ['ma5', 'ma20', 'ma50', 'ma100', 'ma200']:
+        ax.plot(x, df[col], linewidth=0.8)
+    ax.fill_between(x, df['bb_upper'], df['bb_lower'], color='gray', alpha=0.1)
+    edges, profile = build_volume_profile(df['low'], df['high'], df['volume'], 400)
+    ax_vp = ax.twiny()
+    ax_vp.stairs(profile, edges, orientation='horizontal', fill=True, alpha=0.2)
+
+    vline = ax.axvline(0, color='red', lw=0.5)
+    hline = ax.axhline(df['close'].iloc[0], color='red', lw=0.5)
+    label = ax.text(0.5, 1.01, "", transform=ax.transAxes)
+    return fig, canvas, ax, [vline, hline, label]
+
+
+def main():
+    print(f"{'bars':>8} {'full redraw':>13} {'blit frame':>12}")
+    for n in SIZES:
+        df = make_daily_bars(n)
+        calculate_indicators(df)
+        fig, canvas, ax, overlay = build_chart(df)
+        vline, hline, label = overlay
+        blitter = BlitManager(canvas)
+        blitter.set_artists(overlay)
+        canvas.draw()
+
+        xs = np.linspace(0, n - 1, FRAMES).astype(int)
+        t0 = time.perf_counter()
+        for i in xs:
+            vline.set_xdata([i])
+            hline.set_ydata([df['close'].iloc[i]])
+            label.set_text(str(df.index[i].date()))
+            blitter.update()
+        t_blit = (time.perf_counter() - t0) / FRAMES
+
+        # The pre-blit behaviour: every move re-renders the whole figure
+        for a in overlay:
+            a.set_animated(False)
+        t0 = time.perf_counter()
+        for i in xs[:5]:
+            vline.set_xdata([i])
+            canvas.draw()
+        t_full = (time.perf_counter() - t0) / 5
+        print(f"{n:>8} {t_full * 1000:>11.1f}ms {t_blit * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
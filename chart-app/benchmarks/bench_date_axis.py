@@ -0,0 +1,139 @@
+# benchmarks/bench_date_axis.py
+"""
+Date-axis tick generation: the original per-bar loop from
+StockChartApp._setup_date_axis versus date_axis.compute_date_ticks.
+
+Covers every window of _get_interval_settings with bars of the interval and
+resample rule it uses, checks that indices and labels are identical, and
+times both.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_date_axis
+"""
+import time
+
+import pandas as pd
+
+from date_axis import compute_date_ticks
+from pyramid import resample_bars
+from benchmarks.synthetic import make_daily_bars, make_intraday_bars
+
+REPEATS = 20
+
+
+def legacy_date_ticks(dates, window, interval):
+    """The loop _setup_date_axis ran before compute_date_ticks (tick lists only)."""
+    major_indices, major_labels, minor_indices, minor_labels = [], [], [], []
+    years, months, days = dates.year, dates.month, dates.day
+    is_long_term = window in ["10Y", "5Y", "3Y", "2Y"]
+    is_hourly = (interval == '1h') or (window == "1WK")
+    prev_year = prev_month = prev_day = prev_hour = -1
+
+    for i, (date, y, m, d) in enumerate(zip(dates, years, months, days)):
+        if window == "1D":
+            curr_hour = date.hour
+            if curr_hour != prev_hour:
+                major_indices.append(i)
+                major_labels.append(date.strftime("%H:%M"))
+                prev_hour = curr_hour
+            continue
+        if is_hourly:
+            if d != prev_day:
+                major_indices.append(i)
+                if window == "3M":
+                    if m != prev_month:
+                        major_labels.append(date.strftime("%b %d"))
+                    elif date.weekday() == 0:
+                        major_labels.append(f"{d}")
+                    else:
+                        major_labels.append("")
+                elif window in ["1M", "YTD"]:
+                    if m != prev_month:
+                        major_labels.append(date.strftime("%b %d"))
+                    else:
+                        major_labels.append(date.strftime("%d"))
+                else:
+                    major_labels.append(date.strftime("%a %d"))
+                prev_day = d
+                prev_month = m
+                prev_year = y
+            continue
+        if y != prev_year:
+            if is_long_term and i > 5:
+                major_indices.append(i)
+                major_labels.append(str(y))
+            prev_year = y
+        if m != prev_month:
+            if is_long_term:
+                if window in ["10Y", "5Y"]:
+                    if m in [1, 4, 7, 10]:
+                        minor_indices.append(i)
+                        minor_labels.append(f"{m:02d}")
+                else:
+                    minor_indices.append(i)
+                    minor_labels.append(f"{m:02d}")
+            else:
+                major_indices.append(i)
+                major_labels.append(dates[i].strftime('%b'))
+            prev_month = m
+    return major_indices, major_labels, minor_indices, minor_labels
+
+
+def one_minute_day():
+    """The 1D view: 391 one-minute slots, 09:30-16:00."""
+    day = pd.Timestamp("2025-12-31 09:30", tz="US/Eastern")
+    return pd.date_range(day, periods=391, freq="1min")
+
+
+def cases():
+    daily = make_daily_bars(2_600)
+    hourly = make_intraday_bars(3_500, freq_minutes=60)
+    five_min = make_intraday_bars(10_000, freq_minutes=5)
+    end = daily.index[-1]
+    h_end = hourly.index[-1]
+
+    def last(df, offset):
+        return df[df.index >= df.index[-1] - offset]
+
+    yield "10Y", "1d", resample_bars(daily, "1ME").index
+    yield "5Y", "1d", resample_bars(last(daily, pd.DateOffset(years=5)), "1W").index
+    yield "3Y", "1d", resample_bars(last(daily, pd.DateOffset(years=3)), "3D").index
+    yield "2Y", "1d", resample_bars(last(daily, pd.DateOffset(years=2)), "2D").index
+    yield "1Y", "1d", last(daily, pd.DateOffset(years=1)).index
+    yield "6M", "1d", last(daily, pd.DateOffset(months=6)).index
+    yield "YTD", "1d", daily[daily.index.year == end.year].index
+    yield "YTD", "1h", hourly[hourly.index.year == h_end.year].index
+    yield "3M", "1h", last(hourly, pd.DateOffset(months=3)).index
+    yield "1M", "1h", last(hourly, pd.DateOffset(months=1)).index
+    yield "1WK", "5m", resample_bars(last(five_min, pd.DateOffset(weeks=1)), "10min").index
+    yield "1D", "1m", one_minute_day()
+    # Larger frames than the windows normally hold, to show the scaling
+    yield "10Y", "1d", daily.index
+    yield "3M", "1h", hourly.index
+
+
+def main():
+    print(f"{'window':>6} {'interval':>8} {'bars':>6} {'ticks':>6} {'loop':>10} {'vectorized':>11}")
+    for window, interval, dates in cases():
+        expected = legacy_date_ticks(dates, window, interval)
+        actual = compute_date_ticks(dates, window, interval)
+        assert list(actual.major_indices) == expected[0], window
+        assert list(actual.major_labels) == expected[1], window
+        assert list(actual.minor_indices) == expected[2], window
+        assert list(actual.minor_labels) == expected[3], window
+
+        t0 = time.perf_counter()
+        for _ in range(REPEATS):
+            legacy_date_ticks(dates, window, interval)
+        t_loop = (time.perf_counter() - t0) / REPEATS
+        t0 = time.perf_counter()
+        for _ in range(REPEATS):
+            compute_date_ticks(dates, window, interval)
+        t_vec = (time.perf_counter() - t0) / REPEATS
+        n_ticks = len(actual.major_indices) + len(actual.minor_indices)
+        print(f"{window:>6} {interval:>8} {len(dates):>6} {n_ticks:>6} {t_loop * 1000:>8.2f}ms {t_vec * 1000:>9.2f}ms")
+    print("tick indices and labels match the loop for every window")
+
+
+if __name__ == "__main__":
+    main()
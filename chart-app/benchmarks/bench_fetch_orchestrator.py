@@ -0,0 +1,143 @@
+# benchmarks/bench_fetch_orchestrator.py
+"""
+Bulk downloads through the fetch orchestrator against a local stand-in server.
+
+The server (benchmarks/standin_server.py) answers after 200 ms and, like
+Yahoo, rejects requests above 20 per second with 429. The client is a
+blocking urllib GET, the same shape as a yfinance call. 40 tickers are
+downloaded:
+
+    serial     one after another, no limits (what a bulk refresh did per batch)
+    threads    16 plain threads, no rate limit: fast, but the provider throttles
+    orch       FetchOrchestrator(8 at once, 12/s with a burst of 8): no 429s,
+               the cap and the rate limit hold at the server, queue depth sampled
+    flaky      20% of answers are 503: plain threads lose them, the
+               orchestrator retries with jittered backoff
+    timeout    one ticker hangs for 3 s: its request times out (0.5 s per
+               attempt, one retry) while the others finish
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_fetch_orchestrator
+"""
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from fetch_orchestrator import FetchOrchestrator, RetryPolicy
+from benchmarks.standin_server import StandInServer
+
+TICKERS = [f"T{i:02d}" for i in range(40)]
+LATENCY = 0.2
+SERVER_RATE_LIMIT = 20
+THREADS = 16
+CONCURRENCY = 8
+RATE = 12.0
+BURST = 8
+FAIL_RATE = 0.2
+RETRY = RetryPolicy(retries=3, timeout=2.0, base_delay=0.1, max_delay=1.0)
+HOST = "standin"
+
+
+def get_json(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def plain_threads(server):
+    def fetch(ticker):
+        try:
+            return get_json(f"{server.url}/history/{ticker}")
+        except Exception as e:
+            return e
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return list(pool.map(fetch, TICKERS))
+
+
+def orchestrated(orchestrator, server, tickers=TICKERS):
+    return orchestrator.map(HOST, get_json, [(f"{server.url}/history/{ticker}",) for ticker in tickers])
+
+
+def sample_depth(orchestrator, stop, peaks):
+    while not stop.is_set():
+        for key, value in orchestrator.depth.items():
+            peaks[key] = max(peaks.get(key, 0), value)
+        time.sleep(0.01)
+
+
+def report(label, server, results, elapsed):
+    failed = sum(isinstance(r, Exception) for r in results)
+    print(f"{label:<8} {elapsed:5.2f} s, {len(results) - failed}/{len(results)} ok; server: "
+          f"status {dict(sorted(server.status.items()))}, max {server.max_per_second()}/s, "
+          f"peak {server.peak_active} at once")
+
+
+def main():
+    with StandInServer(latency=LATENCY, rate_limit=SERVER_RATE_LIMIT) as server:
+        t0 = time.perf_counter()
+        results = []
+        for ticker in TICKERS:
+            try:
+                results.append(get_json(f"{server.url}/history/{ticker}"))
+            except Exception as e:
+                results.append(e)
+        report("serial", server, results, time.perf_counter() - t0)
+        time.sleep(1.0)
+
+        server.reset()
+        t0 = time.perf_counter()
+        results = plain_threads(server)
+        report("threads", server, results, time.perf_counter() - t0)
+        time.sleep(1.0)
+
+        server.reset()
+        orchestrator = FetchOrchestrator(concurrency=CONCURRENCY, rate=RATE, burst=BURST, retry=RETRY)
+        stop, peaks = threading.Event(), {}
+        sampler = threading.Thread(target=sample_depth, args=(orchestrator, stop, peaks))
+        sampler.start()
+        t0 = time.perf_counter()
+        results = orchestrated(orchestrator, server)
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        sampler.join()
+        report("orch", server, results, elapsed)
+        assert server.status.get(429, 0) == 0 and server.peak_active <= CONCURRENCY
+        assert server.max_per_second() <= SERVER_RATE_LIMIT
+        print(f"         peak depth {peaks}; {orchestrator.summary()}")
+        orchestrator.close()
+        time.sleep(1.0)
+
+        server.fail_rate = FAIL_RATE
+        server.reset()
+        t0 = time.perf_counter()
+        results = plain_threads(server)
+        report("flaky", server, results, time.perf_counter() - t0)
+        time.sleep(1.0)
+        server.reset()
+        orchestrator = FetchOrchestrator(concurrency=CONCURRENCY, rate=RATE, burst=BURST, retry=RETRY)
+        t0 = time.perf_counter()
+        results = orchestrated(orchestrator, server)
+        report("  orch", server, results, time.perf_counter() - t0)
+        assert not any(isinstance(r, Exception) for r in results)
+        print(f"         {orchestrator.summary()}")
+        orchestrator.close()
+        time.sleep(1.0)
+
+        server.fail_rate = 0.0
+        server.hang = {"T00"}
+        server.hang_seconds = 3.0
+        server.reset()
+        orchestrator = FetchOrchestrator(concurrency=CONCURRENCY, rate=RATE, burst=BURST,
+                                         retry=RETRY._replace(timeout=0.5, retries=1))
+        t0 = time.perf_counter()
+        results = orchestrated(orchestrator, server)
+        elapsed = time.perf_counter() - t0
+        report("timeout", server, results, elapsed)
+        assert isinstance(results[0], TimeoutError) and not any(isinstance(r, Exception) for r in results[1:])
+        print(f"         T00 gave up after 2 attempts; {orchestrator.summary()}")
+        orchestrator.close()
+
+
+if __name__ == "__main__":
+    main()
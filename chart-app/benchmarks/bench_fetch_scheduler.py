@@ -0,0 +1,97 @@
+# benchmarks/bench_fetch_scheduler.py
+"""
+Rapid ticker/window changes: thread-per-request (the old fetch_data) versus
+FetchScheduler.
+
+A stand-in download sleeps for a random 50-400 ms. A burst of requests is
+fired 20 ms apart, the way fast typing or window clicking produces them.
+The script reports how many downloads each model starts and which result
+the UI would finally show.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_fetch_scheduler
+"""
+import queue
+import random
+import threading
+import time
+
+from fetch_scheduler import FetchScheduler
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "AMZN", "META", "GOOG", "TSLA", "AMD"]
+WINDOW_INTERVALS = ["1d", "1h", "1d", "5m", "1d"]
+CLICK_GAP = 0.02
+
+
+def burst():
+    """Requests in click order: several tickers, then window flips on the last one."""
+    requests = [(t, "1d") for t in TICKERS]
+    requests += [(TICKERS[-1], iv) for iv in WINDOW_INTERVALS]
+    requests += [(TICKERS[-1], "1d")] * 3 # Enter pressed repeatedly
+    return requests
+
+
+def fake_download(counter, ticker, interval):
+    with counter['lock']:
+        counter['started'] += 1
+    time.sleep(random.uniform(0.05, 0.4))
+    return ('data', (ticker, interval))
+
+
+def thread_per_request(requests):
+    """Old model: every request starts a thread and every result is applied in arrival order."""
+    counter = {'started': 0, 'lock': threading.Lock()}
+    results = queue.Queue()
+    threads = []
+    for key in requests:
+        t = threading.Thread(target=lambda k=key: results.put(fake_download(counter, *k)))
+        t.start()
+        threads.append(t)
+        time.sleep(CLICK_GAP)
+    for t in threads:
+        t.join()
+    shown = None
+    while not results.empty():
+        shown = results.get()[1] # _process_queue applied every message
+    return counter['started'], shown
+
+
+def scheduled(requests):
+    counter = {'started': 0, 'lock': threading.Lock()}
+    results = queue.Queue()
+    scheduler = FetchScheduler(lambda t, iv: fake_download(counter, t, iv),
+                               lambda gen, msg: results.put((gen, msg)))
+    for key in requests:
+        scheduler.submit(*key)
+        time.sleep(CLICK_GAP)
+    scheduler.shutdown(wait=True)
+    shown, dropped = None, 0
+    while not results.empty():
+        gen, msg = results.get()
+        if scheduler.is_current(gen):
+            shown = msg[1]
+        else:
+            dropped += 1
+    return counter['started'], shown, dropped, scheduler.stats
+
+
+def main():
+    random.seed(11)
+    requests = burst()
+    final = requests[-1]
+    print(f"{len(requests)} requests, final state {final}")
+
+    started, shown = thread_per_request(requests)
+    print(f"thread per request: {started:>2} downloads, UI shows {shown}"
+          f"{'' if shown == final else '  <-- stale result won'}")
+
+    random.seed(11)
+    started, shown, dropped, stats = scheduled(requests)
+    assert shown == final, shown
+    print(f"fetch scheduler:    {started:>2} downloads, UI shows {shown}, "
+          f"{dropped} superseded results dropped")
+    print(f"  submitted={stats['submitted']} coalesced={stats['coalesced']} cancelled={stats['cancelled']}")
+
+
+if __name__ == "__main__":
+    main()
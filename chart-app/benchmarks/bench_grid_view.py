@@ -0,0 +1,185 @@
+# benchmarks/bench_grid_view.py
+"""
+Grid of small charts (grid_view.py) against typing tickers one at a time.
+
+Runs against a synthetic provider with 100 ms latency per call, on the Agg backend:
+
+    typed    16 tickers typed in turn in the single-chart view: download,
+             pyramid level, full 16x9 chart build and draw for each
+    grid     the same 16 tickers as a 4 x 4 grid (fresh cache): loads on the
+             shared pool, then one tile per event-loop turn. The slowest
+             tile is the longest the GUI goes without handling input
+    toggle   an indicator toggle: tiles are refreshed, not rebuilt
+    window   every tile 1Y -> 6M: the same daily level, no disk or network
+    shared   8 tickers on 1Y, 6M, 3M and 1M (32 tiles) against 8 tiles on 1Y:
+             tiles on the same series share one load, pyramid and level
+    1D       32 tickers on 1D, 16 on screen, one minute later: only the
+             visible tiles reload, updated in place; the hidden ones catch
+             up when scrolled into view
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_grid_view
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import perf
+from bar_schema import format_bytes
+from chart_view import ChartSettings, ChartView, interval_settings
+from grid_view import ChartGrid
+from history_cache import fetch_bars, session_date
+from intraday_buffer import IntradayBuffer
+from providers import set_provider
+from pyramid import PyramidCache
+from benchmarks.synthetic import SyntheticProvider
+
+LATENCY = 0.1
+TILES = 16
+SHARED_TICKERS = 8
+SHARED_WINDOWS = ["1Y", "6M", "3M", "1M"]
+INTRADAY_TICKERS = 32
+
+
+class LiveProvider(SyntheticProvider):
+    """Synthetic sessions revealed up to `minute` after the open."""
+
+    def __init__(self, latency):
+        super().__init__(latency=latency)
+        self.minute = 200
+
+    def intraday(self, ticker, interval="1m"):
+        return super().intraday(ticker, interval).iloc[:self.minute]
+
+
+class Loader:
+    """The app's _load_bars: 1m session buffers, memory, then the bar store."""
+
+    def __init__(self, pyramids, cache_dir):
+        self.pyramids = pyramids
+        self.cache_dir = cache_dir
+        self.buffers = {}
+
+    def __call__(self, ticker, interval):
+        if interval == '1m':
+            buffer = self.buffers.setdefault(ticker, IntradayBuffer(ticker, interval))
+            return buffer.refresh()
+        df = self.pyramids.current_bars(ticker, interval, session_date())
+        if df is None:
+            df = fetch_bars(ticker, interval, self.cache_dir)
+        return df, 0
+
+
+def new_grid(cache_dir):
+    pyramids = PyramidCache()
+    return ChartGrid(Loader(pyramids, cache_dir), pyramids, lambda tile: FigureCanvasAgg(tile.fig))
+
+
+def drain(grid, settings):
+    """What the app's event loop does: apply loads, then one tile per turn. Returns (total s, slowest tile s)."""
+    t0 = time.perf_counter()
+    slowest = 0.0
+    while True:
+        grid.wait()
+        t1 = time.perf_counter()
+        more = grid.draw_next(settings)
+        slowest = max(slowest, time.perf_counter() - t1)
+        if not more and not grid.pending(settings):
+            return time.perf_counter() - t0, slowest
+
+
+def counts(recorder):
+    spans = {t.name: t.count for t in recorder.summary()}
+    return spans.get('cache.load', 0), spans.get('provider.history', 0)
+
+
+def main():
+    provider = LiveProvider(latency=LATENCY)
+    set_provider(provider)
+    recorder = perf.enable()
+    settings = ChartSettings(window="1Y")
+    tickers = [f"T{i:02d}" for i in range(TILES)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Single chart, one ticker after another
+            pyramids = PyramidCache()
+            fig = Figure(figsize=(16, 9), dpi=100)
+            view, canvas = ChartView(fig), FigureCanvasAgg(fig)
+            interval, rule = interval_settings("1Y")
+            t0 = time.perf_counter()
+            for ticker in tickers:
+                df = fetch_bars(ticker, interval, Path(tmp) / "typed")
+                bars = pyramids.store(ticker, interval, df).level(rule)
+                view.build(bars, settings, interval, raw_df=df, company=ticker)
+                canvas.draw()
+            typed = time.perf_counter() - t0
+            print(f"typed: {TILES} tickers one at a time, {typed:.2f} s ({typed / TILES * 1000:.0f} ms each, "
+                  f"the GUI busy for the chart part of each)")
+
+            grid = new_grid(Path(tmp) / "grid")
+            t0 = time.perf_counter()
+            grid.set_tickers(tickers, "1Y")
+            grid.wait()
+            loaded = time.perf_counter() - t0
+            drawn, slowest = drain(grid, settings)
+            print(f"grid: {TILES} tiles loaded in {loaded:.2f} s on the pool, drawn in {drawn:.2f} s; "
+                  f"slowest tile {slowest * 1000:.0f} ms (longest pause between input events); "
+                  f"{loaded + drawn:.2f} s total, {typed / (loaded + drawn):.1f}x faster than typed")
+
+            total, slowest = drain(grid, settings._replace(show_bbands=False, mas=('ma20', 'ma50')))
+            print(f"toggle: {TILES} tiles redrawn in {total * 1000:.0f} ms, slowest {slowest * 1000:.0f} ms")
+
+            before = counts(recorder)
+            t0 = time.perf_counter()
+            grid.set_window("6M")
+            total, slowest = drain(grid, settings)
+            total = time.perf_counter() - t0
+            disk, downloads = (a - b for a, b in zip(counts(recorder), before))
+            print(f"window: {TILES} tiles 1Y -> 6M in {total * 1000:.0f} ms, slowest {slowest * 1000:.0f} ms; "
+                  f"disk loads {disk}, downloads {downloads}")
+
+            one = new_grid(Path(tmp) / "grid")
+            one.set_tickers(tickers[:SHARED_TICKERS], "1Y")
+            drain(one, settings)
+            shared = new_grid(Path(tmp) / "grid")
+            shared.set_tiles([(t, w) for t in tickers[:SHARED_TICKERS] for w in SHARED_WINDOWS])
+            total, _ = drain(shared, settings)
+            tiles, series = len(shared.tiles), len({tile.key for tile in shared.tiles})
+            print(f"shared: {tiles} tiles on {series} series: {shared.stats['loads']} loads "
+                  f"({shared.stats['shared']} tiles joined one), bars drawn {format_bytes(shared.nbytes())}, "
+                  f"pyramids {format_bytes(sum(shared.pyramids.memory_usage().values()))}; "
+                  f"{len(one.tiles)} tiles on 1Y: {format_bytes(one.nbytes())}, "
+                  f"{format_bytes(sum(one.pyramids.memory_usage().values()))}")
+            for g in (grid, one, shared):
+                g.shutdown()
+
+            # 1D: 8 rows of 4, the first 4 rows on screen
+            grid = new_grid(Path(tmp) / "grid")
+            grid.set_tickers([f"M{i:02d}" for i in range(INTRADAY_TICKERS)], "1D")
+            grid.set_visible(grid.tiles[:TILES])
+            drain(grid, settings)
+            provider.minute += 1
+            before = {t.name: t.count for t in recorder.summary()}
+            t0 = time.perf_counter()
+            requested = grid.refresh()
+            _, slowest = drain(grid, settings)
+            total = time.perf_counter() - t0
+            spans = {t.name: t.count - before.get(t.name, 0) for t in recorder.summary()}
+            print(f"1D: {INTRADAY_TICKERS} tiles, {TILES} on screen, a minute later: {requested} reloads "
+                  f"({grid.stats['skipped']} hidden skipped), {spans.get('chart.update_tail', 0)} updated in place, "
+                  f"{spans.get('chart.build', 0)} rebuilt; {total * 1000:.0f} ms, slowest tile {slowest * 1000:.0f} ms")
+            grid.set_visible(grid.tiles[TILES:])
+            drain(grid, settings)
+            print(f"    scrolled down: {sum(not t.stale for t in grid.tiles[TILES:])}/{INTRADAY_TICKERS - TILES} "
+                  f"hidden tiles caught up")
+            grid.shutdown()
+    finally:
+        perf.disable()
+        set_provider(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_indicators.py
+"""
+Parity and speed of the incremental IndicatorEngine against a batch recompute.
+
+Simulates the 1D auto-refresh: the last bar keeps being revised while it
+forms, then new bars are appended. After every update the engine output
+must match calculate_indicators() on the same frame. The batch formulas
+are also checked against finta when it is installed.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_indicators
+"""
+import time
+
+import numpy as np
+
+from indicators import IndicatorEngine, calculate_indicators, INDICATOR_COLUMNS
+from benchmarks.synthetic import make_daily_bars
+
+SIZES = [391, 6_500, 25_000]
+STEPS = 200
+
+
+def assert_matches_batch(df):
+    expected = df[['open', 'high', 'low', 'close', 'volume']].copy()
+    calculate_indicators(expected)
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(df[col].to_numpy(), expected[col].to_numpy(),
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=col)
+
+
+def check_finta(df):
+    try:
+        from finta import TA
+    except ImportError:
+        print("finta not installed, skipping formula check")
+        return
+    ours = df[['open', 'high', 'low', 'close', 'volume']].copy()
+    calculate_indicators(ours)
+    macd = TA.MACD(ours)
+    bb = TA.BBANDS(ours)
+    pairs = [('macd', macd['MACD']), ('signal', macd['SIGNAL']), ('rsi', TA.RSI(ours)),
+             ('bb_upper', bb['BB_UPPER']), ('bb_middle', bb['BB_MIDDLE']), ('bb_lower', bb['BB_LOWER'])]
+    for col, ref in pairs:
+        np.testing.assert_allclose(ours[col].to_numpy(), ref.to_numpy(), rtol=1e-12, equal_nan=True, err_msg=col)
+    print("batch formulas match finta")
+
+
+def simulate_refresh(full, start):
+    """Feeds `full` to an engine bar by bar from `start`, revising each bar once while it forms."""
+    rng = np.random.default_rng(7)
+    engine = IndicatorEngine()
+    engine.update(full.iloc[:start].copy())
+    t_step = 0.0
+    for m in range(start + 1, start + STEPS + 1):
+        forming = full.iloc[:m].copy()
+        forming.iloc[-1, forming.columns.get_loc('close')] *= 1 + rng.normal(0, 0.002)
+        t0 = time.perf_counter()
+        forming = engine.update(forming)
+        t_step += time.perf_counter() - t0
+        assert engine.last_mode == 'incremental'
+        assert_matches_batch(forming)
+
+        settled = full.iloc[:m].copy()
+        settled = engine.update(settled)
+        assert engine.last_mode == 'incremental'
+        assert_matches_batch(settled)
+    return t_step / STEPS
+
+
+def main():
+    check_finta(make_daily_bars(2_000))
+
+    print(f"{'bars':>8} {'batch':>10} {'incremental':>12}")
+    for n in SIZES:
+        full = make_daily_bars(n + STEPS + 1)
+        t_incr = simulate_refresh(full, n)
+
+        frame = full.iloc[:n].copy()
+        t0 = time.perf_counter()
+        calculate_indicators(frame)
+        t_batch = time.perf_counter() - t0
+        print(f"{n:>8} {t_batch * 1000:>8.2f}ms {t_incr * 1000:>10.2f}ms")
+    print("incremental output matches batch recompute")
+
+
+if __name__ == "__main__":
+    main()
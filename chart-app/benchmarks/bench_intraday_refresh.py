@@ -0,0 +1,129 @@
+# benchmarks/bench_intraday_refresh.py
+"""
+1D auto-refresh: full session reload vs the intraday buffer.
+
+A stand-in provider plays back a synthetic 390-minute session; at each
+sampled minute the last bar is still forming. Every refresh is timed both
+ways, from the provider call to a finished Agg draw:
+
+    reload  intraday() of the whole session, normalize, pyramid level with
+            indicators, ChartView.build and draw (the previous 60 s refresh)
+    buffer  IntradayBuffer.refresh (bars since the last one), incremental
+            indicators, ChartView.update_tail and draw
+
+Rows transferred stand in for the download, which dominates live. The
+buffer's chart must be pixel-identical to a rebuilt one.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_intraday_refresh
+"""
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from bar_schema import compact_bars
+from chart_view import ChartSettings, ChartView
+from history_cache import normalize_bars
+from intraday_buffer import IntradayBuffer
+from providers import MarketDataProvider
+from pyramid import BarPyramid
+from benchmarks.synthetic import make_bars
+
+SESSION_MINUTES = 390
+# Refreshes sampled at these minutes after the open (one per 60 s auto-refresh around each)
+MINUTES = [1, 60, 200, 389]
+REPEATS = 5
+
+
+class LiveSession(MarketDataProvider):
+    """Session revealed up to `minute`, last bar still forming; counts rows sent."""
+
+    def __init__(self):
+        self.bars = make_bars('1m', SESSION_MINUTES, seed=11)
+        self.bars.columns = [c.title() for c in self.bars.columns]
+        self.minute = 1
+        self.rows = 0
+
+    def _session(self):
+        df = self.bars.iloc[:self.minute].copy()
+        df.iloc[-1, df.columns.get_loc('Close')] = df['Open'].iloc[-1] # Forming: only the open is final
+        return df
+
+    def history(self, ticker, start, end, interval="1d"):
+        return pd.DataFrame()
+
+    def intraday(self, ticker, interval="1m"):
+        df = self._session()
+        self.rows += len(df)
+        return df
+
+    def intraday_since(self, ticker, since, interval="1m"):
+        df = self._session()
+        df = df[df.index >= since]
+        self.rows += len(df)
+        return df
+
+    def info(self, ticker):
+        return {}
+
+
+def new_view():
+    fig = Figure(figsize=(16, 9), dpi=100)
+    return ChartView(fig), FigureCanvasAgg(fig)
+
+
+def reload(provider, settings):
+    df = compact_bars(normalize_bars(provider.intraday("SYN")))
+    view, canvas = new_view()
+    view.build(BarPyramid(df).level(None), settings, '1m', raw_df=df, company="SYN")
+    canvas.draw()
+    return canvas
+
+
+def main():
+    settings = ChartSettings(window="1D")
+    provider = LiveSession()
+    print(f"{'minute':>6}  {'reload rows':>11} {'reload ms':>10}  {'buffer rows':>11} {'buffer ms':>10}")
+    for minute in MINUTES:
+        reload_ms, buffer_ms = [], []
+        for _ in range(REPEATS):
+            # Reload: the whole session every refresh
+            provider.minute = minute
+            provider.rows = 0
+            t0 = time.perf_counter()
+            expected = reload(provider, settings)
+            reload_ms.append((time.perf_counter() - t0) * 1000)
+            reload_rows = provider.rows
+
+            # Buffer: state as left by the refresh one minute earlier, then one more refresh
+            provider.minute = max(1, minute - 1)
+            buffer = IntradayBuffer("SYN")
+            df, _ = buffer.refresh(provider)
+            pyramid = BarPyramid(df)
+            view, canvas = new_view()
+            view.build(pyramid.level(None), settings, '1m', raw_df=df, company="SYN")
+            canvas.draw()
+
+            provider.minute = minute
+            provider.rows = 0
+            t0 = time.perf_counter()
+            df, first = buffer.refresh(provider)
+            pyramid.update(df)
+            assert view.update_tail(pyramid.level(None), settings, first, raw_df=df, company="SYN")
+            canvas.draw()
+            buffer_ms.append((time.perf_counter() - t0) * 1000)
+            buffer_rows = provider.rows
+
+            same = np.array_equal(np.asarray(canvas.buffer_rgba()), np.asarray(expected.buffer_rgba()))
+            assert same, f"buffer chart differs from a rebuilt one at minute {minute}"
+        print(f"{minute:>6}  {reload_rows:>11} {statistics.median(reload_ms):>10.1f}  "
+              f"{buffer_rows:>11} {statistics.median(buffer_ms):>10.1f}")
+    print("buffer charts pixel-identical to rebuilt ones")
+
+
+if __name__ == "__main__":
+    main()
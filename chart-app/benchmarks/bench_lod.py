@@ -0,0 +1,89 @@
+# benchmarks/bench_lod.py
+"""
+Render time with and without level-of-detail aggregation as history grows.
+
+Draws candles, the volume overlay and the MACD histogram on a 1920x1080 Agg
+canvas, once with every bar and once through LevelOfDetail. Also checks that
+the aggregated candles keep the exact high/low envelope and that zooming in
+brings back one candle per bar.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_lod
+"""
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from indicators import calculate_indicators
+from lod import LevelOfDetail, pixel_columns
+from renderers import draw_candles, draw_bars
+from benchmarks.synthetic import make_intraday_bars
+
+SIZES = [5_000, 50_000, 200_000]
+
+
+def render(df, use_lod):
+    fig = Figure(figsize=(19.2, 10.8), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax_price, ax_macd = fig.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+    hist = (df['macd'] - df['signal']).to_numpy()
+    t0 = time.perf_counter()
+    ax_vol = ax_price.twinx()
+    if use_lod:
+        lod = LevelOfDetail(ax_price, df)
+        bars = lod.bars()
+        lod.track_candles(*draw_candles(ax_price, bars.x, bars.open, bars.high, bars.low, bars.close, bars.width))
+        lod.track_volume(draw_bars(ax_vol, bars.x, bars.volume, bars.close >= bars.open, bars.width, alpha=0.3), 0.3)
+        hx, hh, hw = lod.histogram(hist)
+        lod.track_histogram(draw_bars(ax_macd, hx, hh, hh >= 0, hw), hist)
+    else:
+        lod = None
+        x = np.arange(len(df))
+        draw_candles(ax_price, x, df['open'], df['high'], df['low'], df['close'])
+        draw_bars(ax_vol, x, df['volume'], (df['close'] >= df['open']).to_numpy(), alpha=0.3)
+        draw_bars(ax_macd, x, hist, hist >= 0, width=1.0)
+    ax_price.set_xlim(-0.5, len(df) - 0.5)
+    if lod is not None:
+        lod.connect()
+    canvas.draw()
+    return time.perf_counter() - t0, lod, ax_price, canvas
+
+
+def check_envelope(df, lod):
+    bars = lod.bars()
+    assert np.isclose(bars.high.max(), df['high'].max()) and np.isclose(bars.low.min(), df['low'].min())
+    # Every bar lies inside the candle of its bucket
+    k = lod._view[2]
+    bucket = np.arange(len(df)) // k
+    first = bucket[0]
+    assert (df['high'].to_numpy() <= bars.high[bucket - first] + 1e-9).all()
+    assert (df['low'].to_numpy() >= bars.low[bucket - first] - 1e-9).all()
+    assert len(bars.x) <= pixel_columns(lod.ax) + 1
+
+
+def main():
+    print(f"{'bars':>8} {'every bar':>11} {'with LOD':>10} {'candles drawn':>14} {'zoomed draw':>12}")
+    for n in SIZES:
+        df = make_intraday_bars(n)
+        calculate_indicators(df)
+        t_full = render(df, False)[0]
+        t_lod, lod, ax, canvas = render(df, True)
+        check_envelope(df, lod)
+        drawn = len(lod.bars().x)
+
+        # Zoom to the last 300 bars: the view switches back to one candle per bar
+        ax.set_xlim(n - 300.5, n - 0.5)
+        assert lod._view[2] == 1
+        t0 = time.perf_counter()
+        canvas.draw()
+        t_zoom = time.perf_counter() - t0
+        print(f"{n:>8} {t_full * 1000:>9.0f}ms {t_lod * 1000:>8.0f}ms {drawn:>14} {t_zoom * 1000:>10.0f}ms")
+    print("aggregated candles keep the exact high/low envelope")
+
+
+if __name__ == "__main__":
+    main()
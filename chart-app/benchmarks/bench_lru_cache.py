@@ -0,0 +1,128 @@
+# benchmarks/bench_lru_cache.py
+"""
+Revisiting a ticker: disk and network vs the in-memory pyramid cache.
+
+Replays SPY -> AAPL -> SPY -> AAPL on the 1Y window the way the app's
+fetch path runs it, against a synthetic provider with 100 ms latency:
+bars (current_bars() or fetch_bars(), store, level with indicators), then
+chart build and Agg draw. Disk loads and downloads are counted from perf
+spans ("cache.load", "provider.history"):
+
+    cold     first visit: download, cache save
+    disk     first visit after a restart: bar store load (old revisit path)
+    memory   revisit: served by PyramidCache.current_bars(), no I/O
+
+Then a 40-ticker watchlist is clicked through twice under a 4 MiB
+budget: the cache must stay within it, evicting the least recently used,
+with hit/miss/eviction counters.
+
+Last, the 1WK path with the minute archive on: a 5m series stitched with
+archived 1m bars must keep its refresh stamp, so a revisit is served from
+memory without the bar store, the archive or a download.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_lru_cache
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import perf
+from bar_schema import format_bytes
+from chart_view import ChartSettings, ChartView
+from history_cache import fetch_bars, session_date
+from minute_archive import MinuteArchive, set_archive
+from providers import set_provider
+from pyramid import PyramidCache
+from benchmarks.synthetic import SyntheticProvider
+
+LATENCY = 0.1
+VISITS = ["SPY", "AAPL", "SPY", "AAPL"]
+WATCHLIST = 40
+WATCHLIST_BUDGET = 4 << 20
+ARCHIVE_DAYS = 5
+
+
+def load(cache, ticker, cache_dir, interval='1d'):
+    """The app's download worker for a series."""
+    df = cache.current_bars(ticker, interval, session_date())
+    if df is None:
+        df = fetch_bars(ticker, interval, cache_dir)
+    cache.store(ticker, interval, df)
+    return cache.get(ticker, interval, None), df
+
+
+def span_counts(recorder):
+    return {t.name: t.count for t in recorder.summary()}
+
+
+def main():
+    set_provider(SyntheticProvider(latency=LATENCY))
+    recorder = perf.enable()
+    fig = Figure(figsize=(16, 9), dpi=100)
+    view, canvas = ChartView(fig), FigureCanvasAgg(fig)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = Path(tmp)
+            runs = [("first session", PyramidCache()), ("after a restart", PyramidCache())]
+            for label, cache in runs:
+                print(f"{label}:")
+                for ticker in VISITS:
+                    before = span_counts(recorder)
+                    t0 = time.perf_counter()
+                    bars, df = load(cache, ticker, cache_dir)
+                    t1 = time.perf_counter()
+                    view.build(bars, ChartSettings(window="1Y"), '1d', raw_df=df, company=ticker)
+                    canvas.draw()
+                    t2 = time.perf_counter()
+                    after = span_counts(recorder)
+                    loads = after.get('cache.load', 0) - before.get('cache.load', 0)
+                    downloads = after.get('provider.history', 0) - before.get('provider.history', 0)
+                    source = 'cold' if downloads else 'disk' if loads else 'memory'
+                    print(f"  {ticker:<5} {source:<7} bars {(t1 - t0) * 1000:7.1f} ms, chart {(t2 - t1) * 1000:6.1f} ms  "
+                          f"disk loads {loads}, downloads {downloads}")
+                print(f"  cache: {cache.summary()}")
+
+            tickers = [f"T{i:02d}" for i in range(WATCHLIST)]
+            cache = PyramidCache(budget_bytes=WATCHLIST_BUDGET)
+            peak = 0
+            for _ in range(2):
+                for ticker in tickers:
+                    load(cache, ticker, cache_dir)
+                    peak = max(peak, sum(cache.memory_usage().values()))
+            # The most recent ones are still in memory
+            assert all(cache.current_bars(t, '1d', session_date()) is not None for t in tickers[-8:])
+            assert peak <= cache.budget_bytes, (peak, cache.budget_bytes)
+            print(f"watchlist of {WATCHLIST} x 2 rounds, budget {format_bytes(cache.budget_bytes)}: "
+                  f"peak {format_bytes(peak)}; {cache.summary()}")
+
+            # 5m (1WK) with the archive: sessions ending today, so the 5m window covers them
+            set_provider(SyntheticProvider(session_end=session_date(), latency=LATENCY))
+            archive = MinuteArchive(cache_dir / "minutes", days=ARCHIVE_DAYS)
+            archive.append("SPY", fetch_bars("SPY", '1m', cache_dir))
+            set_archive(archive)
+            cache = PyramidCache()
+            for visit in ("first", "revisit"):
+                before = span_counts(recorder)
+                t0 = time.perf_counter()
+                _, df = load(cache, "SPY", cache_dir, '5m')
+                elapsed = time.perf_counter() - t0
+                after = span_counts(recorder)
+                counts = {name: after.get(name, 0) - before.get(name, 0)
+                          for name in ('cache.load', 'archive.stitch', 'provider.history')}
+                print(f"5m + archive {visit:<7} {len(df)} bars in {elapsed * 1000:7.1f} ms  "
+                      f"disk loads {counts['cache.load']}, stitches {counts['archive.stitch']}, "
+                      f"downloads {counts['provider.history']}")
+            assert df.attrs.get('refreshed') == session_date()
+            assert not any(counts.values()), counts
+    finally:
+        perf.disable()
+        set_archive(None)
+        set_provider(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/bench_metadata_cache.py
+"""
+Time until bars can be drawn when metadata is fetched inline (the old
+_download_worker) versus through MetadataCache, plus a check of the per-group
+TTLs, of persistence across restarts, and of revisits: a quote that
+expired on its own does not trigger a provider call.
+
+Uses a stand-in provider whose .info call takes INFO_LATENCY seconds.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_metadata_cache
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from metadata_cache import MetadataCache
+from benchmarks.synthetic import make_daily_bars
+
+INFO_LATENCY = 0.8
+BARS_LATENCY = 0.05 # Cached history with a small tail download
+REFRESHES = 5 # 1D auto-refresh cycles
+
+INFO = {'shortName': 'Test Co', 'quoteType': 'EQUITY', 'sector': 'Technology',
+        'previousClose': 101.5, 'currentPrice': 102.25, 'trailingPE': 31.2, 'marketCap': 3.1e12}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_760_000_000.0 # A weekday, mid-session
+
+    def __call__(self):
+        return self.now
+
+
+def slow_info(calls):
+    def fetch(ticker):
+        calls.append(ticker)
+        time.sleep(INFO_LATENCY)
+        return dict(INFO)
+    return fetch
+
+
+def load_bars():
+    time.sleep(BARS_LATENCY)
+    return make_daily_bars(2_500)
+
+
+def inline_refresh():
+    """Old worker: history, then .info, then post."""
+    t0 = time.perf_counter()
+    load_bars()
+    slow_info([])("TEST")
+    return time.perf_counter() - t0
+
+
+def cached_refresh(cache, done):
+    """New worker: post bars at once; metadata refresh runs on its own thread."""
+    t0 = time.perf_counter()
+    cache.refresh_async("TEST", lambda ticker, info: done.set())
+    load_bars()
+    info = cache.get("TEST")
+    return time.perf_counter() - t0, info
+
+
+def main():
+    t_inline = sum(inline_refresh() for _ in range(REFRESHES)) / REFRESHES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calls = []
+        clock = FakeClock()
+        cache = MetadataCache(slow_info(calls), Path(tmp), clock=clock)
+        times = []
+        for i in range(REFRESHES):
+            done = threading.Event()
+            t_bars, _ = cached_refresh(cache, done)
+            times.append(t_bars)
+            done.wait(5)
+            clock.now += 60 # next auto-refresh a minute later
+        t_cached = sum(times) / REFRESHES
+        print(f"time to bars per refresh: inline {t_inline * 1000:.0f}ms, cached {t_cached * 1000:.0f}ms "
+              f"({len(calls)} background .info calls)")
+
+        # TTLs: price fields go stale in seconds, previousClose at the next session, profile after days
+        cache.refresh("TEST")
+        clock.now += 30
+        info = cache.get("TEST")
+        assert 'currentPrice' not in info and info['previousClose'] == 101.5 and info['shortName'] == 'Test Co'
+        clock.now += 24 * 3600
+        info = cache.get("TEST")
+        assert 'previousClose' not in info and 'trailingPE' not in info and info['shortName'] == 'Test Co'
+        assert cache.expired_groups("TEST") == {'price', 'session', 'fundamentals'}
+        clock.now += 7 * 24 * 3600
+        assert cache.get("TEST") == {}
+
+        # Persistence: a new instance (app restart) sees the stored entry without fetching
+        clock.now -= 8 * 24 * 3600
+        restarted = MetadataCache(slow_info(calls), Path(tmp), clock=clock)
+        n_calls = len(calls)
+        assert restarted.get("TEST")['shortName'] == 'Test Co' and len(calls) == n_calls
+        print("field-group TTLs and on-disk persistence behave as configured")
+
+        # Revisits (SPY -> AAPL -> SPY) as the app asks: an expired quote alone costs no provider call
+        restarted.refresh("TEST")
+        n_calls = len(calls)
+        clock.now += 60
+        assert not restarted.refresh_async("TEST", lambda ticker, info: None, ignore={'price'})
+        assert len(calls) == n_calls
+        clock.now += 24 * 3600
+        done = threading.Event()
+        assert restarted.refresh_async("TEST", lambda ticker, info: done.set(), ignore={'price'})
+        assert done.wait(5) and len(calls) == n_calls + 1
+        print("revisit with only the quote expired: no .info call; the next session's first visit refreshes")
+
+
+if __name__ == "__main__":
+    main()
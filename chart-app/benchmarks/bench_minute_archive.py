@@ -0,0 +1,117 @@
+# benchmarks/bench_minute_archive.py
+"""
+Rolling 1m archive: write and read cost, rolling window, disk budget, and
+the 1WK chart built from archived minutes.
+
+- A 20-session 1m series is recorded the way the 1D auto-refresh does it:
+  one session load, then one refresh per minute (the forming bar revised,
+  the next one appended). Reports the cost of a refresh-sized append at
+  the end of the archive, and of reading the last week back.
+- The archive must keep only the configured sessions per ticker, and a
+  watchlist archived under a small budget must never exceed it on disk.
+- A 5m series stitched with archived minutes must resample to the same
+  10min 1WK bars as the 5m series alone, while its volume profile uses
+  1m bars.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_minute_archive
+"""
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from chart_view import filter_by_window, slice_from
+from minute_archive import RECORD, MinuteArchive, stitch_minutes
+from pyramid import resample_bars
+from volume_profile import build_volume_profile
+from benchmarks.synthetic import make_bars
+
+SESSIONS = 20
+KEEP_DAYS = 10
+REFRESHES = 200
+
+
+def sessions_of(df):
+    return [group for _, group in df.groupby(df.index.normalize())]
+
+
+def to_5m(minutes):
+    return minutes.resample('5min').agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                         'close': 'last', 'volume': 'sum'}).dropna()
+
+
+def main():
+    minutes = make_bars('1m', 390 * SESSIONS, seed=3, missing=0.01)
+    days = sessions_of(minutes)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = MinuteArchive(Path(tmp) / "minutes", days=KEEP_DAYS)
+
+        # Sessions recorded as whole-session loads, the last one minute by minute
+        for day in days[:-1]:
+            archive.append("SYN", day)
+        last = days[-1]
+        append_ms = []
+        for i in range(1, min(REFRESHES, len(last))):
+            t0 = time.perf_counter()
+            archive.append("SYN", last.iloc[i - 1:i + 1]) # Revised bar + new bar
+            append_ms.append((time.perf_counter() - t0) * 1000)
+        archive.append("SYN", last)
+
+        stored = archive.read("SYN")
+        expected = pd.concat(days[-KEEP_DAYS:])
+        pd.testing.assert_frame_equal(stored, expected, check_dtype=False, check_freq=False,
+                                      check_index_type=False, check_names=False)
+        kept = len(stored.index.normalize().unique())
+        print(f"archived {len(stored)} bars in {kept} sessions (keep {KEEP_DAYS}), "
+              f"{archive.size_bytes() / 1024:.0f} KiB, {RECORD.itemsize} bytes per bar")
+        print(f"refresh append: median {statistics.median(append_ms):.3f} ms, "
+              f"max {max(append_ms):.3f} ms over {len(append_ms)} refreshes")
+
+        week_start = stored.index[-1] - pd.DateOffset(weeks=1)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            week = archive.read("SYN", start=week_start)
+        print(f"read last week ({len(week)} bars, memory-mapped): {(time.perf_counter() - t0) / 20 * 1000:.3f} ms")
+
+        # 1WK chart: 5m history stitched with the archived minutes
+        coarse = to_5m(minutes)
+        stitched = stitch_minutes(coarse, stored)
+        assert stitched.index[0] == coarse.index[0]
+        bars_5m = filter_by_window(resample_bars(coarse, '10min'), '1WK')
+        bars_1m = filter_by_window(resample_bars(stitched, '10min'), '1WK')
+        pd.testing.assert_frame_equal(bars_1m, bars_5m, check_dtype=False, check_freq=False, check_index_type=False)
+        vp_raw = slice_from(stitched, bars_1m.index.min())
+        assert (vp_raw.index.to_series().diff().dropna() < pd.Timedelta(minutes=5)).mean() > 0.9
+        build_volume_profile(vp_raw['low'].to_numpy(), vp_raw['high'].to_numpy(), vp_raw['volume'].to_numpy(), 100)
+        print(f"1WK from archive: {len(bars_1m)} 10min bars identical to the 5m path; "
+              f"volume profile from {len(vp_raw)} 1m bars instead of {len(slice_from(coarse, bars_1m.index.min()))} 5m bars")
+
+        # A session missing from the archive: minutes are used only after it
+        gappy = pd.concat([s for i, s in enumerate(sessions_of(stored)) if i != KEEP_DAYS - 3])
+        stitched = stitch_minutes(coarse, gappy)
+        pd.testing.assert_frame_equal(filter_by_window(resample_bars(stitched, '10min'), '1WK'), bars_5m,
+                                      check_dtype=False, check_freq=False, check_index_type=False)
+        print("archive with a missing session: stitched after the gap, 1WK bars unchanged")
+
+    # Budget: a watchlist of full archives under a budget worth ~3 tickers
+    with tempfile.TemporaryDirectory() as tmp:
+        per_ticker = len(pd.concat(days[-KEEP_DAYS:])) * RECORD.itemsize
+        budget = int(per_ticker * 3.5)
+        archive = MinuteArchive(Path(tmp) / "minutes", days=KEEP_DAYS, budget_bytes=budget)
+        peak = 0
+        for t in range(8):
+            for day in days[-KEEP_DAYS:]:
+                archive.append(f"T{t}", day)
+                peak = max(peak, archive.size_bytes())
+        assert peak <= budget, (peak, budget)
+        oldest = min(archive.read(f"T{t}").index[0] for t in range(8) if not archive.read(f"T{t}").empty)
+        print(f"budget {budget / 1024:.0f} KiB: peak {peak / 1024:.0f} KiB over 8 tickers x {KEEP_DAYS} sessions; "
+              f"oldest session kept {oldest.date()}")
+
+
+if __name__ == "__main__":
+    main()
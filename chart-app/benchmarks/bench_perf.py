@@ -0,0 +1,99 @@
+# benchmarks/bench_perf.py
+"""
+Cost of the pipeline timing spans (perf.py), recording off and on.
+
+- Per span: an empty `with perf.span(...)` block against an empty loop,
+  with recording off, on, and on with the JSON-lines export.
+- Pipeline: pyramid level plus ChartView.build and an Agg draw of a 1Y
+  chart (the _apply_resampling path), with the export on. The
+  chart must be pixel-identical whether recording is on or off.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_perf
+"""
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import perf
+from chart_view import ChartSettings, ChartView
+from pyramid import BarPyramid
+from benchmarks.synthetic import make_daily_bars
+
+CALLS = 200_000
+RUNS = 7
+
+
+def per_call_ns(fn, calls=CALLS):
+    t0 = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - t0) / calls * 1e9
+
+
+def empty_loop(n):
+    for _ in range(n):
+        pass
+
+
+def span_loop(n):
+    for _ in range(n):
+        with perf.span("bench"):
+            pass
+
+
+def render(df, settings):
+    fig = Figure(figsize=(16, 9), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ChartView(fig).build(BarPyramid(df).level(None), settings, '1d', raw_df=df, company="SYN")
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def time_render(df, settings):
+    times = []
+    for _ in range(RUNS):
+        t0 = time.perf_counter()
+        image = render(df, settings)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), image
+
+
+def main():
+    perf.disable()
+    base = per_call_ns(empty_loop)
+    off = per_call_ns(span_loop) - base
+    perf.enable()
+    on = per_call_ns(span_loop, CALLS // 10) - base
+    perf.disable()
+    with tempfile.TemporaryDirectory() as tmp:
+        perf.enable(Path(tmp) / "perf.jsonl")
+        logged = per_call_ns(span_loop, CALLS // 10) - base
+        perf.disable()
+    print(f"per span: off {off:.0f} ns, on {on:.0f} ns, on with JSON-lines export {logged:.0f} ns")
+
+    df = make_daily_bars(4000)
+    settings = ChartSettings(window="1Y")
+    render(df, settings) # Warm-up (fonts, caches)
+    off_ms, expected = time_render(df, settings)
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "perf.jsonl"
+        recorder = perf.enable(log_path)
+        on_ms, image = time_render(df, settings)
+        spans = sum(t.count for t in recorder.summary()) // RUNS
+        perf.disable()
+        rows = perf.summarize(log_path)
+    assert np.array_equal(image, expected), "chart differs with recording on"
+    print(f"1Y chart (pyramid + build + draw): off {off_ms:.1f} ms, on {on_ms:.1f} ms "
+          f"({spans} spans per chart, {spans * logged / 1e6:.3f} ms of span overhead); pixel-identical")
+    print("slowest stages (recorded):")
+    for r in rows[:5]:
+        print(f"  {r['name']:<22} mean {r['mean_ms']:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_pyramid.py
+"""
+Window switches on the same interval: regrouping plus indicator recompute on
+every switch (the old _apply_resampling) versus bar pyramid lookups.
+
+Cycles 1Y -> 2Y -> 3Y -> 5Y -> 10Y on daily bars and checks that every
+pyramid level matches the old resampling and indicator output.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_pyramid
+"""
+import time
+
+import pandas as pd
+
+from indicators import calculate_indicators
+from pyramid import PyramidCache
+from benchmarks.synthetic import make_daily_bars, make_intraday_bars
+
+# Resample rules of the 1d windows in chart_view.interval_settings
+WINDOW_RULES = [("1Y", None), ("2Y", "2D"), ("3Y", "3D"), ("5Y", "1W"), ("10Y", "1ME")]
+ROUNDS = 5
+
+
+def legacy_apply_resampling(raw_df, rule):
+    """The resampling and indicator code the app ran on every window switch."""
+    df = raw_df.copy()
+    if rule and rule.endswith("D"):
+        n_days = int(rule[:-1])
+        df.index.name = 'Date_Index'
+        df = df.reset_index()
+        df['group_id'] = df.index // n_days
+        logic = {'Date_Index': 'last', 'period_start': 'first', 'open': 'first', 'high': 'max',
+                 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        df['period_start'] = df['Date_Index']
+        agg_dict = {k: v for k, v in logic.items() if k in df.columns}
+        df = df.groupby('group_id').agg(agg_dict)
+        df = df.set_index('Date_Index')
+        df.index.name = 'Date'
+    elif rule:
+        logic = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        cols = {k: v for k, v in logic.items() if k in df.columns}
+        df = df.resample(rule).agg(cols).dropna()
+    calculate_indicators(df)
+    return df
+
+
+def main():
+    raw = make_daily_bars(6_500)
+    cache = PyramidCache()
+    cache.store("TEST", "1d", raw)
+
+    for window, rule in WINDOW_RULES:
+        expected = legacy_apply_resampling(raw, rule)
+        actual = cache.get("TEST", "1d", rule)
+        pd.testing.assert_frame_equal(actual[expected.columns], expected, check_freq=False)
+    # 1WK: 5m bars resampled to 10min
+    intraday = make_intraday_bars(5_000)
+    expected = legacy_apply_resampling(intraday, "10min")
+    actual = PyramidCache().store("TEST", "5m", intraday).level("10min")
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_freq=False)
+    print("pyramid levels match the old resampling + indicators")
+
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for window, rule in WINDOW_RULES:
+            legacy_apply_resampling(raw, rule)
+    t_legacy = (time.perf_counter() - t0) / (ROUNDS * len(WINDOW_RULES))
+
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for window, rule in WINDOW_RULES:
+            cache.get("TEST", "1d", rule)
+    t_lookup = (time.perf_counter() - t0) / (ROUNDS * len(WINDOW_RULES))
+
+    cache = PyramidCache()
+    t0 = time.perf_counter()
+    cache.store("TEST", "1d", raw)
+    for window, rule in WINDOW_RULES:
+        cache.get("TEST", "1d", rule)
+    t_build = time.perf_counter() - t0
+
+    print(f"{len(raw)} daily bars, per window switch:")
+    print(f"  regroup + recompute: {t_legacy * 1000:8.2f}ms")
+    print(f"  pyramid lookup:      {t_lookup * 1000:8.4f}ms")
+    print(f"  building all {len(WINDOW_RULES)} levels once: {t_build * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
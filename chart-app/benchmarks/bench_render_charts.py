@@ -0,0 +1,61 @@
+# benchmarks/bench_render_charts.py
+"""
+Headless chart rendering throughput: render_charts on synthetic bars with
+one worker process and with one per CPU.
+
+Each ticker is rendered for a daily, a resampled weekly, an hourly and the
+1D minute window, at the app's default indicator settings. Reports charts
+per second overall and per process.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_render_charts
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from chart_view import ChartSettings
+from render_charts import render_charts
+from benchmarks.synthetic import make_daily_bars, make_intraday_bars
+
+N_TICKERS = 16
+WINDOWS = ["1Y", "5Y", "3M", "1D"]
+
+
+def synthetic_bars(ticker, interval, cache_dir):
+    """Stand-in for fetch_bars (module level, so worker processes can unpickle it)."""
+    seed = sum(map(ord, ticker))
+    if interval == "1d":
+        return make_daily_bars(2_500, seed=seed)
+    if interval == "1m":
+        return make_intraday_bars(390, freq_minutes=1, seed=seed)
+    return make_intraday_bars(1_500, freq_minutes=60 if interval == "1h" else 5, seed=seed)
+
+
+def run(tickers, processes, out_dir, fmt="png"):
+    t0 = time.perf_counter()
+    results = render_charts(tickers, WINDOWS, ChartSettings(), out_dir, fmt, processes,
+                            load=synthetic_bars)
+    elapsed = time.perf_counter() - t0
+    failed = [r for r in results if r.error]
+    assert not failed, failed[:3]
+    assert all(Path(r.path).stat().st_size > 0 for r in results)
+    return len(results), elapsed
+
+
+def main():
+    tickers = [f"T{i:03d}" for i in range(N_TICKERS)]
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        for processes in sorted({1, cpus}):
+            charts, elapsed = run(tickers, processes, Path(tmp) / f"p{processes}")
+            rate = charts / elapsed
+            print(f"{processes:>2} processes: {charts} charts in {elapsed:.2f}s, "
+                  f"{rate:.2f} charts/s, {rate / processes:.2f} charts/s per process")
+        charts, elapsed = run(tickers[:2], 2, Path(tmp) / "svg", fmt="svg")
+        print(f"svg: {charts} charts in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
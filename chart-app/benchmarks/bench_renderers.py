@@ -0,0 +1,82 @@
+# benchmarks/bench_renderers.py
+"""
+Render time of the collection-based candle/volume/MACD renderer against the
+original per-bar ax.bar()/ax.vlines() calls.
+
+Each variant builds a price panel (candles plus volume overlay) and a MACD
+histogram panel on a 1920x1080 Agg canvas; the time covers creating the
+artists and one full draw.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_renderers
+"""
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from indicators import calculate_indicators
+from renderers import draw_candles, draw_bars
+from benchmarks.synthetic import make_intraday_bars
+
+SIZES = [500, 5_000, 50_000]
+
+
+def legacy_panels(ax_price, ax_macd, df, x):
+    """The plotting code the app used before renderers.py."""
+    up = df['close'] >= df['open']
+    down = df['close'] < df['open']
+    up_idx = x[up].astype(int)
+    ax_price.vlines(up_idx, df.loc[up, 'low'], df.loc[up, 'high'], color='green', linewidth=1)
+    ax_price.bar(up_idx, df.loc[up, 'close'] - df.loc[up, 'open'], 0.6, bottom=df.loc[up, 'open'],
+                 color='white', edgecolor='green', linewidth=1, align='center')
+    down_idx = x[down].astype(int)
+    ax_price.vlines(down_idx, df.loc[down, 'low'], df.loc[down, 'high'], color='red', linewidth=1)
+    ax_price.bar(down_idx, df.loc[down, 'open'] - df.loc[down, 'close'], 0.6, bottom=df.loc[down, 'close'],
+                 color='red', edgecolor='red', linewidth=1, align='center')
+
+    colors = ['green' if c >= o else 'red' for c, o in zip(df['close'], df['open'])]
+    ax_price.twinx().bar(x.astype(int), df['volume'], color=colors, width=0.6, align='center', alpha=0.3)
+
+    colors = ['green' if val >= 0 else 'red' for val in (df['macd'] - df['signal'])]
+    ax_macd.bar(x.astype(int), df['macd'] - df['signal'], color=colors, width=1.0, align='center')
+
+
+def collection_panels(ax_price, ax_macd, df, x):
+    draw_candles(ax_price, x, df['open'], df['high'], df['low'], df['close'])
+    draw_bars(ax_price.twinx(), x, df['volume'], (df['close'] >= df['open']).to_numpy(), alpha=0.3)
+    hist = (df['macd'] - df['signal']).to_numpy()
+    draw_bars(ax_macd, x, hist, hist >= 0, width=1.0)
+
+
+def render(plot, df):
+    fig = Figure(figsize=(19.2, 10.8), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax_price, ax_macd = fig.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+    x = np.arange(len(df))
+    t0 = time.perf_counter()
+    plot(ax_price, ax_macd, df, x)
+    t_build = time.perf_counter() - t0
+    canvas.draw()
+    t_total = time.perf_counter() - t0
+    return t_build, t_total, np.asarray(canvas.buffer_rgba())
+
+
+def main():
+    print(f"{'bars':>8} {'legacy build':>13} {'legacy total':>13} {'coll. build':>12} {'coll. total':>12} {'speedup':>8}")
+    for n in SIZES:
+        df = make_intraday_bars(n)
+        calculate_indicators(df)
+        lb, lt, legacy_img = render(legacy_panels, df)
+        cb, ct, coll_img = render(collection_panels, df)
+        # Same chart: only anti-aliasing along patch edges may differ
+        differing = np.mean(np.any(legacy_img != coll_img, axis=-1))
+        print(f"{n:>8} {lb * 1000:>11.0f}ms {lt * 1000:>11.0f}ms {cb * 1000:>10.0f}ms {ct * 1000:>10.0f}ms "
+              f"{lt / ct:>7.1f}x  ({differing:.1%} pixels differ)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_replay.py
+"""
+Record/replay of the market-data provider.
+
+Records the fetch path (cached history for 1d/1h/5m, the live 1m session and
+metadata) from a synthetic stand-in for yfinance, replays it without the
+stand-in, and checks that every frame and metadata dict comes back
+unchanged. Then load-tests a watchlist warm-up against the replay with a
+simulated 50-150 ms latency per call, at several worker counts.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_replay
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from history_cache import fetch_bars, session_date
+from metadata_cache import MetadataCache
+from providers import (REPLAY_DIR_ENV, RecordingProvider, ReplayProvider, get_provider, set_provider)
+from warm_cache import warm_cache
+from benchmarks.synthetic import SyntheticProvider
+
+TICKERS = [f"T{i:02d}" for i in range(12)]
+INTERVALS = ["1d", "1h", "5m", "1m"]
+LATENCY = (0.05, 0.15)
+WORKERS = [1, 4, 8]
+
+
+def fetch_all(cache_dir):
+    frames = {(t, iv): fetch_bars(t, iv, cache_dir) for t in TICKERS for iv in INTERVALS}
+    metadata = MetadataCache(lambda t: get_provider().info(t), cache_dir / "info")
+    info = {t: metadata.refresh(t) for t in TICKERS}
+    return frames, info
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        capture = tmp / "capture"
+
+        live = SyntheticProvider(session_end=session_date(), latency=0.02)
+        set_provider(RecordingProvider(live, capture))
+        t0 = time.perf_counter()
+        recorded, recorded_info = fetch_all(tmp / "cache_recorded")
+        print(f"recorded {live.calls} provider calls in {time.perf_counter() - t0:.2f}s")
+
+        replay = ReplayProvider(capture)
+        set_provider(replay)
+        t0 = time.perf_counter()
+        replayed, replayed_info = fetch_all(tmp / "cache_replayed")
+        print(f"replayed {replay.calls} calls in {time.perf_counter() - t0:.2f}s (no latency)")
+        for key, df in recorded.items():
+            assert not df.empty, key
+            pd.testing.assert_frame_equal(replayed[key], df, check_freq=False, check_index_type=False)
+        assert replayed_info == recorded_info
+        print(f"{len(recorded)} frames and {len(recorded_info)} metadata entries identical to the recording")
+
+        # Load test: same captured responses, realistic latency, varying concurrency
+        for workers in WORKERS:
+            replay = ReplayProvider(capture, latency=LATENCY, seed=7)
+            set_provider(replay)
+            t0 = time.perf_counter()
+            results = warm_cache(TICKERS, INTERVALS[:3], tmp / f"warm_{workers}", workers=workers, batch_size=1)
+            elapsed = time.perf_counter() - t0
+            assert not [r for r in results if r.error]
+            print(f"warm-up, {workers} workers: {replay.calls} calls in {elapsed:.2f}s")
+
+        # The environment selects the replay provider (e.g. for the GUI or render_charts.py)
+        os.environ[REPLAY_DIR_ENV] = str(capture)
+        set_provider(None)
+        assert isinstance(get_provider(), ReplayProvider)
+        del os.environ[REPLAY_DIR_ENV]
+        set_provider(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_screener.py
+"""
+Screening a 500-ticker cache (screener.py) against a per-ticker loop.
+
+The cache holds 500 synthetic daily series of 10 years, 20 of them listed
+only 150 sessions ago (no MA200 yet) and 10 that stopped updating a week
+before the others:
+
+    loop     what screening looked like before: load_bars and
+             calculate_indicators for each ticker, then test its last rows
+    panel    load_panel (last LOOKBACK bars of close/volume from the store,
+             one NumPy pass for every indicator) plus screen()
+    filter   another filter on the panel already loaded
+
+Both paths must find the same tickers for every filter, and the panel's
+last indicator values must match the full-history ones.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_screener
+"""
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bar_schema import compact_bars
+from bar_store import load_bars, save_bars
+from history_cache import cache_path
+from indicators import INDICATOR_COLUMNS, calculate_indicators
+from screener import COMPARISONS, cached_tickers, load_panel, parse_filter, screen
+from benchmarks.synthetic import make_daily_bars
+
+TICKERS = 500
+BARS = 2520
+NEW_LISTINGS = 20
+NEW_LISTING_BARS = 150
+STALE = 10
+STALE_BARS = 5
+FILTERS = [
+    "RSI < 30",
+    "close crosses above MA50",
+    "close > MA200 and MACD > signal and RSI < 60",
+    "bb_pos < 0 or bb_pos > 1",
+    "change >= 2 or volume > 48000000",
+]
+
+
+def build_cache(cache_dir):
+    for i in range(TICKERS):
+        df = make_daily_bars(BARS, seed=i)
+        if i < NEW_LISTINGS:
+            df = df.iloc[-NEW_LISTING_BARS:]
+        elif i < NEW_LISTINGS + STALE:
+            df = df.iloc[:-STALE_BARS]
+        save_bars(compact_bars(df), cache_path(cache_dir, f"T{i:03d}", '1d'))
+
+
+def last_rows(df):
+    """The fields screen() reads, for the last two bars of one ticker."""
+    rows = {col: df[col].to_numpy()[-2:] for col in ['close', 'volume'] + INDICATOR_COLUMNS}
+    close = rows['close']
+    rows['change'] = np.array([np.nan, (close[1] / close[0] - 1) * 100])
+    rows['bb_pos'] = (close - rows['bb_lower']) / (rows['bb_upper'] - rows['bb_lower'])
+    return rows
+
+
+def row_matches(rows, groups):
+    def value(operand, i):
+        return rows[operand][i] if isinstance(operand, str) else operand
+
+    def holds(c):
+        left, right = value(c.left, -1), value(c.right, -1)
+        if c.op == 'crosses above':
+            return value(c.left, -2) <= value(c.right, -2) and left > right
+        if c.op == 'crosses below':
+            return value(c.left, -2) >= value(c.right, -2) and left < right
+        return bool(COMPARISONS[c.op](left, right))
+
+    return any(all(holds(c) for c in group) for group in groups)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        build_cache(cache_dir)
+        tickers = cached_tickers(cache_dir)
+        last_session = make_daily_bars(1).index[-1]
+
+        t0 = time.perf_counter()
+        rows = {}
+        for ticker in tickers:
+            df = load_bars(cache_path(cache_dir, ticker, '1d'))
+            calculate_indicators(df)
+            if df.index[-1] == last_session:
+                rows[ticker] = last_rows(df)
+        expected = {f: sorted(t for t, r in rows.items() if row_matches(r, parse_filter(f))) for f in FILTERS}
+        loop = time.perf_counter() - t0
+        print(f"loop:   {len(tickers)} tickers, {len(FILTERS)} filters in {loop:.2f} s")
+
+        t0 = time.perf_counter()
+        panel = load_panel(tickers, cache_dir=cache_dir)
+        t1 = time.perf_counter()
+        results = screen(panel, FILTERS[0])
+        t2 = time.perf_counter()
+        print(f"panel:  {len(panel.tickers)} x {len(panel.index)} bars loaded and indicators in "
+              f"{(t1 - t0) * 1000:.0f} ms, first filter {(t2 - t1) * 1000:.1f} ms; "
+              f"{loop / (t2 - t0):.1f}x faster than the loop; "
+              f"{int((~panel.current).sum())} stale tickers skipped")
+
+        for expression in FILTERS:
+            t0 = time.perf_counter()
+            results = screen(panel, expression)
+            elapsed = time.perf_counter() - t0
+            found = sorted(r.ticker for r in results)
+            assert found == expected[expression], (expression, found, expected[expression])
+            top = ", ".join(f"{r.ticker} {r.score:.3f}" for r in results[:3])
+            print(f"filter: {expression!r}: {len(results)} matches in {elapsed * 1000:.1f} ms, same as the loop; "
+                  f"top {top}")
+
+        worst = 0.0
+        for j, ticker in enumerate(panel.tickers):
+            if ticker in rows:
+                for col in INDICATOR_COLUMNS:
+                    a, b = panel.fields[col][-1, j], rows[ticker][col][-1]
+                    assert np.isnan(a) == np.isnan(b), (ticker, col)
+                    if not np.isnan(a):
+                        worst = max(worst, abs(a - b) / max(abs(b), 1.0))
+        print(f"values: last-bar indicators of {len(rows)} tickers match the full-history ones "
+              f"to {worst:.1e} (relative)")
+
+
+if __name__ == "__main__":
+    main()
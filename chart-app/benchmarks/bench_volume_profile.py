@@ -0,0 +1,59 @@
+# benchmarks/bench_volume_profile.py
+"""
+Speed and parity of the vectorized volume profile against the original
+per-row loop from StockChartApp._plot_volume_profile.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_volume_profile
+"""
+import time
+
+import numpy as np
+
+from volume_profile import build_volume_profile
+from benchmarks.synthetic import make_intraday_bars
+
+SIZES = [10_000, 100_000, 200_000]
+BIN_COUNTS = [100, 400, 2000]
+
+
+def legacy_volume_profile(df, num_bins):
+    """The iterrows() implementation the app used before build_volume_profile."""
+    price_min = df['low'].min()
+    price_max = df['high'].max()
+    bin_height = (price_max - price_min) / num_bins
+    volume_profile = [0] * num_bins
+    for index, row in df.iterrows():
+        start_bin = int((row['low'] - price_min) / bin_height)
+        end_bin = int((row['high'] - price_min) / bin_height)
+        start_bin = max(0, min(start_bin, num_bins - 1))
+        end_bin = max(0, min(end_bin, num_bins - 1))
+        if start_bin == end_bin:
+            volume_profile[start_bin] += row['volume']
+        else:
+            vol_per = row['volume'] / (end_bin - start_bin + 1)
+            for i in range(start_bin, end_bin + 1):
+                volume_profile[i] += vol_per
+    return np.array(volume_profile, dtype=float)
+
+
+def main():
+    print(f"{'bars':>8} {'bins':>6} {'legacy':>10} {'vectorized':>12} {'speedup':>9}")
+    for n in SIZES:
+        df = make_intraday_bars(n, freq_minutes=5)
+        low, high, volume = df['low'].to_numpy(), df['high'].to_numpy(), df['volume'].to_numpy()
+        for num_bins in BIN_COUNTS:
+            t0 = time.perf_counter()
+            expected = legacy_volume_profile(df, num_bins)
+            t_legacy = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            _, profile = build_volume_profile(low, high, volume, num_bins)
+            t_new = time.perf_counter() - t0
+
+            np.testing.assert_allclose(profile, expected, rtol=1e-9, atol=1e-6 * expected.max())
+            print(f"{n:>8} {num_bins:>6} {t_legacy * 1000:>8.1f}ms {t_new * 1000:>10.2f}ms {t_legacy / t_new:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_warm_cache.py
+"""
+Watchlist warm-up: one load_history call per series in sequence (what
+opening every ticker in the app amounts to) versus warm_cache with batched
+provider calls on a worker pool.
+
+Uses a stand-in provider with a fixed round-trip latency per request and a
+small per-ticker cost for batched requests. One ticker returns no data to
+check failure reporting, and a second warm-up run checks that current
+series are skipped without any download.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_warm_cache
+"""
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from history_cache import load_history, session_date
+from warm_cache import warm_cache
+from benchmarks.synthetic import make_daily_bars, make_intraday_bars
+
+N_TICKERS = 40
+INTERVALS = ["1d", "1h", "5m"]
+ROUND_TRIP = 0.15 # Seconds per provider request
+PER_TICKER = 0.005 # Extra seconds per ticker in a batched request
+MISSING = "NODATA"
+
+
+class StandInProvider:
+    """Serves deterministic synthetic bars ending at the current session."""
+
+    def __init__(self, today_str):
+        self.today = pd.Timestamp(today_str, tz="US/Eastern")
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._frames = {}
+
+    def _frame(self, ticker, interval):
+        key = (ticker, interval)
+        if key not in self._frames:
+            seed = sum(map(ord, ticker))
+            if interval == "1d":
+                df = make_daily_bars(2_000, seed=seed)
+            else:
+                df = make_intraday_bars(3_000, freq_minutes=60 if interval == "1h" else 5, seed=seed)
+            # Move the series to end at the current session, whole weeks so weekdays stay aligned
+            weeks = (self.today.normalize() - df.index[-1].normalize()).days // 7
+            df.index = df.index + pd.Timedelta(weeks=weeks)
+            df.columns = [c.title() for c in df.columns] # Provider-style column names
+            self._frames[key] = df
+        return self._frames[key]
+
+    def _slice(self, ticker, start, end, interval):
+        if ticker == MISSING:
+            return pd.DataFrame()
+        df = self._frame(ticker, interval)
+        start = pd.Timestamp(start, tz="US/Eastern")
+        end = pd.Timestamp(end, tz="US/Eastern") + pd.Timedelta(days=1)
+        return df[(df.index >= start) & (df.index < end)].copy()
+
+    def _request(self, seconds):
+        with self._lock:
+            self.requests += 1
+        time.sleep(seconds)
+
+    def history(self, ticker, start, end, interval="1d"):
+        self._request(ROUND_TRIP)
+        return self._slice(ticker, start, end, interval)
+
+    def history_batch(self, tickers, start, end, interval="1d"):
+        self._request(ROUND_TRIP + PER_TICKER * len(tickers))
+        out = {t: self._slice(t, start, end, interval) for t in tickers}
+        return {t: df for t, df in out.items() if not df.empty}
+
+
+def main():
+    today_str = session_date()
+    tickers = [f"T{i:03d}" for i in range(N_TICKERS - 1)] + [MISSING]
+    series = len(tickers) * len(INTERVALS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = StandInProvider(today_str)
+        t0 = time.perf_counter()
+        for interval in INTERVALS:
+            for ticker in tickers:
+                load_history(ticker, interval, today_str, Path(tmp) / "serial", fetch=provider.history)
+        t_serial = time.perf_counter() - t0
+        print(f"sequential load_history: {series} series, {provider.requests} requests, {t_serial:.2f}s")
+
+        provider = StandInProvider(today_str)
+        t0 = time.perf_counter()
+        results = warm_cache(tickers, INTERVALS, Path(tmp) / "warm", provider=provider, workers=4,
+                             today_str=today_str)
+        t_warm = time.perf_counter() - t0
+        failed = sorted({r.ticker for r in results if r.error})
+        assert len(results) == series and failed == [MISSING], failed
+        slowest = max(results, key=lambda r: r.seconds)
+        print(f"warm_cache:              {series} series, {provider.requests} requests, {t_warm:.2f}s "
+              f"({t_serial / t_warm:.1f}x), failed: {failed}, slowest {slowest.ticker} {slowest.interval} "
+              f"{slowest.seconds:.2f}s")
+
+        for interval in INTERVALS:
+            a = load_history("T001", interval, today_str, Path(tmp) / "serial", fetch=provider.history)
+            b = load_history("T001", interval, today_str, Path(tmp) / "warm", fetch=provider.history)
+            pd.testing.assert_frame_equal(a, b, check_freq=False)
+
+        provider.requests = 0
+        results = warm_cache(tickers, INTERVALS, Path(tmp) / "warm", provider=provider, today_str=today_str)
+        # Only the ticker without data is retried
+        assert provider.requests == len(INTERVALS), provider.requests
+        print(f"second run:              {provider.requests} requests (current series skipped)")
+
+
+if __name__ == "__main__":
+    main()
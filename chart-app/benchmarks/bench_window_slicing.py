@@ -0,0 +1,64 @@
+# benchmarks/bench_window_slicing.py
+"""
+Time-window filtering: boolean mask plus .copy() (the old
+_filter_data_by_window) versus searchsorted and a positional slice.
+
+Times each variant for every window length on a large 5-minute frame and
+reports the memory it allocates per call.
+
+Run from the chart-app directory:
+    python -m benchmarks.bench_window_slicing
+"""
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from indicators import calculate_indicators
+from benchmarks.synthetic import make_intraday_bars
+
+SIZES = [20_000, 200_000]
+OFFSETS = [("1WK", pd.DateOffset(weeks=1)), ("1M", pd.DateOffset(months=1)), ("1Y", pd.DateOffset(years=1))]
+REPEATS = 20
+
+
+def mask_copy(df, start):
+    return df[df.index >= start].copy()
+
+
+def search_slice(df, start):
+    return df.iloc[df.index.searchsorted(start, side='left'):]
+
+
+def measure(fn, df, start):
+    fn(df, start) # warm up (index caches)
+    t0 = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(df, start)
+    elapsed = (time.perf_counter() - t0) / REPEATS
+    tracemalloc.start()
+    out = fn(df, start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, out
+
+
+def main():
+    print(f"{'bars':>8} {'window':>6} {'rows':>7} {'mask+copy':>10} {'alloc':>8} {'searchsorted':>13} {'alloc':>8}")
+    for n in SIZES:
+        df = make_intraday_bars(n)
+        calculate_indicators(df)
+        for name, offset in OFFSETS:
+            start = df.index[-1] - offset
+            t_mask, mem_mask, expected = measure(mask_copy, df, start)
+            t_slice, mem_slice, actual = measure(search_slice, df, start)
+            pd.testing.assert_frame_equal(actual, expected)
+            # The slice shares memory with the source frame
+            assert np.shares_memory(actual['close'].to_numpy(), df['close'].to_numpy())
+            print(f"{n:>8} {name:>6} {len(actual):>7} {t_mask * 1000:>8.2f}ms {mem_mask / 1e6:>6.1f}MB "
+                  f"{t_slice * 1000:>11.3f}ms {mem_slice / 1e6:>6.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
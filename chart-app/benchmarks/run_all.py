@@ -0,0 +1,283 @@
+# benchmarks/run_all.py
+"""
+Offline benchmark suite: times the chart pipeline on deterministic synthetic
+bars (no network) and writes the results as JSON, so runs can be compared
+between commits.
+
+Stages timed per interval and data size:
+    resample    pyramid level built cold (the _apply_resampling path) and looked up warm
+    indicators  batch calculate_indicators and a one-bar IndicatorEngine update
+    vp          build_volume_profile at 100 and 1000 bins
+    date_axis   compute_date_ticks for the windows drawn from the interval
+    chart       ChartView.build plus a full Agg draw (what update_chart does on a
+                layout change), for the GUI windows drawn from the interval
+    cache       bar store save, load and memory-mapped load
+
+Run from the chart-app directory:
+    python -m benchmarks.run_all --json results.json
+    python -m benchmarks.run_all --quick --compare results.json
+"""
+import argparse
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from bar_store import load_bars, save_bars
+from chart_view import ChartSettings, ChartView, interval_settings
+from date_axis import compute_date_ticks
+from indicators import IndicatorEngine, calculate_indicators
+from pyramid import PyramidCache
+from volume_profile import build_volume_profile
+from benchmarks.synthetic import make_bars
+
+# Bars per dataset; the first size of each interval is the --quick set
+SIZES = {
+    '1d': [1_250, 5_000, 20_000],
+    '1h': [1_500, 10_000],
+    '5m': [5_000, 50_000, 200_000],
+    '1m': [2_000, 20_000],
+}
+# Windows whose bars come from each interval (resample rule from interval_settings)
+WINDOWS = {
+    '1d': ['1Y', '2Y', '5Y', '10Y'],
+    '1h': ['3M', '1M'],
+    '5m': ['1WK'],
+    '1m': ['1D'],
+}
+# Thinly traded minutes: some 1m bars are missing, as in provider data
+MISSING = {'1m': 0.01}
+VP_BINS = [100, 1000]
+REPEATS = 5
+# Shortest timed sample; faster calls are repeated within one sample
+MIN_SAMPLE_S = 0.02
+# Slowdown against the baseline that counts as a regression in --compare
+REGRESSION_RATIO = 1.25
+
+
+def measure(fn: Callable[[], object], repeats: int = REPEATS, setup: Optional[Callable[[], object]] = None) -> Dict:
+    """
+    Times fn repeats times after one warm-up call.
+
+    Without setup, fast calls are looped until one sample takes at least
+    MIN_SAMPLE_S (like timeit's autorange), so sub-millisecond stages do
+    not drown in timer noise.
+
+    Args:
+        fn (callable): Called as fn() or, with setup, fn(setup()); setup time is not counted.
+        repeats (int): Timed samples.
+        setup (callable): Builds fresh input for every call (e.g. a cold cache).
+
+    Returns:
+        dict: best_ms and median_ms per call, repeats and loops per sample.
+    """
+    def make_args():
+        return () if setup is None else (setup(),)
+
+    t0 = time.perf_counter()
+    fn(*make_args()) # Warm-up
+    first = time.perf_counter() - t0
+    loops = 1 if setup is not None else max(1, math.ceil(MIN_SAMPLE_S / max(first, 1e-9)))
+
+    times = []
+    for _ in range(repeats):
+        args = make_args()
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn(*args)
+        times.append((time.perf_counter() - t0) * 1000 / loops)
+    return {'best_ms': min(times), 'median_ms': statistics.median(times), 'repeats': repeats, 'loops': loops}
+
+
+def bench_resample(df, interval, repeats):
+    results = []
+    for window in WINDOWS[interval]:
+        _, rule = interval_settings(window, today=datetime(2025, 12, 31))
+        def cold(cache):
+            cache.store("SYN", interval, df).level(rule)
+        results.append(('resample/cold', {'window': window, 'rule': rule},
+                        measure(cold, repeats, setup=PyramidCache)))
+        cache = PyramidCache()
+        cache.store("SYN", interval, df).level(rule)
+        results.append(('resample/warm', {'window': window, 'rule': rule},
+                        measure(lambda: cache.get("SYN", interval, rule), repeats)))
+    return results
+
+
+def bench_indicators(df, interval, repeats):
+    def seeded():
+        # Engine that has seen every bar but the last one
+        engine = IndicatorEngine()
+        engine.update(df.iloc[:-1])
+        return engine
+    return [
+        ('indicators/batch', {}, measure(lambda: calculate_indicators(df.copy()), repeats)),
+        ('indicators/append_bar', {}, measure(lambda engine: engine.update(df), repeats, setup=seeded)),
+    ]
+
+
+def bench_vp(df, interval, repeats):
+    low, high, volume = df['low'].to_numpy(), df['high'].to_numpy(), df['volume'].to_numpy()
+    return [('vp', {'bins': bins}, measure(lambda: build_volume_profile(low, high, volume, bins), repeats))
+            for bins in VP_BINS]
+
+
+def bench_date_axis(df, interval, repeats):
+    return [('date_axis', {'window': window}, measure(lambda: compute_date_ticks(df.index, window, interval), repeats))
+            for window in WINDOWS[interval]]
+
+
+def bench_chart(df, interval, repeats):
+    results = []
+    cache = PyramidCache()
+    pyramid = cache.store("SYN", interval, df)
+    for window in WINDOWS[interval]:
+        _, rule = interval_settings(window, today=datetime(2025, 12, 31))
+        bars = pyramid.level(rule)
+        settings = ChartSettings(window=window)
+        fig = Figure(figsize=(16, 9), dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        view = ChartView(fig)
+        def build_and_draw():
+            view.build(bars, settings, interval, raw_df=df, company="SYN")
+            canvas.draw()
+        timing = measure(build_and_draw, repeats)
+        results.append(('chart', {'window': window, 'bars_drawn': len(view.chart_df)}, timing))
+    return results
+
+
+def bench_cache(df, interval, repeats):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"SYN_{interval}.bars"
+        save = measure(lambda: save_bars(df, path, attrs={'refreshed': '2025-12-31'}), repeats)
+        load = measure(lambda: load_bars(path), repeats)
+        mmap = measure(lambda: load_bars(path, mmap=True), repeats)
+    return [('cache/save', {}, save), ('cache/load', {}, load), ('cache/load_mmap', {}, mmap)]
+
+
+STAGES = {
+    'resample': bench_resample,
+    'indicators': bench_indicators,
+    'vp': bench_vp,
+    'date_axis': bench_date_axis,
+    'chart': bench_chart,
+    'cache': bench_cache,
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).parent, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run(stages: List[str], quick: bool = False, repeats: int = REPEATS) -> Dict:
+    """
+    Runs the selected stages over every interval and size.
+
+    Returns:
+        dict: {'meta': {...}, 'results': [{'name', 'interval', 'size', 'params', 'best_ms', 'median_ms', 'repeats'}]}
+    """
+    results = []
+    for interval, sizes in SIZES.items():
+        for size in sizes[:1] if quick else sizes:
+            df = make_bars(interval, size, missing=MISSING.get(interval, 0.0))
+            for stage in stages:
+                for name, params, timing in STAGES[stage](df, interval, repeats):
+                    row = {'name': name, 'interval': interval, 'size': size, 'params': params, **timing}
+                    results.append(row)
+                    print(f"{name:<22} {interval:>3} {size:>8} {_fmt_params(params):<28} "
+                          f"best {timing['best_ms']:>9.3f}ms  median {timing['median_ms']:>9.3f}ms", flush=True)
+    meta = {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'quick': quick,
+    }
+    return {'meta': meta, 'results': results}
+
+
+def _fmt_params(params: Dict) -> str:
+    return " ".join(f"{k}={v}" for k, v in params.items())
+
+
+def _key(row: Dict) -> tuple:
+    return (row['name'], row['interval'], row['size'], json.dumps(row['params'], sort_keys=True))
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = REGRESSION_RATIO) -> int:
+    """
+    Prints the best-time ratio of every benchmark present in both runs.
+
+    Returns:
+        int: Number of benchmarks slower than baseline by more than threshold.
+    """
+    old = {_key(r): r for r in baseline['results']}
+    regressions = 0
+    print(f"\ncompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')})")
+    for row in current['results']:
+        base = old.get(_key(row))
+        if base is None or base['best_ms'] <= 0:
+            continue
+        ratio = row['best_ms'] / base['best_ms']
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{row['name']:<22} {row['interval']:>3} {row['size']:>8} {_fmt_params(row['params']):<28} "
+              f"{base['best_ms']:>9.3f}ms -> {row['best_ms']:>9.3f}ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline chart pipeline benchmarks.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated stages (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Smallest size per interval only")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_RATIO,
+                        help="Slowdown ratio that counts as a regression (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    report = run(stages, quick=args.quick, repeats=args.repeats)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# benchmarks/standin_server.py
+import json
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+
+import numpy as np
+
+BARS = 250
+
+
+class StandInServer:
+    """
+    Local HTTP server standing in for a market data API, with a provider's failure modes.
+
+    GET /history/<ticker> answers a JSON list of daily closes after `latency`
+    seconds. With rate_limit, a request arriving when that many were already
+    served within the last second gets 429 (Too Many Requests). fail_rate
+    answers that fraction of the others with 503 (seeded, so runs repeat),
+    and tickers in `hang` take hang_seconds to answer.
+
+    Every accepted request's start time is kept, along with the status
+    counts and the peak number of requests served at once.
+    """
+
+    def __init__(self, latency: float = 0.1, rate_limit: Optional[int] = None, fail_rate: float = 0.0,
+                 hang: Iterable[str] = (), hang_seconds: float = 5.0, seed: int = 0):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.fail_rate = fail_rate
+        self.hang = set(hang)
+        self.hang_seconds = hang_seconds
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.starts = []
+        self.status = {}
+        self.active = 0
+        self.peak_active = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin-http", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def _admit(self) -> int:
+        """Status for a new request: 429 over the rate limit, 503 for injected failures, else 200."""
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if self.rate_limit is not None and len(self._recent) >= self.rate_limit:
+                return 429
+            self._recent.append(now)
+            self.starts.append(now)
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                return 503
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            return 200
+
+    def _handle(self, request: BaseHTTPRequestHandler) -> None:
+        ticker = request.path.rsplit("/", 1)[-1]
+        status = self._admit()
+        with self._lock:
+            self.status[status] = self.status.get(status, 0) + 1
+        if status != 200:
+            request.send_response(status)
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        try:
+            time.sleep(self.hang_seconds if ticker in self.hang else self.latency)
+            rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+            closes = (100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, BARS)))).round(2)
+            body = json.dumps({"ticker": ticker, "close": closes.tolist()}).encode()
+            request.send_response(200)
+            request.send_header("Content-Type", "application/json")
+            request.send_header("Content-Length", str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # The client gave up (timeout)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def max_per_second(self) -> int:
+        """Most requests accepted within any one-second window."""
+        starts = np.array(sorted(self.starts))
+        if len(starts) == 0:
+            return 0
+        return int((np.searchsorted(starts, starts + 1.0, side="left") - np.arange(len(starts))).max())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self.starts = []
+            self.status = {}
+            self.peak_active = self.active
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,245 @@
+# benchmarks/synthetic.py
+import threading
+import time
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.holiday import (AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay,
+                                    USMartinLutherKingJr, USMemorialDay, USPresidentsDay,
+                                    USThanksgivingDay, nearest_workday, sunday_to_monday)
+
+from providers import MarketDataProvider
+
+# Last session of every generated series
+SESSION_END_DATE = "2025-12-31"
+INTRADAY_MINUTES = {'1h': 60, '5m': 5, '1m': 1}
+# Average shares traded per minute of session
+VOLUME_PER_MINUTE = 50_000
+
+
+def make_daily_bars(n_bars: int, seed: int = 42, start_price: float = 100.0) -> pd.DataFrame:
+    """
+    Generates a deterministic random-walk daily OHLCV frame on business days.
+
+    Args:
+        n_bars (int): Number of daily bars.
+        seed (int): RNG seed, so repeated runs produce identical frames.
+        start_price (float): Price of the first close.
+
+    Returns:
+        pd.DataFrame: Lowercase OHLCV columns (plus the provider extras
+                      dividends / stock splits / adj close) on a US/Eastern index.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-12-31", periods=n_bars).tz_localize("US/Eastern")
+
+    returns = rng.normal(0.0003, 0.012, n_bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]]) * (1 + rng.normal(0, 0.003, n_bars))
+    spread = np.abs(rng.normal(0, 0.008, n_bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(1_000_000, 50_000_000, n_bars)
+
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+        'dividends': 0.0,
+        'stock splits': 0.0,
+        'adj close': close,
+    }, index=index)
+
+
+def make_intraday_bars(n_bars: int, freq_minutes: int = 5, seed: int = 42, start_price: float = 100.0) -> pd.DataFrame:
+    """
+    Generates a deterministic intraday OHLCV frame restricted to regular sessions.
+
+    Bars run 09:30-16:00 US/Eastern on business days, so overnight and
+    weekend gaps are present exactly like in provider data.
+
+    Args:
+        n_bars (int): Number of bars.
+        freq_minutes (int): Bar length in minutes (1, 5, 60, ...).
+        seed (int): RNG seed.
+        start_price (float): Price of the first open.
+
+    Returns:
+        pd.DataFrame: Lowercase OHLCV columns on a US/Eastern index.
+    """
+    rng = np.random.default_rng(seed)
+    bars_per_day = max(1, 390 // freq_minutes)
+    n_days = -(-n_bars // bars_per_day)
+    days = pd.bdate_range(end="2025-12-31", periods=n_days)
+    offsets = pd.to_timedelta(570 + np.arange(bars_per_day) * freq_minutes, unit="min")  # 09:30 + k*freq
+    stamps = (days.values[:, None] + offsets.values[None, :]).ravel()[-n_bars:]
+    index = pd.DatetimeIndex(stamps).tz_localize("US/Eastern")
+
+    scale = 0.012 * np.sqrt(freq_minutes / 390)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, scale, n_bars)))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0, scale * 0.6, n_bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(1_000, 500_000, n_bars)
+
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    }, index=index)
+
+
+class _MarketHolidays(AbstractHolidayCalendar):
+    """NYSE full-day closures (Juneteenth from 2022)."""
+    rules = [
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday("Juneteenth", month=6, day=19, start_date="2022-01-01", observance=nearest_workday),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+def trading_days(n_days: int, end: str = SESSION_END_DATE) -> Tuple[pd.DatetimeIndex, np.ndarray]:
+    """
+    The last n_days NYSE sessions up to end, with their closing minute.
+
+    Returns:
+        Tuple[pd.DatetimeIndex, np.ndarray]: Session dates (naive) and close in
+                                             minutes after midnight (960, or 780
+                                             on the early-close days).
+    """
+    # ~252 sessions per 365 days; over-generate and trim
+    start = pd.Timestamp(end) - pd.Timedelta(days=int(n_days * 365 / 250) + 30)
+    holidays = _MarketHolidays().holidays(start, end)
+    days = pd.bdate_range(start, end, freq="C", holidays=holidays)[-n_days:]
+
+    # Early closes (13:00): July 3rd, the day after Thanksgiving and Christmas Eve
+    thanksgiving = pd.DatetimeIndex(USThanksgivingDay.dates(start, end))
+    early = days.isin(thanksgiving + pd.Timedelta(days=1))
+    early |= (days.month == 7) & (days.day == 3)
+    early |= (days.month == 12) & (days.day == 24)
+    return days, np.where(early, 780, 960)
+
+
+def make_bars(interval: str, n_bars: int, seed: int = 42, start_price: float = 100.0,
+              missing: float = 0.0, end: str = SESSION_END_DATE) -> pd.DataFrame:
+    """
+    Generates deterministic OHLCV bars shaped like provider data for an interval.
+
+    Sessions follow the NYSE calendar: no weekends or market holidays, early
+    closes at 13:00, and intraday bars aligned to 09:30 (the last hourly bar
+    of a session is the 15:30 half hour). Returns are scaled to the bar
+    length, and overnight gaps open away from the previous close.
+
+    Args:
+        interval (str): 1d, 1h, 5m or 1m.
+        n_bars (int): Number of bars.
+        seed (int): RNG seed.
+        start_price (float): Price of the first open.
+        missing (float): Fraction of intraday bars dropped at random, as on
+                         thinly traded names (default 0.0 for 1d-5m; use ~0.01 for 1m).
+        end (str): Date of the last session (YYYY-MM-DD); moved back to the
+                   previous session if it is not a trading day.
+
+    Returns:
+        pd.DataFrame: Lowercase OHLCV columns on a US/Eastern index.
+    """
+    rng = np.random.default_rng(seed)
+    if interval == "1d":
+        days, _ = trading_days(n_bars, end)
+        index = days.tz_localize("US/Eastern")
+        minutes = 390
+        session_start = np.ones(n_bars, dtype=bool)
+    else:
+        freq = INTRADAY_MINUTES[interval]
+        per_day = -(-390 // freq)
+        days, closes = trading_days(-(-n_bars // max(1, per_day - 1)) + 1, end)
+        offsets = 570 + np.arange(per_day) * freq # 09:30 + k*freq
+        valid = offsets[None, :] < closes[:, None]
+        minute_of_day = np.broadcast_to(offsets, valid.shape)[valid]
+        day = np.broadcast_to(days.values[:, None], valid.shape)[valid]
+        stamps = day + pd.to_timedelta(minute_of_day, unit="min").values
+        index = pd.DatetimeIndex(stamps[-n_bars:]).tz_localize("US/Eastern")
+        session_start = (minute_of_day == 570)[-n_bars:]
+        minutes = freq
+        if missing > 0:
+            keep = (rng.random(len(index)) >= missing) | session_start
+            index, session_start = index[keep], session_start[keep]
+
+    n = len(index)
+    scale = 0.012 * np.sqrt(minutes / 390)
+    returns = rng.normal(0.0003 * minutes / 390, scale, n)
+    # Overnight gaps: the first bar of a session opens away from the last close
+    gaps = np.where(session_start, rng.normal(0, 0.006, n), 0.0)
+    close = start_price * np.exp(np.cumsum(returns + gaps))
+    prev_close = np.concatenate([[start_price], close[:-1]])
+    open_ = prev_close * np.exp(gaps)
+    spread = np.abs(rng.normal(0, scale * 0.6, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = (rng.lognormal(0, 0.5, n) * VOLUME_PER_MINUTE * minutes).astype(np.int64)
+
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume,
+    }, index=index)
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Offline stand-in for the live provider: synthetic make_bars() series
+    ending at session_end, in provider shape (title-case columns), after a
+    fixed latency per call.
+    """
+
+    # Bars generated per interval (history() then slices by date)
+    BARS = {'1d': 5_000, '1h': 3_500, '5m': 12_000, '1m': 390}
+
+    def __init__(self, session_end: str = SESSION_END_DATE, latency: float = 0.0):
+        self.session_end = session_end
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._frames = {}
+
+    def _series(self, ticker: str, interval: str) -> pd.DataFrame:
+        with self._lock:
+            self.calls += 1
+            key = (ticker, interval)
+            if key not in self._frames:
+                df = make_bars(interval, self.BARS[interval], seed=sum(map(ord, ticker)), end=self.session_end)
+                df.columns = [c.title() for c in df.columns]
+                self._frames[key] = df
+        time.sleep(self.latency)
+        return self._frames[key]
+
+    def history(self, ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+        df = self._series(ticker, interval)
+        lo = pd.Timestamp(start, tz=df.index.tz)
+        hi = pd.Timestamp(end, tz=df.index.tz)
+        return df[(df.index >= lo) & (df.index < hi)].copy()
+
+    def intraday(self, ticker: str, interval: str = "1m") -> pd.DataFrame:
+        df = self._series(ticker, interval)
+        return df[df.index.normalize() == df.index[-1].normalize()].copy()
+
+    def info(self, ticker: str) -> dict:
+        close = self._series(ticker, '1d')['Close']
+        return {'symbol': ticker, 'shortName': f"{ticker} Synthetic Inc.", 'quoteType': 'EQUITY',
+                'previousClose': float(close.iloc[-2]), 'currentPrice': float(close.iloc[-1]),
+                'marketCap': 1e11, 'trailingPE': 25.0}
@@ -0,0 +1,647 @@
+# chart_view.py
+import logging
+from datetime import datetime
+from typing import List, NamedTuple, Optional, Tuple
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import perf
+from date_axis import compute_date_ticks, LONG_TERM_WINDOWS
+from lod import LevelOfDetail
+from renderers import draw_bars, draw_candles
+from volume_profile import build_volume_profile
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = ["10Y", "5Y", "3Y", "2Y", "1Y", "YTD", "6M", "3M", "1M", "1WK", "1D"]
+
+# Moving-average lines: (column, legend label, color)
+MA_LINES = [('ma5', 'MA5', 'yellow'), ('ma20', 'MA20', 'green'), ('ma50', 'MA50', 'purple'),
+            ('ma60', 'MA60', 'cyan'), ('ma100', 'MA100', 'orange'),
+            ('ma120', 'MA120', 'magenta'), ('ma200', 'MA200', 'red')]
+
+
+class ChartSettings(NamedTuple):
+    """Everything the GUI controls that changes how a chart is drawn."""
+    window: str = "1Y"
+    font_size: int = 7
+    mas: Tuple[str, ...] = ('ma5', 'ma20', 'ma50', 'ma100', 'ma200') # Visible MA columns
+    show_bbands: bool = True
+    show_volume: bool = True
+    show_macd: bool = True
+    show_rsi: bool = True
+    show_vp: bool = True
+    vp_bins: int = 100
+    vp_position: str = "Right"
+
+    def layout_key(self) -> tuple:
+        """Settings that need a full figure rebuild when they change."""
+        return (self.window, self.show_macd, self.show_rsi, self.font_size)
+
+
+def interval_settings(window: str, today: Optional[datetime] = None) -> Tuple[str, Optional[str]]:
+    """
+    Returns the download interval and resample rule of a chart window.
+
+    Args:
+        window (str): Chart window (10Y ... 1D).
+        today (datetime): Reference date for YTD (default now).
+
+    Returns:
+        Tuple[str, Optional[str]]: (interval, resample rule or None).
+    """
+    target_interval = "1d"
+    resample_rule = None
+
+    if window == "10Y":
+         target_interval = "1d"
+         resample_rule = "1ME"
+    elif window == "5Y":
+         target_interval = "1d"
+         resample_rule = "1W"
+    elif window == "3Y":
+         target_interval = "1d"
+         resample_rule = "3D"
+    elif window == "2Y":
+        target_interval = "1d"
+        resample_rule = "2D"
+    elif window == "1WK":
+        # Fetch 5m data, but Resample to 10m as requested
+        target_interval = "5m"
+        resample_rule = "10min"
+    elif window == "YTD":
+        # Dynamic interval for YTD
+        today = today or datetime.now()
+        start_year = datetime(today.year, 1, 1)
+        days = (today - start_year).days
+        # Less than ~3 months (90 days) -> Hourly, else Daily
+        if days <= 90:
+             target_interval = "1h"
+        else:
+             target_interval = "1d"
+    elif window == "1D":
+         target_interval = "1m"
+    elif window == "1Y" or window == "6M":
+        target_interval = "1d"
+    elif window == "3M" or window == "1M" or window == "1WK":
+        target_interval = "1h"
+
+    return target_interval, resample_rule
+
+
+def slice_from(df: pd.DataFrame, start_date) -> pd.DataFrame:
+    """Rows of df from start_date on."""
+    # Binary search on the sorted index and a positional slice: O(log n), no
+    # mask and no copy. Callers only read the result (never assign into it).
+    if not df.index.is_monotonic_increasing:
+        return df[df.index >= pd.Timestamp(start_date)]
+    return df.iloc[df.index.searchsorted(pd.Timestamp(start_date), side='left'):]
+
+
+def filter_by_window(df: pd.DataFrame, window: str) -> pd.DataFrame:
+    """Rows of df inside a chart window, counted back from the last bar."""
+    end_date = df.index.max()
+    if window == "10Y": start_date = end_date - pd.DateOffset(years=10)
+    elif window == "5Y": start_date = end_date - pd.DateOffset(years=5)
+    elif window == "3Y": start_date = end_date - pd.DateOffset(years=3)
+    elif window == "2Y": start_date = end_date - pd.DateOffset(years=2)
+    elif window == "1Y": start_date = end_date - pd.DateOffset(years=1)
+    elif window == "YTD":
+        start_date = pd.Timestamp(year=end_date.year, month=1, day=1)
+        if end_date.tz is not None:
+            start_date = start_date.tz_localize(end_date.tz)
+    elif window == "6M": start_date = end_date - pd.DateOffset(months=6)
+    elif window == "3M": start_date = end_date - pd.DateOffset(months=3)
+    elif window == "1M": start_date = end_date - pd.DateOffset(months=1)
+    elif window == "1WK": start_date = end_date - pd.DateOffset(weeks=1)
+    elif window == "1D":
+         # Should be caught by 1m logic, but ensure we don't filter out everything
+         # 1D loads only current day, so filtering is just checking start of day?
+         # Actually if we loaded 1d period, just show all.
+         start_date = df.index.min()
+    else: start_date = df.index.min()
+
+    return slice_from(df, start_date)
+
+
+def session_index(df: pd.DataFrame) -> pd.DatetimeIndex:
+    """Every minute of the regular session (09:30 - 16:00 ET) of df's first bar."""
+    current_date = df.index.min().date()
+    start_ts = pd.Timestamp(f"{current_date} 09:30:00").tz_localize("US/Eastern")
+    end_ts = pd.Timestamp(f"{current_date} 16:00:00").tz_localize("US/Eastern")
+    return pd.date_range(start=start_ts, end=end_ts, freq="1min")
+
+
+class ChartView:
+    """
+    Builds the chart figure (price, volume, indicators, VP, date axis) on
+    any matplotlib Figure.
+
+    Holds no GUI state: the GUI passes its current ChartSettings, and the
+    same code renders headless figures on the Agg backend. build() creates
+    every artist (hidden indicators included); refresh() applies indicator
+    toggles to them without rebuilding.
+    """
+
+    def __init__(self, fig: Figure):
+        self.fig = fig
+        self.chart_artists = {}
+        self.lod = None # Level-of-detail state of the current chart
+        self.axes = {}
+        self.panel_labels = {}
+        self.crosshair_lines = {'vert': [], 'horiz': []}
+        self.crosshair_date_lbl = None
+        self.crosshair_vol_lbl = None
+        self.chart_df = None
+        self.current_df_dates = None
+        self.ax_price = None
+        self.vp_data = None
+        self._vp_bins_drawn = None
+
+    def overlay_artists(self) -> List:
+        """Crosshair lines and labels, hidden until the mouse is dragged."""
+        overlay = self.crosshair_lines['vert'] + self.crosshair_lines['horiz']
+        overlay += [info['label'] for info in self.panel_labels.values()]
+        overlay += [self.crosshair_date_lbl, self.crosshair_vol_lbl]
+        return overlay
+
+    @perf.timed("chart.build")
+    def build(self, history_df: pd.DataFrame, settings: ChartSettings, interval: str,
+              raw_df: Optional[pd.DataFrame] = None, company: str = "",
+              previous_close: float = 0.0, current_price: float = 0.0) -> bool:
+        """
+        Clears the figure and draws a chart of history_df.
+
+        Args:
+            history_df (pd.DataFrame): Resampled bars with indicator columns.
+            settings (ChartSettings): Window, visible indicators, VP, font size.
+            interval (str): Download interval of the bars (for the date axis).
+            raw_df (pd.DataFrame): Un-resampled bars; the volume profile uses them if given.
+            company (str): Name shown in the title.
+            previous_close (float): Reference price of the 1D change (0 = first bar).
+            current_price (float): Quote shown in the 1D title (0 = last bar).
+
+        Returns:
+            bool: False if the window holds no bars and nothing was drawn.
+        """
+        window = settings.window
+
+        # Update Global Font Size
+        base_font_size = settings.font_size
+        matplotlib.rcParams.update({'font.size': base_font_size})
+
+        # Filter Data
+        df = filter_by_window(history_df, window)
+        if df.empty:
+            return False
+
+        # --- 1D Fixed Scale Logic ---
+        if window == "1D":
+             # Force full day index (09:30 - 16:00 ET)
+             try:
+                 # Create Full Index for the date of the data
+                 full_index = session_index(df)
+
+                 # Reindex (Keep existing data, fill rest with NaN)
+                 # This ensures X-axis always spans 09:30 to 16:00
+                 df = df.reindex(full_index)
+             except Exception as e:
+                 logger.warning(f"Failed to apply fixed 1D scale: {e}")
+
+        # Clear Figure
+        if self.lod is not None:
+            self.lod.disconnect()
+        self.fig.clear()
+        self.crosshair_lines = {'vert': [], 'horiz': []} # Reset refs
+        self.chart_artists = {}
+
+        # Determine active layouts
+        panels = ['price']
+        if settings.show_macd: panels.append('macd')
+        if settings.show_rsi: panels.append('rsi')
+
+        num_panels = len(panels)
+
+        # Dynamic Height Ratios (Fixed Weight: Others=15%, Price=Remainder)
+        num_others = num_panels - 1
+        other_weight = 15
+        price_weight = 100 - (other_weight * num_others)
+        ratios = [price_weight] + [other_weight] * num_others
+
+        self._draw_title(df, window, base_font_size, company, previous_close, current_price)
+
+        # Create GridSpec (Adjust top for title)
+        # Increased bottom margin for FHD screens (0.05 -> 0.10)
+        gs = self.fig.add_gridspec(num_panels, 1, height_ratios=ratios, hspace=0.01,
+                                   left=0.05, right=0.95, top=0.94, bottom=0.08)
+
+        axes = {}
+        shared_ax = None
+
+        # Create X-axis index (0, 1, 2...) for Gapless Plotting
+        x_indices = np.arange(len(df))
+        self.current_df_dates = df.index # Store for lookup
+
+        for i, panel_name in enumerate(panels):
+            if i == 0:
+                ax = self.fig.add_subplot(gs[i])
+                shared_ax = ax
+            else:
+                ax = self.fig.add_subplot(gs[i], sharex=shared_ax)
+            axes[panel_name] = ax
+
+            # Remove title
+            ax.set_title("")
+
+            # Tick parameters
+            if i < num_panels - 1:
+                for label in ax.get_xticklabels():
+                    label.set_visible(False)
+                ax.tick_params(axis='x', labelbottom=False)
+
+            # Price Axis on LEFT
+            ax.yaxis.set_label_position("left")
+            ax.yaxis.tick_left()
+
+        # Plot Price
+        ax_price = axes['price']
+
+        # Level of detail: candles, volume and MACD histogram are drawn at most
+        # one per pixel column; lines and the crosshair keep every bar
+        self.lod = LevelOfDetail(ax_price, df, x_indices)
+
+        # All indicator artists are built once (hidden ones included) so that
+        # toggles later only change visibility
+        # Overlay Volume (Bottom 20%)
+        self._plot_volume_overlay(ax_price, df, x_indices)
+
+        self._plot_candles(ax_price, df, x_indices)
+        self._plot_ma(ax_price, df, x_indices)
+        self._plot_bbands(ax_price, df, x_indices)
+
+        # Use RAW High-Res Data for Volume Profile if available
+        # Filter raw_df to match the chart's time window start
+        if raw_df is not None and not raw_df.empty:
+            start_date = df.index.min()
+            self.vp_data = slice_from(raw_df, start_date)
+        else:
+            self.vp_data = df
+        self.chart_artists['vp_axis'] = ax_price.twiny()
+        self.chart_artists['vp'] = []
+        self._vp_bins_drawn = None
+
+        ax_price.grid(True, alpha=0.3)
+        self.chart_df = df
+        self.ax_price = ax_price
+        self.refresh(settings)
+
+        # Plot Other Panels
+        if 'macd' in axes:
+            self._plot_macd(axes['macd'], df, x_indices, base_font_size)
+        if 'rsi' in axes:
+            self._plot_rsi(axes['rsi'], df, x_indices, base_font_size)
+
+        # Format X-Axis on the Bottom Panel
+        bottom_panel = panels[-1]
+        bottom_ax = axes[bottom_panel]
+        self._setup_date_axis(bottom_ax, df, window, interval, base_font_size)
+
+        # Set margins to 0
+        bottom_ax.set_xlim(-0.5, len(df) - 0.5)
+        self.lod.connect() # Re-aggregates on zoom, pan and resize
+
+        # Setup Crosshair Labels (Hidden by default)
+        # One Y-label per panel
+        self.panel_labels = {}
+        for name, ax in axes.items():
+             lbl = ax.text(1.01, 0.5, "", transform=ax.transAxes,
+                           color='black', bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='black'), ha='left',
+                           fontsize=base_font_size)
+             lbl.set_visible(False)
+             self.panel_labels[ax] = {'label': lbl, 'name': name}
+
+        # Date Label (Always on Price panel top)
+        self.crosshair_date_lbl = ax_price.text(0.5, 1.01, "", transform=ax_price.transAxes,
+                                                color='black', ha='center', fontsize=base_font_size,
+                                                bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='none'))
+        self.crosshair_date_lbl.set_visible(False)
+
+        # Volume Label (Moved to Bottom Right of Bottom Panel)
+        self.crosshair_vol_lbl = bottom_ax.text(0.99, 0.02, "", transform=bottom_ax.transAxes,
+                                               color='black', ha='right', va='bottom', fontsize=base_font_size, fontweight='bold',
+                                               bbox=dict(boxstyle='round', facecolor='white', alpha=0.8, edgecolor='none'))
+        self.crosshair_vol_lbl.set_visible(False)
+
+        # Init value for lines (non-zero to avoid autoscaling issues)
+        init_price = df['close'].iloc[-1]
+
+        for ax in axes.values():
+            # Vertical Line (shared x)
+            vl = ax.axvline(x=len(df)-1, color='red', lw=0.5, visible=False)
+            self.crosshair_lines['vert'].append(vl)
+
+            # Horizontal Line (per axis)
+            curr_y = init_price if ax == ax_price else 0
+            hl = ax.axhline(y=curr_y, color='red', lw=0.5, visible=False)
+            self.crosshair_lines['horiz'].append(hl)
+
+        self.axes = axes
+        return True
+
+    @perf.timed("chart.update_tail")
+    def update_tail(self, history_df: pd.DataFrame, settings: ChartSettings, first_changed: int,
+                    raw_df: Optional[pd.DataFrame] = None, company: str = "",
+                    previous_close: float = 0.0, current_price: float = 0.0) -> bool:
+        """
+        Updates a built 1D chart in place after bars were revised or appended.
+
+        The 1D x axis always spans the whole session, so new minutes only fill
+        slots that already exist: line data, the LOD collections, the volume
+        profile, limits and title are updated, and the figure, axes, ticks and
+        crosshair artists are kept.
+
+        Args:
+            history_df (pd.DataFrame): All bars of the session with indicator columns.
+            settings (ChartSettings): Current settings (same layout as the built chart).
+            first_changed (int): First row of history_df that differs from the drawn bars.
+            raw_df, company, previous_close, current_price: As for build().
+
+        Returns:
+            bool: False if the chart cannot be updated in place (not 1D, or another
+            session) and build() is needed.
+        """
+        if settings.window != "1D" or self.chart_df is None or history_df.empty:
+            return False
+        full_index = session_index(history_df)
+        if not full_index.equals(self.current_df_dates):
+            return False
+
+        df = history_df.reindex(full_index)
+        # Bars outside the regular session never reach the chart
+        first_slot = int(full_index.searchsorted(history_df.index[min(first_changed, len(history_df) - 1)]))
+        if first_slot >= len(df):
+            return True
+
+        for col, _, _ in MA_LINES:
+            self.chart_artists[col].set_ydata(df[col])
+        upper, lower, fill = self.chart_artists['bbands']
+        upper.set_ydata(df['bb_upper'])
+        lower.set_ydata(df['bb_lower'])
+        fill.remove()
+        fill = self.ax_price.fill_between(np.arange(len(df)), df['bb_upper'], df['bb_lower'], color='gray', alpha=0.1)
+        fill.set_visible(upper.get_visible())
+        self.chart_artists['bbands'] = [upper, lower, fill]
+        if 'macd_lines' in self.chart_artists:
+            for line, col in zip(self.chart_artists['macd_lines'], ['macd', 'signal']):
+                line.set_ydata(df[col])
+        if 'rsi_line' in self.chart_artists:
+            self.chart_artists['rsi_line'].set_ydata(df['rsi'])
+
+        # Candles, volume and the MACD histogram are re-aggregated for the current view
+        hist = (df['macd'] - df['signal']).to_numpy()
+        self.lod.update(df, [hist])
+        # Indicator panels rescale to the new values (the x range stays the session)
+        for name in ['macd', 'rsi']:
+            ax = self.axes.get(name)
+            if ax is not None:
+                ax.relim()
+                finite = hist[np.isfinite(hist)]
+                if name == 'macd' and len(finite):
+                    ax.update_datalim([(0, finite.min()), (0, finite.max())])
+                ax.autoscale_view(scalex=False)
+        max_vol = float(df['volume'].max()) # uint32 volume would wrap when scaled
+        if max_vol > 0:
+            self.chart_artists['volume_axis'].set_ylim(0, max_vol * 4)
+
+        if raw_df is not None and not raw_df.empty:
+            self.vp_data = slice_from(raw_df, df.index.min())
+        else:
+            self.vp_data = df
+        self._vp_bins_drawn = None # Redraw the profile with the new bars
+        self.chart_df = df
+        self._draw_title(df, settings.window, settings.font_size, company, previous_close, current_price)
+        self.refresh(settings)
+        return True
+
+    @perf.timed("chart.refresh")
+    def refresh(self, settings: ChartSettings) -> None:
+        """Applies indicator toggles to the retained artists of the current chart."""
+        df = self.chart_df
+        ax_price = self.ax_price
+        base_font_size = settings.font_size
+
+        for col, _, _ in MA_LINES:
+            self.chart_artists[col].set_visible(col in settings.mas)
+        for artist in self.chart_artists['bbands']:
+            artist.set_visible(settings.show_bbands)
+        self.chart_artists['volume_axis'].set_visible(settings.show_volume)
+
+        # Volume Profile: recompute only when the bin count changed
+        ax_vp = self.chart_artists['vp_axis']
+        ax_vp.set_visible(settings.show_vp)
+        if settings.show_vp:
+            num_bins = settings.vp_bins
+            if num_bins != self._vp_bins_drawn:
+                for artist in self.chart_artists['vp']:
+                    artist.remove()
+                self.chart_artists['vp'] = self._plot_volume_profile(ax_price, self.vp_data, ax_vp, num_bins) or []
+                self._vp_bins_drawn = num_bins
+            # Position only flips the direction of the volume axis
+            left, right = sorted(ax_vp.get_xlim())
+            if settings.vp_position == "Right":
+                ax_vp.set_xlim(right, left)
+            else:
+                ax_vp.set_xlim(left, right)
+
+        # Legend lists only the visible MAs
+        legend = ax_price.get_legend()
+        if legend is not None:
+            legend.remove()
+        visible_ma = [self.chart_artists[col] for col, _, _ in MA_LINES if col in settings.mas]
+        if visible_ma:
+             ax_price.legend(handles=visible_ma, loc='upper left', prop={'size': base_font_size},  bbox_to_anchor=(0.02, 0.98), ncol=2)
+
+        # Calculate Price Limits explicitly to avoid 0 artefacts
+        y_min = df['low'].min()
+        y_max = df['high'].max()
+
+        # Include BBands in range if shown
+        if settings.show_bbands and 'bb_upper' in df.columns:
+            y_max = max(y_max, df['bb_upper'].max())
+            y_min = min(y_min, df['bb_lower'].min())
+
+        # Include MAs in range if shown (Fix for long-term charts)
+        for col, _, _ in MA_LINES:
+            if col in settings.mas and col in df.columns:
+                 # Filter out NaN/Inf which might happen with rolling averages at start
+                 valid_ma = df[col].dropna()
+                 if not valid_ma.empty:
+                     y_max = max(y_max, valid_ma.max())
+                     y_min = min(y_min, valid_ma.min())
+
+        # Add padding
+        pad = (y_max - y_min) * 0.05
+        ax_price.set_ylim(y_min - pad, y_max + pad)
+
+    def _draw_title(self, df, window, font_size, company, previous_close, current_price):
+        # Calculate Stats (Handle NaNs from Reindexing)
+        valid_closes = df['close'].dropna()
+        if not valid_closes.empty:
+            start_price = valid_closes.iloc[0]
+            end_price = valid_closes.iloc[-1]
+
+            # Use Previous Close for 1D Daily Change
+            if window == "1D":
+                if previous_close > 0: start_price = previous_close
+                if current_price > 0: end_price = current_price
+        else:
+            start_price = 0.0
+            end_price = 0.0
+
+        change = end_price - start_price
+        pct_change = (change / start_price) * 100 if start_price != 0 else 0
+        sign = "+" if change >= 0 else ""
+        color = "green" if change >= 0 else "red"
+
+        # Draw Titles (1-Liner); an existing title is updated
+        title_text = f"{company} ({window})   {end_price:.2f} {sign}{change:.2f} ({sign}{pct_change:.2f}%)"
+        if window == "1D":
+             title_text += "   (15min Delayed)"
+        self.fig.suptitle(title_text, fontsize=font_size+4, fontweight='bold', color=color, y=0.98)
+
+    @perf.timed("chart.date_axis")
+    def _setup_date_axis(self, ax, df, window, interval, font_size):
+        # Tick positions come from vectorized change detection; only the kept
+        # ticks are formatted
+        is_long_term = window in LONG_TERM_WINDOWS
+        major_indices, major_labels, minor_indices, minor_labels = compute_date_ticks(
+            df.index, window, interval)
+
+        # Apply Major Ticks
+        ax.set_xticks(major_indices)
+        ax.set_xticklabels(major_labels, fontsize=font_size, fontweight='bold')
+
+        # Apply Minor Ticks
+        if is_long_term:
+            ax.set_xticks(minor_indices, minor=True)
+            ax.set_xticklabels(minor_labels, minor=True, fontsize=font_size-2)
+            # Ticks styling
+            ax.tick_params(axis='x', which='major', length=15, width=1.5, pad=5) # Years lower
+            ax.tick_params(axis='x', which='minor', length=8, width=1) # Months
+        else:
+             # Short term / Hourly
+             ax.set_xticks([], minor=True)
+             ax.tick_params(axis='x', which='major', length=8, width=1) # Standard
+
+        # Enable Grid for Intraday/Short Term (User Request)
+        if window in ["1D", "1WK", "1M"]:
+            ax.grid(True, linestyle='--', alpha=0.3)
+
+    def _plot_candles(self, ax, df, x_indices):
+        # Bodies and wicks are one collection each instead of a patch per candle
+        bars = self.lod.bars()
+        wicks, bodies = draw_candles(ax, bars.x, bars.open, bars.high, bars.low, bars.close, width=bars.width)
+        self.lod.track_candles(wicks, bodies)
+
+    def _plot_ma(self, ax, df, x_indices):
+        # Every MA line is created; visibility is applied by refresh()
+        for col, label, color in MA_LINES:
+            line, = ax.plot(x_indices, df[col], label=label, color=color, linewidth=0.8, alpha=0.9)
+            self.chart_artists[col] = line
+
+    def _plot_bbands(self, ax, df, x_indices):
+        upper, = ax.plot(x_indices, df['bb_upper'], color='gray', linestyle='--', alpha=0.5, linewidth=0.8)
+        lower, = ax.plot(x_indices, df['bb_lower'], color='gray', linestyle='--', alpha=0.5, linewidth=0.8)
+        fill = ax.fill_between(x_indices, df['bb_upper'], df['bb_lower'], color='gray', alpha=0.1)
+        self.chart_artists['bbands'] = [upper, lower, fill]
+
+    def _plot_volume_overlay(self, ax, df, x_indices):
+        ax_vol = ax.twinx()
+        bars = self.lod.bars()
+        vol_bars = draw_bars(ax_vol, bars.x, bars.volume, bars.close >= bars.open, bars.width, alpha=0.3)
+        self.lod.track_volume(vol_bars, alpha=0.3)
+
+        # Scale Volume to Bottom 25%
+        max_vol = float(df['volume'].max()) # uint32 volume would wrap when scaled
+        if max_vol > 0:
+            ax_vol.set_ylim(0, max_vol * 4)
+
+        ax_vol.set_yticks([]) # Hide ticks
+        ax_vol.set_zorder(0) # Behind
+        ax.set_zorder(1)
+        ax.patch.set_visible(False)
+        self.chart_artists['volume_axis'] = ax_vol
+
+    def _plot_macd(self, ax, df, x_indices, font_size):
+        macd, = ax.plot(x_indices, df['macd'], color='blue', label='MACD')
+        signal, = ax.plot(x_indices, df['signal'], color='orange', label='Signal')
+        self.chart_artists['macd_lines'] = [macd, signal]
+        hist = (df['macd'] - df['signal']).to_numpy()
+        hist_x, hist_heights, hist_width = self.lod.histogram(hist)
+        hist_bars = draw_bars(ax, hist_x, hist_heights, hist_heights >= 0, width=hist_width)
+        self.lod.track_histogram(hist_bars, hist)
+        ax.grid(True, alpha=0.3)
+        ax.set_ylabel("") # Remove left title
+        ax.legend(loc='upper left', prop={'size': font_size})
+
+    def _plot_rsi(self, ax, df, x_indices, font_size):
+        self.chart_artists['rsi_line'], = ax.plot(x_indices, df['rsi'], color='purple')
+        ax.axhline(70, color='red', linestyle='--', alpha=0.5)
+        ax.axhline(30, color='green', linestyle='--', alpha=0.5)
+        ax.grid(True, alpha=0.3)
+        ax.set_ylabel("") # Remove left title
+        # Inner Title at Bottom Left
+        ax.text(0.02, 0.05, "RSI", transform=ax.transAxes, fontweight='bold', fontsize=font_size, color='purple')
+
+    @perf.timed("chart.volume_profile")
+    def _plot_volume_profile(self, ax, df, ax_vp, num_bins):
+        # Standard VP: Price on Y (shared with the price axis), Volume on X (twiny)
+
+        # Vectorized binning (difference array over each bar's bin range)
+        bins, volume_profile = build_volume_profile(df['low'].to_numpy(), df['high'].to_numpy(),
+                                                    df['volume'].to_numpy(), num_bins)
+        if len(volume_profile) == 0: return []
+
+        # Two step artists instead of one Rectangle per bin, so 1000+ bins stay cheap
+        fill = ax_vp.stairs(volume_profile, bins, orientation='horizontal', fill=True, alpha=0.2, color='blue')
+        edge = ax_vp.stairs(volume_profile, bins, orientation='horizontal', alpha=0.2, color='blue', linewidth=0.5)
+        ax_vp.set_xticklabels([])
+        ax_vp.tick_params(left=False, labelleft=False, right=False, labelright=False, top=False, labeltop=False, bottom=False, labelbottom=False)
+        ax_vp.grid(False)
+
+        # Ensure Main Axis is on TOP to capture events
+        ax_vp.set_zorder(0)
+        ax.set_zorder(1)
+        ax.patch.set_visible(False) # Transparent background to see VP behind
+
+        # Limit VP width to 1/4 of the span
+        max_vol = volume_profile.max()
+        if max_vol > 0:
+            ax_vp.set_xlim(0, max_vol * 4)
+
+        # Left/Right placement is applied by refresh()
+        return [fill, edge]
+
+
+def render_chart(history_df: pd.DataFrame, settings: ChartSettings, interval: str, path,
+                 raw_df: Optional[pd.DataFrame] = None, company: str = "", previous_close: float = 0.0,
+                 current_price: float = 0.0, figsize: Tuple[float, float] = (16, 9), dpi: int = 100) -> bool:
+    """
+    Draws a chart on an off-screen Agg figure and saves it (PNG/SVG by extension).
+
+    Returns:
+        bool: False if the window holds no bars and no file was written.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    view = ChartView(fig)
+    if not view.build(history_df, settings, interval, raw_df=raw_df, company=company,
+                      previous_close=previous_close, current_price=current_price):
+        return False
+    fig.savefig(path)
+    view.lod.disconnect()
+    return True
@@ -0,0 +1,70 @@
+# crosshair.py
+import time
+from collections import deque
+from typing import Iterable
+
+import perf
+
+# Number of recent frames kept for frame-time statistics
+FRAME_HISTORY = 120
+
+
+class BlitManager:
+    """
+    Redraws a small set of overlay artists on top of a cached chart background.
+
+    The overlay artists are marked animated, so a normal canvas draw renders
+    everything else and skips them. After every full draw the rendered
+    background is captured. A crosshair update then restores that bitmap,
+    draws only the overlay artists and blits the result, so its cost does not
+    depend on how many candles, lines or profile bins are on the chart.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._artists = []
+        self._background = None
+        self.frame_times = deque(maxlen=FRAME_HISTORY)
+        self._cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    @property
+    def supported(self) -> bool:
+        return getattr(self.canvas, 'supports_blit', False)
+
+    def set_artists(self, artists: Iterable) -> None:
+        """Replaces the overlay artists (called after every chart rebuild)."""
+        self._artists = list(artists)
+        self._background = None
+        for a in self._artists:
+            a.set_animated(self.supported)
+
+    def _on_draw(self, event) -> None:
+        fig = self.canvas.figure
+        self._background = self.canvas.copy_from_bbox(fig.bbox)
+        self._draw_overlay()
+        perf.frame()
+
+    def _draw_overlay(self) -> None:
+        fig = self.canvas.figure
+        for a in self._artists:
+            if a.get_visible() and a.figure is fig:
+                fig.draw_artist(a)
+
+    def update(self) -> None:
+        """Shows the current state of the overlay artists."""
+        t0 = time.perf_counter()
+        if not self.supported or self._background is None:
+            # No cached background yet (or backend cannot blit): fall back to a full redraw
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_overlay()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.frame_times.append(time.perf_counter() - t0)
+        perf.frame()
+
+    def mean_frame_time(self) -> float:
+        """Average seconds per overlay frame over the recent history (0 if none)."""
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
@@ -0,0 +1,100 @@
+# date_axis.py
+import calendar
+from typing import List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+LONG_TERM_WINDOWS = ("10Y", "5Y", "3Y", "2Y")
+QUARTER_MONTHS = (1, 4, 7, 10)
+
+# Long-term year ticks within this many bars of the left edge are dropped
+# (they would only mark the tail of the previous year)
+YEAR_EDGE_BARS = 5
+
+# Same names strftime's %b / %a produce (both follow the current locale)
+MONTH_ABBR = list(calendar.month_abbr)
+DAY_ABBR = list(calendar.day_abbr)
+
+
+class DateTicks(NamedTuple):
+    major_indices: np.ndarray
+    major_labels: List[str]
+    minor_indices: np.ndarray
+    minor_labels: List[str]
+
+
+def _changes(values: np.ndarray) -> np.ndarray:
+    """Positions where values differ from the previous element (the first one always counts)."""
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+
+
+def compute_date_ticks(dates: pd.DatetimeIndex, window: str, interval: str) -> DateTicks:
+    """
+    Tick positions and labels for the gapless (bar index) x axis.
+
+    Boundaries are found by comparing the hour/day/month/year arrays with
+    themselves shifted by one bar. Only the bars that become ticks are
+    formatted, from those field arrays rather than with per-bar strftime.
+
+    Args:
+        dates (pd.DatetimeIndex): Timestamps of the plotted bars.
+        window (str): Time window ("1D", "1WK", "3M", "10Y", ...).
+        interval (str): Data interval of the bars ("1m", "1h", "1d", ...).
+
+    Returns:
+        DateTicks: Major and minor tick indices and labels.
+    """
+    empty = np.empty(0, dtype=np.int64)
+
+    # --- 1D MODE (Minute Data): one tick per hour ---
+    if window == "1D":
+        hours = np.asarray(dates.hour)
+        idx = _changes(hours)
+        minutes = np.asarray(dates.minute)[idx]
+        labels = [f"{h:02d}:{m:02d}" for h, m in zip(hours[idx].tolist(), minutes.tolist())]
+        return DateTicks(idx, labels, empty, [])
+
+    months = np.asarray(dates.month)
+
+    # --- HOURLY MODE (Day Grid): one tick per day ---
+    if interval == '1h' or window == "1WK":
+        days = np.asarray(dates.day)
+        idx = _changes(days)
+        tick_days = days[idx]
+        tick_months = months[idx]
+        new_month = np.r_[True, tick_months[1:] != tick_months[:-1]] if len(idx) else np.empty(0, dtype=bool)
+
+        if window == "3M":
+            # Sparse Labels: Month Name on change, else Day Num on Mondays
+            monday = np.asarray(dates.weekday)[idx] == 0
+            labels = [f"{MONTH_ABBR[m]} {d:02d}" if first else (str(d) if mon else "")
+                      for m, d, first, mon in zip(tick_months.tolist(), tick_days.tolist(),
+                                                  new_month.tolist(), monday.tolist())]
+        elif window in ["1M", "YTD"]:
+            # Month + Day
+            labels = [f"{MONTH_ABBR[m]} {d:02d}" if first else f"{d:02d}"
+                      for m, d, first in zip(tick_months.tolist(), tick_days.tolist(), new_month.tolist())]
+        else:
+            # 1WK: Full Detail
+            weekdays = np.asarray(dates.weekday)[idx]
+            labels = [f"{DAY_ABBR[w]} {d:02d}" for w, d in zip(weekdays.tolist(), tick_days.tolist())]
+        return DateTicks(idx, labels, empty, [])
+
+    # --- DAILY/LONG TERM MODE ---
+    month_idx = _changes(months)
+
+    if window not in LONG_TERM_WINDOWS:
+        # Short Term (Daily): Major Ticks = Month Names
+        return DateTicks(month_idx, [MONTH_ABBR[m] for m in months[month_idx].tolist()], empty, [])
+
+    years = np.asarray(dates.year)
+    year_idx = _changes(years)
+    year_idx = year_idx[year_idx > YEAR_EDGE_BARS]
+
+    if window in ["10Y", "5Y"]: # Show Quarters
+        month_idx = month_idx[np.isin(months[month_idx], QUARTER_MONTHS)]
+    return DateTicks(year_idx, [str(y) for y in years[year_idx].tolist()],
+                     month_idx, [f"{m:02d}" for m in months[month_idx].tolist()])
@@ -0,0 +1,347 @@
+# fetch_orchestrator.py
+import asyncio
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import perf
+
+logger = logging.getLogger(__name__)
+
+# Environment switches for get_orchestrator()
+CONCURRENCY_ENV = "CHART_FETCH_CONCURRENCY"
+RATE_ENV = "CHART_FETCH_RATE"       # Requests per second per host (0 = unlimited)
+BURST_ENV = "CHART_FETCH_BURST"
+TIMEOUT_ENV = "CHART_FETCH_TIMEOUT" # Seconds per attempt
+RETRIES_ENV = "CHART_FETCH_RETRIES"
+
+DEFAULT_CONCURRENCY = 4
+# Yahoo starts answering 429 after sustained bursts; a short burst keeps interactive loads instant
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 5
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# Latencies kept for the percentiles
+LATENCY_HISTORY = 512
+
+
+class RetryPolicy(NamedTuple):
+    retries: int = DEFAULT_RETRIES    # Attempts after the first
+    timeout: float = DEFAULT_TIMEOUT  # Seconds per attempt (0 = none)
+    base_delay: float = BACKOFF_BASE
+    max_delay: float = BACKOFF_MAX
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds before retry number attempt (1-based): doubling per attempt, jittered to 50-100%."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+
+class TokenBucket:
+    """
+    Request rate limit of one host: `rate` tokens per second, up to `burst` saved up.
+
+    Used from the orchestrator's event loop thread only, so it needs no lock.
+    Callers reserve a token and sleep until it is due, which keeps them in
+    arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Takes a token; returns the seconds until it may be used (0 if one was available)."""
+        if self.rate <= 0:
+            return 0.0
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> float:
+        """Waits for a token; returns the seconds waited."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+def _percentiles(values) -> str:
+    if not values:
+        return "-"
+    p50, p95 = np.percentile(np.fromiter(values, dtype=float), [50, 95]) * 1000
+    return f"p50 {p50:.0f} / p95 {p95:.0f} ms"
+
+
+class FetchOrchestrator:
+    """
+    Runs every provider request under one set of limits.
+
+    An asyncio event loop on a background thread schedules the requests:
+    at most `concurrency` run at once (across all callers: chart loads,
+    grid tiles, warm_cache batches, metadata), each host gets a token bucket,
+    a failed or timed-out attempt is retried after a jittered exponential
+    backoff, and a request fails once its retries are used up.
+
+    Blocking callables (yfinance) run on a pool with one thread per
+    concurrency slot; coroutine functions are awaited on the loop. A
+    blocking attempt that times out cannot be interrupted: its result is
+    dropped, and its slot only frees up once the call returns, so the cap
+    always holds.
+
+    Callers on ordinary threads use run() and map(); coroutines can await
+    fetch() on the orchestrator's loop.
+
+    The limits hold within one process. Worker processes that fetch each
+    need their own orchestrator with a share of them (orchestrator_from_env).
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+                 burst: int = DEFAULT_BURST, retry: RetryPolicy = RetryPolicy()):
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.burst = burst
+        self.retry = retry
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fetch-call")
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock() # stats and latencies, read from other threads
+        self.stats = {'requests': 0, 'attempts': 0, 'retries': 0, 'timeouts': 0, 'failed': 0}
+        # Requests waiting for a slot, for their host's rate limit, sleeping before a retry, and running
+        self.depth = {'queued': 0, 'throttled': 0, 'backoff': 0, 'in_flight': 0}
+        self._waits = deque(maxlen=LATENCY_HISTORY)    # Submit -> first attempt starts
+        self._latencies = deque(maxlen=LATENCY_HISTORY) # Submit -> result, retries included
+
+        self._loop = asyncio.new_event_loop()
+        self._slots = None
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="fetch-loop", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._slots = asyncio.Semaphore(self.concurrency) # Bound to this loop
+        ready.set()
+        self._loop.run_forever()
+
+    def bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def fetch(self, host: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Calls func(*args, **kwargs) under the limits, on the orchestrator's loop.
+
+        Args:
+            host (str): Rate limit bucket (the server the call talks to).
+            func (callable): Blocking function or coroutine function.
+
+        Returns:
+            The call's result.
+
+        Raises:
+            The last attempt's exception (asyncio.TimeoutError on a timeout).
+        """
+        submitted = time.perf_counter()
+        with self._lock:
+            self.stats['requests'] += 1
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(host, func, args, kwargs, submitted if attempt == 0 else None)
+            except Exception as e:
+                attempt += 1
+                with self._lock:
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.stats['timeouts'] += 1
+                    if attempt > self.retry.retries:
+                        self.stats['failed'] += 1
+                        raise
+                    self.stats['retries'] += 1
+                delay = self.retry.backoff(attempt)
+                logger.warning(f"{host} request failed ({type(e).__name__}: {e}), "
+                               f"retry {attempt}/{self.retry.retries} in {delay:.1f}s")
+            self.depth['backoff'] += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.depth['backoff'] -= 1
+
+    async def _attempt(self, host, func, args, kwargs, submitted: Optional[float]) -> Any:
+        self.depth['queued'] += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.depth['queued'] -= 1
+        released = False
+        try:
+            self.depth['throttled'] += 1
+            try:
+                await self.bucket(host).acquire()
+            finally:
+                self.depth['throttled'] -= 1
+            if submitted is not None:
+                wait = time.perf_counter() - submitted
+                with self._lock:
+                    self._waits.append(wait)
+                recorder = perf.get_recorder()
+                if recorder is not None:
+                    recorder.record("fetch.wait", wait, {'host': host})
+            with self._lock:
+                self.stats['attempts'] += 1
+            timeout = self.retry.timeout or None
+
+            if asyncio.iscoroutinefunction(func):
+                self.depth['in_flight'] += 1
+                try:
+                    return await asyncio.wait_for(func(*args, **kwargs), timeout)
+                finally:
+                    self.depth['in_flight'] -= 1
+            call = self._loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+            # The slot is handed to the call: freed when it returns, even after a timeout
+            self.depth['in_flight'] += 1
+            call.add_done_callback(self._call_done)
+            released = True
+            return await asyncio.wait_for(asyncio.shield(call), timeout)
+        finally:
+            if not released:
+                self._slots.release()
+
+    def _call_done(self, call: asyncio.Future) -> None:
+        self.depth['in_flight'] -= 1
+        self._slots.release()
+        if not call.cancelled():
+            call.exception() # Retrieved, so an abandoned call's error is not reported as unhandled
+
+    async def _timed_fetch(self, host: str, func: Callable, args, kwargs) -> Any:
+        t0 = time.perf_counter()
+        try:
+            return await self.fetch(host, func, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._latencies.append(time.perf_counter() - t0)
+
+    def run(self, host: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        fetch() from an ordinary thread: blocks until the call returns or fails.
+
+        Raises:
+            RuntimeError: If called on the orchestrator's own loop thread.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("run() would block the fetch loop; await fetch() instead")
+        return asyncio.run_coroutine_threadsafe(self._timed_fetch(host, func, args, kwargs), self._loop).result()
+
+    def map(self, host: str, func: Callable, calls: Iterable[Sequence]) -> List[Any]:
+        """
+        Runs func(*args) for every args in calls concurrently, within the limits.
+
+        Returns:
+            List: One result per call, in order; a call that failed for good
+                  gives its exception instead of a result.
+        """
+        async def gather():
+            return await asyncio.gather(*(self._timed_fetch(host, func, args, {}) for args in calls),
+                                        return_exceptions=True)
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("map() would block the fetch loop; await fetch() instead")
+        return asyncio.run_coroutine_threadsafe(gather(), self._loop).result()
+
+    def latency(self) -> Dict[str, List[float]]:
+        """Recent queue waits and end-to-end latencies (seconds)."""
+        with self._lock:
+            return {'wait': list(self._waits), 'total': list(self._latencies)}
+
+    def summary(self) -> str:
+        """One line for logs and the performance HUD."""
+        with self._lock:
+            s = dict(self.stats)
+            waits, latencies = list(self._waits), list(self._latencies)
+        d = self.depth
+        return (f"{s['requests']} requests ({s['retries']} retries, {s['timeouts']} timeouts, {s['failed']} failed), "
+                f"queue {d['queued']} / throttled {d['throttled']} / backoff {d['backoff']} / "
+                f"in flight {d['in_flight']}; wait {_percentiles(waits)}, latency {_percentiles(latencies)}")
+
+    def close(self) -> None:
+        """Stops the loop; requests still running are abandoned."""
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=1)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_orchestrator: Optional[FetchOrchestrator] = None
+_orchestrator_lock = threading.Lock()
+
+
+def _env_number(name: str, default, cast):
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Ignoring {name}={value!r}: not a number")
+        return default
+
+
+def orchestrator_from_env(processes: int = 1) -> FetchOrchestrator:
+    """
+    Builds an orchestrator configured from the CHART_FETCH_* variables.
+
+    The variables set the limits of the whole program. With several
+    processes fetching at once, each gets an even share of the rate, so
+    together they stay within it, and of the concurrency and burst, which
+    round down but never below one per process.
+
+    Args:
+        processes (int): Number of processes sharing the limits.
+    """
+    processes = max(1, processes)
+    retry = RetryPolicy(retries=_env_number(RETRIES_ENV, DEFAULT_RETRIES, int),
+                        timeout=_env_number(TIMEOUT_ENV, DEFAULT_TIMEOUT, float))
+    orchestrator = FetchOrchestrator(
+        concurrency=max(1, _env_number(CONCURRENCY_ENV, DEFAULT_CONCURRENCY, int) // processes),
+        rate=_env_number(RATE_ENV, DEFAULT_RATE, float) / processes,
+        burst=max(1, _env_number(BURST_ENV, DEFAULT_BURST, int) // processes),
+        retry=retry)
+    share = f" (1/{processes} of the limits)" if processes > 1 else ""
+    logger.info(f"Fetch limits{share}: {orchestrator.concurrency} at once, "
+                f"{orchestrator.rate:g}/s per host (burst {orchestrator.burst}), "
+                f"{retry.retries} retries, {retry.timeout:g}s timeout")
+    return orchestrator
+
+
+def get_orchestrator() -> FetchOrchestrator:
+    """The process's shared orchestrator, configured from the CHART_FETCH_* variables on first use."""
+    global _orchestrator
+    with _orchestrator_lock:
+        if _orchestrator is None:
+            _orchestrator = orchestrator_from_env()
+        return _orchestrator
+
+
+def set_orchestrator(orchestrator: Optional[FetchOrchestrator]) -> None:
+    """Replaces the shared orchestrator (None: rebuilt from the environment on next use)."""
+    global _orchestrator
+    with _orchestrator_lock:
+        old, _orchestrator = _orchestrator, orchestrator
+    if old is not None and old is not orchestrator:
+        old.close()
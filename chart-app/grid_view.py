@@ -0,0 +1,366 @@
+# grid_view.py
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from bar_schema import format_bytes, frame_nbytes
+from chart_view import ChartSettings, ChartView, interval_settings
+from fetch_scheduler import DEFAULT_WORKERS
+from pyramid import PyramidCache
+
+logger = logging.getLogger(__name__)
+
+# Up to 16 tiles fit on screen (4 x 4); more tiles add rows below
+MAX_COLUMNS = 4
+MAX_VISIBLE_ROWS = 4
+TILE_FIGSIZE = (4.8, 2.7)
+TILE_DPI = 100
+MIN_TILE_FONT = 5
+# Windows kept current by refresh() (the app auto-refreshes 1D only)
+REFRESHED_WINDOWS = ("1D",)
+
+
+def grid_shape(n: int) -> Tuple[int, int]:
+    """(rows, columns) of a grid of n tiles: as square as possible, at most MAX_COLUMNS wide."""
+    if n <= 0:
+        return 0, 0
+    cols = min(MAX_COLUMNS, math.ceil(math.sqrt(n)))
+    return math.ceil(n / cols), cols
+
+
+def tile_settings(settings: ChartSettings, window: str) -> ChartSettings:
+    """The main chart settings for one tile: price and volume only, one point smaller."""
+    return settings._replace(window=window, show_macd=False, show_rsi=False, show_vp=False,
+                             font_size=max(MIN_TILE_FONT, settings.font_size - 1))
+
+
+class GridResult(NamedTuple):
+    ticker: str
+    interval: str
+    raw_df: Optional[pd.DataFrame]
+    levels: Dict[Optional[str], pd.DataFrame] # Bars with indicators per resample rule
+    first_changed: int # As for the app's 'data' message (0 = whole series)
+    error: Optional[str] = None
+
+
+class ChartTile:
+    """
+    One (ticker, window) of the grid, drawn by its own ChartView and figure.
+
+    The tile keeps the bars it was last given and what is on its canvas,
+    so render() only does the work that changed: a build for new bars or
+    a new layout, update_tail() for 1D bars appended by a refresh, and
+    refresh() for indicator toggles.
+    """
+
+    def __init__(self, ticker: str, window: str, figsize: Tuple[float, float] = TILE_FIGSIZE, dpi: int = TILE_DPI):
+        self.ticker = ticker
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.view = ChartView(self.fig)
+        self.canvas = None # Set by the grid's canvas factory
+        self.visible = True
+        self.needs_draw = False # The figure is current but the canvas must be repainted (resized while hidden)
+        self.stale = False # A refresh skipped this tile while it was hidden
+        self._set_window(window)
+
+    def _set_window(self, window: str) -> None:
+        self.window = window
+        self.interval, self.rule = interval_settings(window)
+        self.bars = None
+        self.raw_df = None
+        self.error = None
+        self._version = 0 # Bumped for every new series (full rebuild)
+        self._tail = None # First bar changed since the last draw (in-place 1D update)
+        self._drawn = None # (version, settings) on the canvas
+        self._charted = False # The figure holds a chart (not a message)
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.ticker, self.interval)
+
+    def set_window(self, window: str) -> bool:
+        """Switches the tile to another window; True if it needs a load."""
+        if window == self.window:
+            return False
+        self._set_window(window)
+        return True
+
+    def apply(self, result: GridResult) -> bool:
+        """
+        Takes the bars of a finished load of this tile's series.
+
+        Returns:
+            bool: False if the load did not build this tile's resample level.
+        """
+        if result.error is not None:
+            self.error, self.bars, self.raw_df, self._tail = result.error, None, None, None
+            self._version += 1
+            self.stale = False
+            return True
+        bars = result.levels.get(self.rule)
+        if bars is None:
+            return False
+        self.stale = False
+        if bars is self.bars:
+            return True # Served from memory, nothing new
+        if self.bars is not None and self.error is None and result.first_changed > 0:
+            # Bars appended to the drawn session. The tile may have missed refreshes made
+            # by the main chart, so its own last bar (which could have been revised) is redone
+            start = min(result.first_changed, len(self.bars) - 1)
+            self._tail = start if self._tail is None else min(self._tail, start)
+        else:
+            self._version += 1
+            self._tail = None
+        self.bars, self.raw_df, self.error = bars, result.raw_df, None
+        return True
+
+    def needs_render(self, settings: ChartSettings) -> bool:
+        """True if render() would change the canvas."""
+        if self.bars is None and self.error is None:
+            return False # Still loading
+        return (self.needs_draw or self._tail is not None
+                or self._drawn != (self._version, tile_settings(settings, self.window)))
+
+    def render(self, settings: ChartSettings) -> bool:
+        """
+        Brings the figure up to date with the bars and settings, then draws the canvas.
+
+        Args:
+            settings (ChartSettings): Main chart settings (see tile_settings()).
+
+        Returns:
+            bool: False if nothing needed drawing.
+        """
+        if not self.needs_render(settings):
+            return False
+        settings = tile_settings(settings, self.window)
+        same_layout = (self._charted and self._drawn is not None and self._drawn[0] == self._version
+                       and self._drawn[1].layout_key() == settings.layout_key())
+        if self.error is not None:
+            self._show_message(self.error)
+        elif same_layout and self._tail is None:
+            self.view.refresh(settings)
+        elif not (same_layout and self.view.update_tail(self.bars, settings, self._tail, raw_df=self.raw_df,
+                                                         company=self.ticker)):
+            self._charted = self.view.build(self.bars, settings, self.interval, raw_df=self.raw_df,
+                                            company=self.ticker)
+            if not self._charted:
+                self._show_message("no bars in window")
+        self._drawn = (self._version, settings)
+        self._tail = None
+        self.needs_draw = False
+        if self.canvas is not None:
+            self.canvas.draw()
+        return True
+
+    def _show_message(self, text: str) -> None:
+        if self.view.lod is not None:
+            self.view.lod.disconnect()
+            self.view.lod = None
+        self.fig.clear()
+        self.fig.text(0.5, 0.5, f"{self.ticker} ({self.window}): {text}", ha='center', va='center', color='gray')
+        self._charted = False
+
+
+class ChartGrid:
+    """
+    Small multiples: one ChartTile per (ticker, window).
+
+    Bars are loaded, resampled and given indicators on one shared pool.
+    Tiles on the same (ticker, interval) share one job and one pyramid in
+    the PyramidCache (which the main chart uses too), and tiles whose
+    windows use the same resample level share its frame. Results are
+    applied by poll() on the GUI thread; draw_next() then draws one tile
+    at a time, so the event loop stays responsive while a 16-tile grid
+    fills in. Tiles scrolled out of view are neither drawn nor refreshed
+    until they are visible again.
+
+    stats counts loads, tiles that joined a load already queued, draws,
+    and refreshes skipped for hidden tiles.
+    """
+
+    def __init__(self, load: Callable[[str, str], Tuple[pd.DataFrame, int]], pyramids: PyramidCache,
+                 canvas_factory: Callable[[ChartTile], object], max_workers: int = DEFAULT_WORKERS,
+                 figsize: Tuple[float, float] = TILE_FIGSIZE, dpi: int = TILE_DPI):
+        """
+        Args:
+            load (callable): Returns (bars, first_changed) as load(ticker, interval), on a worker thread;
+                             other pools may load the same series, so it must be thread-safe.
+            pyramids (PyramidCache): Shared bar pyramids.
+            canvas_factory (callable): Returns the canvas of a new tile (e.g. FigureCanvasAgg(tile.fig)).
+            max_workers (int): Size of the load pool.
+            figsize, dpi: Initial figure size of new tiles.
+        """
+        self._load = load
+        self.pyramids = pyramids
+        self._canvas_factory = canvas_factory
+        self._figsize = figsize
+        self._dpi = dpi
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grid")
+        self._lock = threading.Lock()
+        self._jobs: Dict[Tuple[str, str], Future] = {}
+        self._rules: Dict[Tuple[str, str], Set[Optional[str]]] = {} # Levels wanted from each job
+        self._results: "queue.Queue[GridResult]" = queue.Queue()
+        self.tiles: List[ChartTile] = []
+        self.stats = {'loads': 0, 'shared': 0, 'draws': 0, 'skipped': 0}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return grid_shape(len(self.tiles))
+
+    def set_tickers(self, tickers: Sequence[str], window: str) -> List[ChartTile]:
+        """Lays out one tile per ticker on window (see set_tiles())."""
+        return self.set_tiles([(ticker, window) for ticker in tickers])
+
+    def set_tiles(self, tiles: Sequence[Tuple[str, str]]) -> List[ChartTile]:
+        """
+        Lays out one tile per (ticker, window), keeping tiles that already show it.
+
+        Returns:
+            List[ChartTile]: Tiles no longer in the grid (their canvases can be destroyed).
+        """
+        old = {(tile.ticker, tile.window): tile for tile in self.tiles}
+        kept, new = [], []
+        for ticker, window in dict.fromkeys(tiles):
+            tile = old.pop((ticker, window), None)
+            if tile is None:
+                tile = ChartTile(ticker, window, self._figsize, self._dpi)
+                tile.canvas = self._canvas_factory(tile)
+                new.append(tile)
+            kept.append(tile)
+        self.tiles = kept
+        self.load(new)
+        return list(old.values())
+
+    def set_window(self, window: str, tiles: Optional[Iterable[ChartTile]] = None) -> None:
+        """Switches tiles (default all) to window and loads their bars."""
+        self.load([tile for tile in (self.tiles if tiles is None else tiles) if tile.set_window(window)])
+
+    def set_visible(self, visible: Iterable[ChartTile]) -> None:
+        """Marks which tiles are on screen; tiles a refresh skipped are reloaded as they come into view."""
+        visible = set(visible)
+        for tile in self.tiles:
+            tile.visible = tile in visible
+        self.load([tile for tile in self.tiles if tile.visible and tile.stale])
+
+    def refresh(self) -> int:
+        """Reloads the visible tiles on REFRESHED_WINDOWS; returns how many loads were started."""
+        tiles = [tile for tile in self.tiles if tile.window in REFRESHED_WINDOWS]
+        for tile in tiles:
+            tile.stale = not tile.visible
+        with self._lock:
+            self.stats['skipped'] += sum(tile.stale for tile in tiles)
+        return self.load([tile for tile in tiles if tile.visible])
+
+    def load(self, tiles: Iterable[ChartTile]) -> int:
+        """Queues the series of tiles on the pool (one job per (ticker, interval)); returns the jobs started."""
+        started = 0
+        with self._lock:
+            for tile in tiles:
+                key = tile.key
+                self._rules.setdefault(key, set()).add(tile.rule)
+                if key in self._jobs:
+                    self.stats['shared'] += 1
+                    continue
+                self._jobs[key] = self._executor.submit(self._run, key)
+                self.stats['loads'] += 1
+                started += 1
+        return started
+
+    def _run(self, key: Tuple[str, str]) -> None:
+        ticker, interval = key
+        try:
+            df, first_changed = self._load(ticker, interval)
+            if df is None or df.empty:
+                raise ValueError("no data")
+            pyramid = self.pyramids.store(ticker, interval, df)
+            with self._lock:
+                rules = set(self._rules.get(key, ()))
+            levels = {}
+            for rule in rules:
+                level = self.pyramids.get(ticker, interval, rule)
+                levels[rule] = level if level is not None else pyramid.level(rule) # Evicted meanwhile
+            result = GridResult(ticker, interval, df, levels, first_changed)
+        except Exception as e:
+            logger.error(f"Grid load of {ticker} {interval} failed: {e}")
+            result = GridResult(ticker, interval, None, {}, 0, str(e))
+        finally:
+            with self._lock:
+                self._jobs.pop(key, None)
+                self._rules.pop(key, None)
+        self._results.put(result)
+
+    def poll(self) -> int:
+        """Applies finished loads to their tiles (GUI thread); returns how many were applied."""
+        applied = 0
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return applied
+            applied += 1
+            key = (result.ticker, result.interval)
+            # A tile that asked for another level after the job read its rules loads again (from memory)
+            self.load([tile for tile in self.tiles if tile.key == key and not tile.apply(result)])
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        """Waits for every queued load and applies them (headless use); returns how many were applied."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        applied = 0
+        while True:
+            with self._lock:
+                futures = list(self._jobs.values())
+            if not futures:
+                return applied + self.poll()
+            wait(futures, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+            applied += self.poll()
+            if deadline is not None and time.monotonic() >= deadline:
+                return applied
+
+    def pending(self, settings: ChartSettings) -> List[ChartTile]:
+        """Visible tiles whose canvas is out of date, in grid order."""
+        return [tile for tile in self.tiles if tile.visible and tile.needs_render(settings)]
+
+    def draw_next(self, settings: ChartSettings) -> bool:
+        """Draws the first out-of-date visible tile; True if more are waiting."""
+        pending = self.pending(settings)
+        if not pending:
+            return False
+        if pending[0].render(settings):
+            self.stats['draws'] += 1
+        return len(pending) > 1
+
+    def draw_all(self, settings: ChartSettings) -> int:
+        """Draws every out-of-date visible tile; returns how many were drawn."""
+        drawn = 0
+        for tile in self.pending(settings):
+            drawn += tile.render(settings)
+        self.stats['draws'] += drawn
+        return drawn
+
+    def nbytes(self) -> int:
+        """Bytes of the bars the tiles draw, each shared frame counted once."""
+        frames = {}
+        for tile in self.tiles:
+            for df in (tile.bars, tile.raw_df):
+                if df is not None:
+                    frames[id(df)] = df
+        return sum(frame_nbytes(df) for df in frames.values())
+
+    def summary(self) -> str:
+        """One-line state for logs and the HUD."""
+        s = self.stats
+        visible = sum(tile.visible for tile in self.tiles)
+        series = len({tile.key for tile in self.tiles})
+        return (f"{len(self.tiles)} tiles ({visible} visible) on {series} series, {format_bytes(self.nbytes())}, "
+                f"{s['loads']} loads, {s['shared']} shared, {s['draws']} draws, {s['skipped']} hidden refreshes skipped")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
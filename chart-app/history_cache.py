@@ -0,0 +1,280 @@
+# history_cache.py
+import logging
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+import perf
+from bar_schema import compact_bars
+from bar_store import save_bars, load_bars, STORE_SUFFIX
+from minute_archive import get_archive, stitch_minutes
+from providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+# Provider look-back limits for intraday intervals (calendar days)
+INTRADAY_LIMIT_DAYS = {
+    '1h': 729,
+    '2m': 59, '5m': 59, '15m': 59, '30m': 59, '90m': 59,
+}
+
+# How far before the last cached bar a tail refresh starts, so the
+# last (possibly still forming) bar is downloaded again and verified
+OVERLAP = {
+    '1d': timedelta(days=5),
+}
+DEFAULT_OVERLAP = timedelta(days=1)
+
+# Intervals whose charts always resample (5m -> 10min for 1WK), so archived
+# 1m bars can stand in for their newest sessions
+MINUTE_STITCHED = {'5m'}
+
+# Relative close difference on overlapping bars that indicates the provider
+# rewrote history (splits, corrections) and a full download is needed
+REWRITE_TOLERANCE = 0.005
+
+
+def cache_path(cache_dir: Path, ticker: str, interval: str) -> Path:
+    """Returns the store entry for a (ticker, interval) series."""
+    return Path(cache_dir) / f"{ticker}_{interval}{STORE_SUFFIX}"
+
+
+def _adopt_legacy_entry(cache_dir: Path, ticker: str, interval: str, path: Path) -> None:
+    """Renames the newest per-day entry ({ticker}_{interval}_{date}.bars) to the series entry."""
+    legacy = sorted(cache_dir.glob(f"{ticker}_{interval}_*{STORE_SUFFIX}"))
+    if not legacy:
+        return
+    try:
+        legacy[-1].rename(path)
+        for old in legacy[:-1]:
+            shutil.rmtree(old, ignore_errors=True)
+        logger.info(f"Adopted legacy cache {legacy[-1].name} for {ticker} {interval}")
+    except Exception as e:
+        logger.warning(f"Failed to adopt legacy cache for {ticker}: {e}")
+
+
+def history_start(interval: str, today: Optional[datetime] = None) -> str:
+    """
+    Returns the earliest start date the provider serves for an interval.
+
+    Args:
+        interval (str): Bar interval (1d, 1h, 5m, ...).
+        today (datetime): Reference date (default now).
+
+    Returns:
+        str: Start date string (YYYY-MM-DD).
+    """
+    today = today or datetime.today()
+    if interval in INTRADAY_LIMIT_DAYS:
+        return (today - timedelta(days=INTRADAY_LIMIT_DAYS[interval])).strftime('%Y-%m-%d')
+    return "2000-01-01"
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Lowercases provider columns and converts the index to US/Eastern."""
+    df.columns = df.columns.str.lower()
+    df.index = pd.to_datetime(df.index, utc=True)
+    try:
+        df.index = df.index.tz_convert('US/Eastern')
+    except Exception:
+        pass
+    return df
+
+
+def merge_bars(cached: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merges freshly downloaded bars into a cached series.
+
+    Fresh rows win on overlapping timestamps, so a bar that was still
+    forming when it was cached is replaced by its final values.
+
+    Args:
+        cached (pd.DataFrame): Existing series.
+        fresh (pd.DataFrame): Newly downloaded tail.
+
+    Returns:
+        pd.DataFrame: Sorted, de-duplicated union of both.
+    """
+    if cached is None or cached.empty:
+        return fresh
+    if fresh is None or fresh.empty:
+        return cached
+    head = cached[cached.index < fresh.index[0]]
+    merged = pd.concat([head, fresh])
+    merged = merged[~merged.index.duplicated(keep='last')]
+    return merged.sort_index()
+
+
+def _is_rewritten(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+    """Checks whether the overlapping bars disagree beyond a rounding difference."""
+    if 'stock splits' in fresh.columns and (fresh['stock splits'].fillna(0) != 0).any():
+        return True
+    common = cached.index.intersection(fresh.index)
+    # The newest cached bar may have been captured mid-session; verify the settled ones
+    common = common[common < cached.index[-1]]
+    if common.empty:
+        return False
+    old = cached.loc[common, 'close']
+    new = fresh.loc[common, 'close']
+    return bool(((new - old).abs() > old.abs() * REWRITE_TOLERANCE).any())
+
+
+def refresh_start(ticker: str, interval: str, today_str: str, cache_dir: Path = Path("cache")) -> Optional[str]:
+    """
+    Returns the start date load_history() would download from.
+
+    Lets a caller fetch the tails of many series in one batched provider
+    call before handing them to load_history().
+
+    Args:
+        ticker (str): The stock symbol.
+        interval (str): Bar interval.
+        today_str (str): Session date (YYYY-MM-DD) the cache should be current to.
+        cache_dir (Path): Store directory.
+
+    Returns:
+        Optional[str]: Start date (YYYY-MM-DD), or None if the cache is already current.
+    """
+    cached = load_bars(cache_path(cache_dir, ticker, interval), mmap=True)
+    full_start = history_start(interval)
+    if cached is None or cached.empty:
+        return full_start
+    if cached.attrs.get('refreshed') == today_str:
+        return None
+    tail_start = (cached.index[-1] - OVERLAP.get(interval, DEFAULT_OVERLAP)).strftime('%Y-%m-%d')
+    return tail_start if tail_start >= full_start else full_start
+
+
+def load_history(ticker: str, interval: str, today_str: str, cache_dir: Path = Path("cache"),
+                 fetch: Optional[Callable[..., pd.DataFrame]] = None) -> pd.DataFrame:
+    """
+    Returns the full bar history for a ticker, refreshing the cache incrementally.
+
+    The cache holds one store entry per (ticker, interval). On the first
+    load of a day only the bars after the last cached timestamp (plus a
+    small overlap) are downloaded and merged in. A full download happens
+    only when there is no cache, the cache is older than the provider's
+    look-back limit, or the overlap shows that history was rewritten.
+
+    Args:
+        ticker (str): The stock symbol.
+        interval (str): Bar interval (not 1m; intraday minutes are never cached).
+        today_str (str): Session date (YYYY-MM-DD) the cache should be current to.
+        cache_dir (Path): Store directory.
+        fetch (callable): Downloads bars as fetch(ticker, start=, end=, interval=)
+                          (default: history() of the configured provider).
+
+    Returns:
+        pd.DataFrame: Normalized bars in the compact schema (bar_schema.py), empty on failure.
+    """
+    fetch = fetch or get_provider().history
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(exist_ok=True)
+    path = cache_path(cache_dir, ticker, interval)
+    if not path.exists():
+        _adopt_legacy_entry(cache_dir, ticker, interval, path)
+
+    with perf.span("cache.load", ticker=ticker, interval=interval):
+        cached = load_bars(path)
+    if cached is not None and not cached.empty:
+        # Entries written before the compact schema still carry the provider's extra columns
+        cached = compact_bars(cached.dropna())
+        if cached.attrs.get('refreshed') == today_str:
+            logger.info(f"Loaded {ticker} from cache.")
+            return cached
+
+    full_start = history_start(interval)
+    df = None
+
+    if cached is not None and not cached.empty:
+        tail_start = (cached.index[-1] - OVERLAP.get(interval, DEFAULT_OVERLAP)).strftime('%Y-%m-%d')
+        if tail_start >= full_start:
+            with perf.span("provider.history", ticker=ticker, interval=interval, start=tail_start):
+                fresh = fetch(ticker, start=tail_start, end=today_str, interval=interval)
+            if fresh is not None and not fresh.empty:
+                with perf.span("normalize", rows=len(fresh)):
+                    fresh = normalize_bars(fresh)
+                if _is_rewritten(cached, fresh):
+                    logger.info(f"History of {ticker} {interval} was rewritten upstream; reloading in full.")
+                else:
+                    with perf.span("cache.merge", rows=len(fresh)):
+                        df = merge_bars(cached, compact_bars(fresh))
+                    logger.info(f"Refreshed {ticker} {interval}: {len(fresh)} tail bars merged.")
+            else:
+                # Nothing new (holiday, provider hiccup): serve the cache and retry next load
+                return cached
+
+    if df is None:
+        with perf.span("provider.history", ticker=ticker, interval=interval, start=full_start):
+            df = fetch(ticker, start=full_start, end=today_str, interval=interval)
+        if df is not None and not df.empty:
+            with perf.span("normalize", rows=len(df)):
+                df = compact_bars(normalize_bars(df))
+
+    if df is not None and not df.empty:
+        # Same attrs as a later load of the entry, so callers can tell the bars are current
+        df.attrs['refreshed'] = today_str
+        try:
+            with perf.span("cache.save", rows=len(df)):
+                save_bars(df, path, attrs={'refreshed': today_str})
+        except Exception as e:
+            # The bars are good; the next load downloads them again
+            logger.error(f"Failed to cache {ticker} {interval}: {e}")
+        return df
+    return pd.DataFrame()
+
+
+def session_date(now: Optional[datetime] = None) -> str:
+    """
+    Returns the session date the cache should be current to.
+
+    Weekends snap back to Friday, so opening a chart on Saturday or Sunday
+    does not download again.
+
+    Args:
+        now (datetime): Reference time (default now).
+
+    Returns:
+        str: Session date (YYYY-MM-DD).
+    """
+    now = now or datetime.now()
+    if now.weekday() == 5: # Saturday
+        now -= timedelta(days=1)
+    elif now.weekday() == 6: # Sunday
+        now -= timedelta(days=2)
+    return now.strftime('%Y-%m-%d')
+
+
+def fetch_bars(ticker: str, interval: str, cache_dir: Path = Path("cache")) -> pd.DataFrame:
+    """
+    Returns the bars a chart of the given interval is drawn from.
+
+    1m bars (the 1D chart) are the live session and bypass the cache;
+    every other interval comes from load_history(). With the minute
+    archive enabled, 5m series get its 1m bars for the sessions it covers.
+
+    Args:
+        ticker (str): The stock symbol.
+        interval (str): Bar interval.
+        cache_dir (Path): Store directory.
+
+    Returns:
+        pd.DataFrame: Normalized bars in the compact schema (bar_schema.py), empty on failure.
+    """
+    if interval == '1m':
+        with perf.span("provider.intraday", ticker=ticker, interval=interval):
+            df = get_provider().intraday(ticker, interval)
+        if df is not None and not df.empty:
+            with perf.span("normalize", rows=len(df)):
+                return compact_bars(normalize_bars(df))
+        return pd.DataFrame()
+    # Cached series, refreshed by downloading only the bars after the last cached one
+    df = load_history(ticker, interval, session_date(), cache_dir)
+    archive = get_archive()
+    if interval in MINUTE_STITCHED and archive is not None and not df.empty:
+        with perf.span("archive.stitch"):
+            df = compact_bars(stitch_minutes(df, archive.read(ticker)))
+    return df
@@ -0,0 +1,376 @@
+# indicators.py
+import math
+from collections import deque
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Indicator parameters (finta defaults for MACD / RSI / BBANDS)
+MA_WINDOWS = (5, 20, 50, 60, 100, 120, 200)
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2
+
+INDICATOR_COLUMNS = [f'ma{w}' for w in MA_WINDOWS] + [
+    'macd', 'signal', 'rsi', 'bb_upper', 'bb_middle', 'bb_lower'
+]
+
+# Above this many new/revised bars a vectorized recompute is faster than stepping
+MAX_INCREMENTAL_BARS = 64
+
+_WINDOW = max(max(MA_WINDOWS), BB_PERIOD)
+
+
+def _span_beta(span: int) -> float:
+    return 1.0 - 2.0 / (span + 1.0)
+
+
+def _ewm_weight(beta: float, n_obs: int) -> float:
+    """Total weight of an adjusted EWM after n_obs observations."""
+    return (1.0 - beta ** n_obs) / (1.0 - beta) if n_obs > 0 else 0.0
+
+
+class _Ewm:
+    """Adjusted exponential mean (pandas ewm(adjust=True).mean()) as O(1) state."""
+    __slots__ = ('beta', 'mean', 'weight')
+
+    def __init__(self, beta: float, mean: float = math.nan, weight: float = 0.0):
+        self.beta = beta
+        self.mean = mean
+        self.weight = weight
+
+    def copy(self) -> '_Ewm':
+        return _Ewm(self.beta, self.mean, self.weight)
+
+    def step(self, x: float) -> float:
+        # Same update order as pandas' ewm_mean kernel
+        if self.weight == 0.0:
+            self.mean = x
+            self.weight = 1.0
+        else:
+            w = self.weight * self.beta
+            if self.mean != x:
+                self.mean = (w * self.mean + x) / (w + 1.0)
+            self.weight = w + 1.0
+        return self.mean
+
+
+class _State:
+    """Recursive indicator state after a given bar (everything except the price window)."""
+    __slots__ = ('n', 'prev_close', 'ema_fast', 'ema_slow', 'ema_signal', 'gain', 'loss')
+
+    def copy(self) -> '_State':
+        s = _State()
+        s.n = self.n
+        s.prev_close = self.prev_close
+        s.ema_fast = self.ema_fast.copy()
+        s.ema_slow = self.ema_slow.copy()
+        s.ema_signal = self.ema_signal.copy()
+        s.gain = self.gain.copy()
+        s.loss = self.loss.copy()
+        return s
+
+
+def _batch(close: pd.Series) -> Dict[str, np.ndarray]:
+    """Vectorized indicators plus the EWM internals needed to seed incremental state."""
+    # Compact bars hold float32 prices; indicators are always computed in float64
+    close = close.astype(np.float64)
+    out = {}
+    for w in MA_WINDOWS:
+        out[f'ma{w}'] = close.rolling(window=w).mean().to_numpy()
+
+    ema_fast = close.ewm(ignore_na=False, span=MACD_FAST, adjust=True).mean()
+    ema_slow = close.ewm(ignore_na=False, span=MACD_SLOW, adjust=True).mean()
+    macd = ema_fast - ema_slow
+    signal = macd.ewm(ignore_na=False, span=MACD_SIGNAL, adjust=True).mean()
+    out['macd'] = macd.to_numpy()
+    out['signal'] = signal.to_numpy()
+
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1.0 / RSI_PERIOD, adjust=True).mean()
+    loss = (-delta).clip(lower=0).ewm(alpha=1.0 / RSI_PERIOD, adjust=True).mean()
+    out['rsi'] = (100 - (100 / (1 + gain / loss))).to_numpy()
+
+    middle = close.rolling(window=BB_PERIOD).mean()
+    std = close.rolling(window=BB_PERIOD).std()
+    out['bb_upper'] = (middle + BB_STD * std).to_numpy()
+    out['bb_middle'] = middle.to_numpy()
+    out['bb_lower'] = (middle - BB_STD * std).to_numpy()
+
+    out['_ema_fast'] = ema_fast.to_numpy()
+    out['_ema_slow'] = ema_slow.to_numpy()
+    out['_gain'] = gain.to_numpy()
+    out['_loss'] = loss.to_numpy()
+    return out
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """rolling(window).mean() down each column; NaN until the window holds no gaps."""
+    valid = ~np.isnan(x)
+    sums = np.zeros((x.shape[0] + 1, x.shape[1]))
+    counts = np.zeros((x.shape[0] + 1, x.shape[1]))
+    np.cumsum(np.where(valid, x, 0.0), axis=0, out=sums[1:])
+    np.cumsum(valid, axis=0, out=counts[1:])
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= window:
+        full = (counts[window:] - counts[:-window]) == window
+        out[window - 1:] = np.where(full, (sums[window:] - sums[:-window]) / window, np.nan)
+    return out
+
+
+def _ewm_mean(x: np.ndarray, beta: float) -> np.ndarray:
+    """_Ewm.step down each column at once (ewm(adjust=True, ignore_na=False).mean())."""
+    out = np.empty(x.shape)
+    mean = np.full(x.shape[1], np.nan)
+    weight = np.zeros(x.shape[1])
+    for i in range(x.shape[0]):
+        v = x[i]
+        observed = ~np.isnan(v)
+        w = weight * beta
+        stepped = np.where(mean == v, mean, (w * mean + v) / (w + 1.0))
+        stepped = np.where(weight > 0, stepped, v)
+        mean = np.where(observed, stepped, mean)
+        weight = np.where(observed, w + 1.0, w)
+        out[i] = mean
+    return out
+
+
+def panel_indicators(close: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    INDICATOR_COLUMNS for many series at once.
+
+    Same formulas as calculate_indicators, evaluated down the columns of a
+    (bars, tickers) array so a whole watchlist costs one pass of vector
+    operations instead of one pandas pipeline per ticker. Leading NaN
+    marks bars before a series starts.
+
+    Args:
+        close (np.ndarray): Closes, one column per ticker.
+
+    Returns:
+        Dict[str, np.ndarray]: One (bars, tickers) array per indicator column.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = {f'ma{w}': _rolling_mean(close, w) for w in MA_WINDOWS}
+
+    macd = _ewm_mean(close, _span_beta(MACD_FAST)) - _ewm_mean(close, _span_beta(MACD_SLOW))
+    out['macd'] = macd
+    out['signal'] = _ewm_mean(macd, _span_beta(MACD_SIGNAL))
+
+    delta = np.full(close.shape, np.nan)
+    delta[1:] = np.diff(close, axis=0)
+    beta_rsi = 1.0 - 1.0 / RSI_PERIOD
+    gain = _ewm_mean(np.clip(delta, 0, None), beta_rsi)
+    loss = _ewm_mean(np.clip(-delta, 0, None), beta_rsi)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['rsi'] = 100 - (100 / (1 + gain / loss))
+
+    middle = _rolling_mean(close, BB_PERIOD)
+    std = np.full(close.shape, np.nan)
+    if close.shape[0] >= BB_PERIOD:
+        windows = np.lib.stride_tricks.sliding_window_view(close, BB_PERIOD, axis=0)
+        std[BB_PERIOD - 1:] = windows.std(axis=-1, ddof=1)
+    out['bb_upper'] = middle + BB_STD * std
+    out['bb_middle'] = middle
+    out['bb_lower'] = middle - BB_STD * std
+    return out
+
+
+def calculate_indicators(df: pd.DataFrame) -> None:
+    """
+    Adds MA5..MA200, MACD/Signal, RSI and Bollinger Band columns to df in place.
+
+    Formulas match finta's TA.MACD / TA.RSI / TA.BBANDS defaults.
+
+    Args:
+        df (pd.DataFrame): Bars with a 'close' column.
+    """
+    df.columns = map(str.lower, df.columns)
+    values = _batch(df['close'])
+    for col in INDICATOR_COLUMNS:
+        df[col] = values[col]
+
+
+class IndicatorEngine:
+    """
+    Keeps indicator state for one bar series and updates it per bar.
+
+    update() compares the new frame with the previous one. When the old
+    frame is a prefix of the new one, except possibly for a revised last
+    bar, only the revised and appended bars are stepped through rolling
+    sums, adjusted EWMs and Wilder averages, each in O(1). Anything else
+    (new ticker, new resample rule, rewritten history) triggers a
+    vectorized recompute, which also re-seeds the state.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._close = None
+        self._values = None  # (bars, len(INDICATOR_COLUMNS)) array
+        self._window = deque(maxlen=_WINDOW + 1)  # closes up to and including the last bar, plus one
+        self._sums = {}
+        self._base = None  # state before the last bar
+        self._last = None  # state after the last bar
+        self.last_mode = None  # 'batch' or 'incremental', for instrumentation
+
+    def reset(self) -> None:
+        """Drops all state so the next update recomputes from scratch."""
+        self.__init__()
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns df joined with the indicator columns for its bars.
+
+        Args:
+            df (pd.DataFrame): Bars with a 'close' column.
+
+        Returns:
+            pd.DataFrame: The bars plus INDICATOR_COLUMNS.
+        """
+        df.columns = map(str.lower, df.columns)
+        df = df.drop(columns=[c for c in INDICATOR_COLUMNS if c in df.columns])
+        close = df['close'].to_numpy(dtype=np.float64)
+        start = self._incremental_start(df.index, close)
+
+        if start is None:
+            self._recompute(df['close'])
+            self.last_mode = 'batch'
+        else:
+            self._extend(close, start)
+            self.last_mode = 'incremental'
+
+        self._index = df.index
+        self._close = close
+        # One block join instead of 13 column inserts
+        indicators = pd.DataFrame(self._values, index=df.index, columns=INDICATOR_COLUMNS, copy=False)
+        return pd.concat([df, indicators], axis=1)
+
+    def _incremental_start(self, index: pd.Index, close: np.ndarray) -> Optional[int]:
+        """Returns the first row to step, or None if a full recompute is needed."""
+        if self._index is None or self._last is None:
+            return None
+        n_old = len(self._index)
+        n_new = len(index)
+        if n_old < 2 or n_new < n_old or n_new - n_old + 1 > MAX_INCREMENTAL_BARS:
+            return None
+        if not np.isfinite(close[n_old - 1:]).all():
+            return None
+        # The old last bar may be relabelled (a resampled bucket that gained a bar)
+        if not index[:n_old - 1].equals(self._index[:n_old - 1]):
+            return None
+        if not np.array_equal(close[:n_old - 1], self._close[:n_old - 1]):
+            return None
+        return n_old - 1
+
+    def _recompute(self, close: pd.Series) -> None:
+        values = _batch(close)
+        arr = close.to_numpy(dtype=np.float64)
+        n = len(arr)
+        self._values = np.column_stack([values[col] for col in INDICATOR_COLUMNS])
+        self._base = self._last = None
+        if n < 2 or not np.isfinite(arr).all():
+            return
+
+        # Seed the window with the closes before the last bar, then re-apply it
+        self._window = deque(arr[max(0, n - 2 - _WINDOW):n - 1].tolist(), maxlen=_WINDOW + 1)
+        self._sums = {w: math.fsum(list(self._window)[-w:]) for w in MA_WINDOWS}
+        self._base = self._seed(values, arr, n - 2)
+        self._last = self._base.copy()
+        self._apply(arr[n - 1])
+
+    def _seed(self, values: Dict[str, np.ndarray], close: np.ndarray, i: int) -> _State:
+        """Rebuilds the recursive state after bar i from the batch outputs."""
+        s = _State()
+        s.n = i + 1
+        s.prev_close = close[i]
+        beta_fast, beta_slow, beta_sig = _span_beta(MACD_FAST), _span_beta(MACD_SLOW), _span_beta(MACD_SIGNAL)
+        beta_rsi = 1.0 - 1.0 / RSI_PERIOD
+        s.ema_fast = _Ewm(beta_fast, values['_ema_fast'][i], _ewm_weight(beta_fast, i + 1))
+        s.ema_slow = _Ewm(beta_slow, values['_ema_slow'][i], _ewm_weight(beta_slow, i + 1))
+        s.ema_signal = _Ewm(beta_sig, values['signal'][i], _ewm_weight(beta_sig, i + 1))
+        # close.diff() starts one bar later, so the Wilder averages have one observation less
+        s.gain = _Ewm(beta_rsi, values['_gain'][i], _ewm_weight(beta_rsi, i))
+        s.loss = _Ewm(beta_rsi, values['_loss'][i], _ewm_weight(beta_rsi, i))
+        return s
+
+    def _extend(self, close: np.ndarray, start: int) -> None:
+        """Revises bar `start` (the old last bar) and appends every bar after it."""
+        n_new = len(close)
+        values = np.empty((n_new, len(INDICATOR_COLUMNS)))
+        values[:start] = self._values[:start]
+        self._values = values
+
+        # Undo the old last bar: drop it from every window sum and let each
+        # window reach back one close again
+        closes = self._window
+        old_last = closes.pop()
+        n = len(closes)
+        for w in MA_WINDOWS:
+            self._sums[w] -= old_last
+            if n >= w:
+                self._sums[w] += closes[n - w]
+
+        self._last = self._base.copy()
+        self._write_row(start, self._apply(close[start]))
+
+        for i in range(start + 1, n_new):
+            self._base = self._last.copy()
+            self._write_row(i, self._apply(close[i]))
+
+    def _apply(self, x: float) -> Dict[str, float]:
+        """Steps self._last (a copy of the state before this bar) with close x."""
+        closes = self._window
+        # Slide each window sum: add x, drop the close leaving that window
+        n = len(closes)
+        for w in MA_WINDOWS:
+            if n >= w:
+                self._sums[w] -= closes[n - w]
+            self._sums[w] += x
+        closes.append(x)
+        n = len(closes)
+
+        s = self._last
+        row = {}
+
+        count = s.n + 1
+        for w in MA_WINDOWS:
+            row[f'ma{w}'] = self._sums[w] / w if count >= w else math.nan
+
+        fast = s.ema_fast.step(x)
+        slow = s.ema_slow.step(x)
+        macd = fast - slow
+        row['macd'] = macd
+        row['signal'] = s.ema_signal.step(macd)
+
+        if s.n == 0:
+            row['rsi'] = math.nan
+        else:
+            delta = x - s.prev_close
+            gain = s.gain.step(delta if delta > 0 else 0.0)
+            loss = s.loss.step(-delta if delta < 0 else 0.0)
+            if loss == 0:
+                row['rsi'] = 100.0 if gain > 0 else math.nan
+            else:
+                row['rsi'] = 100 - (100 / (1 + gain / loss))
+
+        if count >= BB_PERIOD:
+            middle = self._sums[BB_PERIOD] / BB_PERIOD
+            window = [closes[j] for j in range(n - BB_PERIOD, n)]
+            var = sum((v - middle) ** 2 for v in window) / (BB_PERIOD - 1)
+            std = math.sqrt(var)
+            row['bb_upper'] = middle + BB_STD * std
+            row['bb_middle'] = middle
+            row['bb_lower'] = middle - BB_STD * std
+        else:
+            row['bb_upper'] = row['bb_middle'] = row['bb_lower'] = math.nan
+
+        s.n = count
+        s.prev_close = x
+        return row
+
+    def _write_row(self, i: int, row: Dict[str, float]) -> None:
+        self._values[i] = [row[col] for col in INDICATOR_COLUMNS]
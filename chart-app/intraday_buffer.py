@@ -0,0 +1,214 @@
+# intraday_buffer.py
+import logging
+import threading
+from datetime import time, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import perf
+from bar_schema import BAR_COLUMNS, compact_bars
+from history_cache import normalize_bars, session_date
+from minute_archive import MINUTE_LIMIT_DAYS, MinuteArchive
+from providers import MarketDataProvider, get_provider
+
+logger = logging.getLogger(__name__)
+
+# Rows preallocated per session: 04:00-20:00 at 1m, so extended hours never reallocate
+SESSION_CAPACITY = 960
+# Last regular-session minute; an archived session ending earlier is incomplete
+LAST_SESSION_BAR = time(15, 59)
+
+
+class IntradayBuffer:
+    """
+    Append-only bars of one ticker's latest session, for the 1D auto-refresh.
+
+    The first refresh downloads the whole session. Later refreshes request
+    only the bars from the last one on: that bar was still forming when it
+    was fetched, so it is revised in place, and the bars after it are
+    appended to preallocated arrays. The transfer and the work per refresh
+    depend on the minutes since the previous refresh, not on the time of
+    day. A tail that starts a new session reloads the buffer.
+
+    With a MinuteArchive, the buffer starts from the archived session
+    (fetching only what came after it) and writes every refresh to it.
+
+    refresh() may run on worker threads; it is serialized by a lock, and
+    the frames it returns are copies that later refreshes never modify.
+    """
+
+    def __init__(self, ticker: str, interval: str = "1m", capacity: int = SESSION_CAPACITY,
+                 archive: Optional[MinuteArchive] = None):
+        self.ticker = ticker
+        self.interval = interval
+        self.archive = archive
+        self._times = np.empty(capacity, dtype=np.int64) # ns since epoch, UTC
+        self._values = np.empty((capacity, len(BAR_COLUMNS)))
+        self._size = 0
+        self._tz = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def nbytes(self) -> int:
+        """Bytes of the preallocated arrays."""
+        return self._times.nbytes + self._values.nbytes
+
+    def last_time(self) -> Optional[pd.Timestamp]:
+        """Time of the last (possibly still forming) bar, None while empty."""
+        if self._size == 0:
+            return None
+        return pd.Timestamp(self._times[self._size - 1], unit='ns', tz='UTC').tz_convert(self._tz)
+
+    def refresh(self, provider: Optional[MarketDataProvider] = None) -> Tuple[pd.DataFrame, int]:
+        """
+        Brings the buffer up to date with the provider.
+
+        Args:
+            provider (MarketDataProvider): Data source (default get_provider()).
+
+        Returns:
+            Tuple[pd.DataFrame, int]: The session's bars and the first row that
+            changed (len(bars) if nothing did, 0 after a full load).
+        """
+        provider = provider or get_provider()
+        with self._lock:
+            # Everything is new to the caller until the buffer has been returned once
+            loaded = self._size > 0
+            if not loaded and self.archive is not None:
+                self._seed()
+            since = self.last_time()
+            if since is None:
+                return self._load(provider)
+            with perf.span("provider.intraday_since", ticker=self.ticker, interval=self.interval):
+                tail = provider.intraday_since(self.ticker, since, self.interval)
+            if tail is None or tail.empty:
+                return self.frame(), self._size if loaded else 0
+            with perf.span("intraday.merge", rows=len(tail)):
+                tail = normalize_bars(tail)
+                first = self.merge(tail)
+            if first is None:
+                logger.info(f"New session for {self.ticker}: reloading intraday bars")
+                return self._load(provider)
+            with perf.span("archive.append"):
+                self._record(tail, provider)
+            return self.frame(), first if loaded else 0
+
+    def _load(self, provider: MarketDataProvider) -> Tuple[pd.DataFrame, int]:
+        with perf.span("provider.intraday", ticker=self.ticker, interval=self.interval):
+            df = provider.intraday(self.ticker, self.interval)
+        self._size = 0
+        if df is None or df.empty:
+            return pd.DataFrame(), 0
+        with perf.span("intraday.merge", rows=len(df)):
+            df = normalize_bars(df)
+            self.merge(df)
+        with perf.span("archive.append"):
+            self._record(df, provider)
+        return self.frame(), 0
+
+    def _seed(self) -> None:
+        # Today's archived session; refresh() then asks only for what came after it
+        last = self.archive.last_time(self.ticker)
+        if last is None or self.interval != "1m" or last.strftime('%Y-%m-%d') != session_date():
+            return
+        session = pd.Timestamp(last.date()).tz_localize(last.tz)
+        self.merge(self.archive.read(self.ticker, start=session))
+
+    def _record(self, bars: pd.DataFrame, provider: MarketDataProvider) -> None:
+        """Appends fetched bars to the archive, first bridging missed sessions while the provider still has them."""
+        if self.archive is None or self.interval != "1m":
+            return
+        try:
+            last = self.archive.last_time(self.ticker)
+            first = bars.index[0]
+            # An archived session cut short, or weekdays skipped since it
+            missed = last is not None and last.date() < first.date() and (
+                last.time() < LAST_SESSION_BAR or np.busday_count(last.date(), first.date()) > 1)
+            if missed and first - last <= timedelta(days=MINUTE_LIMIT_DAYS):
+                gap = provider.history(self.ticker, start=last.strftime('%Y-%m-%d'),
+                                       end=first.strftime('%Y-%m-%d'), interval=self.interval)
+                if gap is not None and not gap.empty:
+                    self.archive.append(self.ticker, normalize_bars(gap))
+            self.archive.append(self.ticker, bars)
+        except Exception as e:
+            # The archive is an extra: never let it break the chart
+            logger.warning(f"Failed to archive {self.ticker} minutes: {e}")
+
+    def merge(self, bars: pd.DataFrame) -> Optional[int]:
+        """
+        Revises and appends normalized bars.
+
+        Bars already held are overwritten with the new values, later ones are
+        appended; bars older than the held session are ignored.
+
+        Args:
+            bars (pd.DataFrame): Normalized, time-sorted bars (lowercase columns).
+
+        Returns:
+            int: First row whose values changed (len(self) if none did), or
+            None if the bars belong to a later session than the buffer's.
+        """
+        times = bars.index.tz_convert('UTC').as_unit('ns').asi8
+        values = bars[BAR_COLUMNS].to_numpy(dtype=np.float64)
+        if self._size == 0:
+            self._tz = bars.index.tz
+        elif bars.index[-1].date() != self.last_time().date():
+            return None
+
+        held = self._times[:self._size]
+        start = int(np.searchsorted(times, held[0], side='left')) if self._size else 0
+        times, values = times[start:], values[start:]
+        if len(times) == 0:
+            return self._size
+
+        # Rows the buffer already holds are revised in place; a tail whose
+        # times do not line up with them (a minute published late) is merged
+        pos = int(np.searchsorted(held, times[0], side='left'))
+        overlap = min(self._size - pos, len(times))
+        if overlap > 0 and not np.array_equal(held[pos:pos + overlap], times[:overlap]):
+            return self._insert(times, values)
+
+        changed = pos + overlap
+        if overlap > 0:
+            diff = np.flatnonzero((self._values[pos:pos + overlap] != values[:overlap]).any(axis=1))
+            if len(diff):
+                changed = pos + int(diff[0])
+                self._values[pos:pos + overlap] = values[:overlap]
+
+        new = len(times) - overlap
+        if new > 0:
+            self._reserve(self._size + new)
+            self._times[self._size:self._size + new] = times[overlap:]
+            self._values[self._size:self._size + new] = values[overlap:]
+            changed = min(changed, self._size)
+            self._size += new
+        return changed
+
+    def _insert(self, times: np.ndarray, values: np.ndarray) -> int:
+        # Out-of-order tail: merge the two series (newer values win) and rewrite from the first new time
+        held = pd.DataFrame(self._values[:self._size], index=self._times[:self._size])
+        fresh = pd.DataFrame(values, index=times)
+        merged = pd.concat([held, fresh])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        self._reserve(len(merged))
+        self._times[:len(merged)] = merged.index.to_numpy()
+        self._values[:len(merged)] = merged.to_numpy()
+        self._size = len(merged)
+        return int(np.searchsorted(self._times[:self._size], times[0], side='left'))
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._times):
+            return
+        capacity = max(size, 2 * len(self._times))
+        self._times = np.resize(self._times, capacity)
+        self._values = np.resize(self._values, (capacity, len(BAR_COLUMNS)))
+
+    def frame(self) -> pd.DataFrame:
+        """The held bars as a new DataFrame (US/Eastern index, compact OHLCV columns)."""
+        index = pd.DatetimeIndex(self._times[:self._size].copy(), tz='UTC').tz_convert(self._tz)
+        index.name = 'Datetime'
+        return compact_bars(pd.DataFrame(self._values[:self._size], index=index, columns=BAR_COLUMNS))
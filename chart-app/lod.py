@@ -0,0 +1,219 @@
+# lod.py
+import math
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from renderers import CANDLE_WIDTH, set_bars, set_candles
+
+
+class DecimatedBars(NamedTuple):
+    x: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    width: float
+
+
+def pixel_columns(ax) -> int:
+    """Width of an axes in device pixels (at least 1)."""
+    return max(1, int(ax.bbox.width))
+
+
+def bucket_size(n_bars: int, columns: int) -> int:
+    """Number of consecutive bars that share one pixel column (1 = no aggregation)."""
+    return max(1, math.ceil(n_bars / max(columns, 1)))
+
+
+def _buckets(x: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) rows of each run of x in the same k-wide bucket."""
+    ids = np.floor_divide(x, k).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(x)]
+    return starts, ends
+
+
+def decimate_ohlcv(x, open_, high, low, close, volume, k: int) -> DecimatedBars:
+    """
+    Aggregates bars into k-bar buckets without changing the visual envelope.
+
+    Each bucket becomes one candle: first open, highest high, lowest low,
+    last close. Its volume is the largest single-bar volume, since that is
+    the height the individual bars would have reached. Buckets are aligned
+    to multiples of k on the x axis, so panning does not change them, and
+    they are drawn at the centre of the bars they cover, in the original
+    bar units. Rows with a missing price are dropped first.
+
+    Args:
+        x (np.ndarray): Increasing bar positions.
+        open_, high, low, close, volume (np.ndarray): Bar values.
+        k (int): Bucket size from bucket_size().
+
+    Returns:
+        DecimatedBars: The aggregated bars and their candle width.
+    """
+    x, o, h, l, c, v = (np.asarray(a, dtype=float) for a in (x, open_, high, low, close, volume))
+    valid = np.isfinite(x) & np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(c)
+    if k <= 1 or not valid.any():
+        return DecimatedBars(x, o, h, l, c, v, CANDLE_WIDTH)
+    x, o, h, l, c, v = x[valid], o[valid], h[valid], l[valid], c[valid], np.nan_to_num(v[valid])
+
+    starts, ends = _buckets(x, k)
+    return DecimatedBars(
+        x=(x[starts] + x[ends - 1]) / 2.0,
+        open=o[starts],
+        high=np.maximum.reduceat(h, starts),
+        low=np.minimum.reduceat(l, starts),
+        close=c[ends - 1],
+        volume=np.maximum.reduceat(v, starts),
+        width=CANDLE_WIDTH * k,
+    )
+
+
+def decimate_signed(x, values, k: int) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Aggregates a histogram into k-bar buckets keeping its positive and negative peaks.
+
+    Each bucket contributes its largest positive and its most negative
+    value (whichever exist), so the filled envelope is the same as with
+    one bar per row.
+
+    Args:
+        x (np.ndarray): Increasing bar positions.
+        values (np.ndarray): Signed bar heights.
+        k (int): Bucket size from bucket_size().
+
+    Returns:
+        tuple: (x, heights, width) of the bars to draw.
+    """
+    x = np.asarray(x, dtype=float)
+    values = np.asarray(values, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(values)
+    if k <= 1 or not valid.any():
+        return x, values, 1.0
+    x, values = x[valid], values[valid]
+
+    starts, ends = _buckets(x, k)
+    centers = (x[starts] + x[ends - 1]) / 2.0
+    peaks = np.maximum.reduceat(np.maximum(values, 0.0), starts)
+    troughs = np.minimum.reduceat(np.minimum(values, 0.0), starts)
+    keep_peaks, keep_troughs = peaks > 0, troughs < 0
+    return (np.r_[centers[keep_peaks], centers[keep_troughs]],
+            np.r_[peaks[keep_peaks], troughs[keep_troughs]],
+            float(k))
+
+
+class LevelOfDetail:
+    """
+    Keeps candle, volume and histogram collections at one item per pixel column.
+
+    Holds the full bar arrays of a chart and redraws the registered
+    collections whenever the visible x range or the axes width changes.
+    Only bars in view (plus one bucket on each side) are considered. When
+    they outnumber the pixel columns they are aggregated with
+    decimate_ohlcv() / decimate_signed(), so the rendering cost depends on
+    the screen width, not on how much history is loaded. The x axis stays
+    in original bar units, so lines, the crosshair and the date axis still
+    resolve to individual bars.
+    """
+
+    def __init__(self, ax, df: pd.DataFrame, x: Optional[np.ndarray] = None):
+        self.ax = ax
+        self.x = np.arange(len(df), dtype=float) if x is None else np.asarray(x, dtype=float)
+        self.open = df['open'].to_numpy(dtype=float)
+        self.high = df['high'].to_numpy(dtype=float)
+        self.low = df['low'].to_numpy(dtype=float)
+        self.close = df['close'].to_numpy(dtype=float)
+        self.volume = df['volume'].to_numpy(dtype=float)
+        self._candles = None
+        self._volume = None
+        self._histograms = []
+        self._view = self.full_view()  # (first row, end row, bucket size) currently drawn
+        self._cids = []
+
+    def full_view(self) -> Tuple[int, int, int]:
+        """View covering every bar at the current axes width."""
+        return 0, len(self.x), bucket_size(len(self.x), pixel_columns(self.ax))
+
+    def _visible_rows(self) -> Tuple[int, int]:
+        x0, x1 = sorted(self.ax.get_xlim())
+        first = int(np.searchsorted(self.x, x0, side='left'))
+        last = int(np.searchsorted(self.x, x1, side='right'))
+        return first, last
+
+    def _current_view(self) -> Tuple[int, int, int]:
+        first, last = self._visible_rows()
+        k = bucket_size(last - first, pixel_columns(self.ax))
+        # Widen to whole buckets plus one on each side so edge candles are complete
+        lo = int(np.searchsorted(self.x, (self.x[first] // k - 1) * k, side='left')) if first < len(self.x) else first
+        hi = int(np.searchsorted(self.x, (self.x[last - 1] // k + 2) * k, side='left')) if last > 0 else last
+        return lo, max(lo, hi), k
+
+    def bars(self, view=None) -> DecimatedBars:
+        """OHLCV to draw for the given view (default: the one last drawn)."""
+        lo, hi, k = view or self._view
+        return decimate_ohlcv(self.x[lo:hi], self.open[lo:hi], self.high[lo:hi], self.low[lo:hi],
+                              self.close[lo:hi], self.volume[lo:hi], k)
+
+    def histogram(self, values: np.ndarray, view=None) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Histogram bars to draw for the given view (default: the one last drawn)."""
+        lo, hi, k = view or self._view
+        return decimate_signed(self.x[lo:hi], values[lo:hi], k)
+
+    def update(self, df: pd.DataFrame, histograms=()) -> None:
+        """
+        Replaces the bar values (same rows and x positions) and redraws.
+
+        Args:
+            df (pd.DataFrame): New OHLCV bars, row for row with the old ones.
+            histograms (list): New values of each tracked histogram, in tracking order.
+        """
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            setattr(self, col, df[col].to_numpy(dtype=float))
+        self._histograms = [(coll, np.asarray(values, dtype=float))
+                            for (coll, _), values in zip(self._histograms, histograms)]
+        self.apply(self._view)
+
+    def track_candles(self, wicks, bodies) -> None:
+        self._candles = (wicks, bodies)
+
+    def track_volume(self, bars, alpha=None) -> None:
+        self._volume = (bars, alpha)
+
+    def track_histogram(self, bars, values) -> None:
+        self._histograms.append((bars, np.asarray(values, dtype=float)))
+
+    def connect(self) -> None:
+        """Starts following view changes (call after the x limits are set)."""
+        self._cids = [self.ax.callbacks.connect('xlim_changed', self._on_change),
+                      self.ax.figure.canvas.mpl_connect('resize_event', self._on_change)]
+        self._on_change()
+
+    def disconnect(self) -> None:
+        if self._cids:
+            self.ax.callbacks.disconnect(self._cids[0])
+            self.ax.figure.canvas.mpl_disconnect(self._cids[1])
+        self._cids = []
+
+    def _on_change(self, *args) -> None:
+        view = self._current_view()
+        if view == self._view:
+            return
+        self._view = view
+        self.apply(view)
+
+    def apply(self, view) -> None:
+        """Redraws every tracked collection for a (first row, end row, bucket size) view."""
+        if self._candles is not None or self._volume is not None:
+            bars = self.bars(view)
+            if self._candles is not None:
+                set_candles(*self._candles, bars.x, bars.open, bars.high, bars.low, bars.close, bars.width)
+            if self._volume is not None:
+                coll, alpha = self._volume
+                set_bars(coll, bars.x, bars.volume, bars.close >= bars.open, bars.width, alpha=alpha)
+        for coll, values in self._histograms:
+            x, heights, width = self.histogram(values, view)
+            set_bars(coll, x, heights, heights >= 0, width)
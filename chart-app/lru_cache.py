@@ -0,0 +1,141 @@
+# lru_cache.py
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ByteLRU:
+    """
+    Least-recently-used cache bounded by the total size of its values.
+
+    Every value is weighed with sizeof() when it is put; values that grow
+    afterwards (a pyramid building another level) are re-weighed with
+    resize(). When the total exceeds the budget, the least recently used
+    entries are evicted until it fits again. The newest entry is never
+    evicted, even when it alone is over the budget.
+
+    All methods are thread-safe. stats counts hits, misses and evictions.
+    """
+
+    def __init__(self, budget_bytes: int, sizeof: Callable[[object], int],
+                 on_evict: Optional[Callable[[Hashable, object], None]] = None):
+        """
+        Args:
+            budget_bytes (int): Total size the values may take.
+            sizeof (callable): Returns the size of a value in bytes.
+            on_evict (callable): Called as on_evict(key, value) for every evicted entry.
+        """
+        self.budget_bytes = budget_bytes
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default=None):
+        """Returns the value for key (marking it most recently used), or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def peek(self, key: Hashable, default=None):
+        """Returns the value for key without touching its recency or the stats."""
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key: Hashable, value) -> None:
+        """Stores value as the most recently used entry, then evicts down to the budget."""
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            evicted = self._evict()
+        self._notify(evicted)
+
+    def resize(self, key: Hashable) -> None:
+        """Re-weighs the value of key after it changed size, evicting others if needed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            size = self._sizeof(entry[0])
+            self._bytes += size - entry[1]
+            self._entries[key] = (entry[0], size)
+            evicted = self._evict(keep=key)
+        self._notify(evicted)
+
+    def pop(self, key: Hashable, default=None):
+        """Removes key (not counted as an eviction) and returns its value."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        """Keys from least to most recently used."""
+        with self._lock:
+            return list(self._entries)
+
+    def items(self) -> Iterator[Tuple[Hashable, object]]:
+        """(key, value) pairs from least to most recently used."""
+        with self._lock:
+            return iter([(key, entry[0]) for key, entry in self._entries.items()])
+
+    def sizes(self) -> Dict[Hashable, int]:
+        """Recorded size of every value, least recently used first."""
+        with self._lock:
+            return {key: entry[1] for key, entry in self._entries.items()}
+
+    def _evict(self, keep: Optional[Hashable] = None) -> List[Tuple[Hashable, object]]:
+        evicted = []
+        for key in list(self._entries):
+            if self._bytes <= self.budget_bytes or len(self._entries) <= 1:
+                break
+            if key == keep or key == next(reversed(self._entries)):
+                continue
+            value, size = self._entries.pop(key)
+            self._bytes -= size
+            self.stats['evictions'] += 1
+            evicted.append((key, value))
+        return evicted
+
+    def _notify(self, evicted: List[Tuple[Hashable, object]]) -> None:
+        for key, value in evicted:
+            logger.debug(f"Evicted {key} from the memory cache")
+            if self._on_evict is not None:
+                self._on_evict(key, value)
+
+    def summary(self) -> str:
+        """One-line state for logs and the HUD."""
+        s = self.stats
+        return (f"{len(self._entries)} entries, {self._bytes / (1 << 20):.1f}/{self.budget_bytes / (1 << 20):.0f} MiB, "
+                f"{s['hits']} hits, {s['misses']} misses, {s['evictions']} evictions")
@@ -0,0 +1,224 @@
+# metadata_cache.py
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Set, Tuple
+
+import pandas as pd
+
+from lru_cache import ByteLRU
+
+logger = logging.getLogger(__name__)
+
+# Quote fields that move with every trade
+PRICE_FIELDS = {
+    'currentPrice', 'regularMarketPrice', 'regularMarketChange', 'regularMarketChangePercent',
+    'regularMarketDayHigh', 'regularMarketDayLow', 'regularMarketVolume', 'regularMarketTime',
+    'dayHigh', 'dayLow', 'volume', 'bid', 'ask', 'bidSize', 'askSize',
+    'preMarketPrice', 'postMarketPrice',
+}
+# Fields fixed for one trading session
+SESSION_FIELDS = {'previousClose', 'regularMarketPreviousClose', 'open', 'regularMarketOpen'}
+# Descriptive fields that practically never change
+PROFILE_FIELDS = {
+    'symbol', 'shortName', 'longName', 'quoteType', 'exchange', 'fullExchangeName', 'currency',
+    'sector', 'industry', 'country', 'website', 'longBusinessSummary', 'exchangeTimezoneName',
+}
+# Everything else (valuation, dividends, 52W range, earnings dates...) is 'fundamentals'
+
+# Seconds each field group stays valid ('session' fields expire at the next trading date)
+FIELD_GROUP_TTL = {
+    'price': 15,
+    'session': None,
+    'fundamentals': 6 * 3600,
+    'profile': 7 * 86400,
+}
+
+MARKET_TZ = "US/Eastern"
+
+# Memory for entries of recently shown tickers (a few KB each); older ones are re-read from disk
+MEMORY_BUDGET_BYTES = 16 << 20
+
+
+def field_group(field: str) -> str:
+    """Name of the TTL group a metadata field belongs to."""
+    if field in PRICE_FIELDS:
+        return 'price'
+    if field in SESSION_FIELDS:
+        return 'session'
+    if field in PROFILE_FIELDS:
+        return 'profile'
+    return 'fundamentals'
+
+
+def _entry_size(entry: dict) -> int:
+    return len(json.dumps(entry, default=str))
+
+
+def _session_date(ts: float) -> str:
+    return pd.Timestamp(ts, unit='s', tz='UTC').tz_convert(MARKET_TZ).strftime('%Y-%m-%d')
+
+
+def title_fields(ticker: str, info: dict) -> Tuple[str, float, float]:
+    """
+    Returns the metadata shown in the chart title.
+
+    Args:
+        ticker (str): Ticker symbol (fallback name).
+        info (dict): Metadata fields (may be empty).
+
+    Returns:
+        Tuple[str, float, float]: (company name, previous close, current price); 0.0 when unknown.
+    """
+    company = info.get('shortName', info.get('longName', ticker)) or ticker
+    previous_close = info.get('previousClose') or 0.0
+    current_price = info.get('currentPrice') or info.get('regularMarketPrice') or 0.0
+    return company, previous_close, current_price
+
+
+class MetadataCache:
+    """
+    Per-ticker fundamentals/quote metadata with a TTL per field group.
+
+    Entries are persisted as JSON under cache_dir, one file per ticker,
+    so profile and fundamentals survive restarts; recently used entries
+    stay in memory within MEMORY_BUDGET_BYTES. get() only returns
+    fields whose group is still valid and never blocks on the network.
+    Expired groups are refreshed in the background by refresh_async().
+    A provider call returns every field at once, so a refresh renews
+    all groups.
+    """
+
+    def __init__(self, fetch: Callable[[str], dict], cache_dir: Path = Path("cache/info"),
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            fetch (callable): Returns the full metadata dict for a ticker (e.g. yfinance .info).
+            cache_dir (Path): Directory of the persisted JSON entries.
+            clock (callable): Current time in epoch seconds.
+        """
+        self._fetch = fetch
+        self.cache_dir = Path(cache_dir)
+        self._clock = clock
+        self._entries = ByteLRU(MEMORY_BUDGET_BYTES, sizeof=_entry_size)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="metadata")
+        self._refreshing: Set[str] = set()
+
+    def _path(self, ticker: str) -> Path:
+        return self.cache_dir / f"{ticker}.json"
+
+    def _entry(self, ticker: str) -> dict:
+        entry = self._entries.get(ticker)
+        if entry is None:
+            entry = {'fields': {}, 'fetched': {}}
+            path = self._path(ticker)
+            if path.exists():
+                try:
+                    with open(path, 'r') as f:
+                        entry = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable metadata cache {path}: {e}")
+            self._entries.put(ticker, entry)
+        return entry
+
+    def _is_valid(self, group: str, fetched_at: Optional[float], now: float) -> bool:
+        if fetched_at is None:
+            return False
+        ttl = FIELD_GROUP_TTL[group]
+        if ttl is None:
+            return _session_date(fetched_at) == _session_date(now)
+        return now - fetched_at < ttl
+
+    def get(self, ticker: str) -> dict:
+        """
+        Returns the cached fields of ticker whose group has not expired.
+
+        Args:
+            ticker (str): Ticker symbol.
+
+        Returns:
+            dict: Valid metadata fields (empty if nothing is cached).
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entry(ticker)
+            valid = {g for g in FIELD_GROUP_TTL if self._is_valid(g, entry['fetched'].get(g), now)}
+            return {k: v for k, v in entry['fields'].items() if field_group(k) in valid}
+
+    def expired_groups(self, ticker: str) -> Set[str]:
+        """Field groups of ticker that need a refresh."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entry(ticker)
+            return {g for g in FIELD_GROUP_TTL if not self._is_valid(g, entry['fetched'].get(g), now)}
+
+    def refresh(self, ticker: str) -> dict:
+        """
+        Fetches ticker's metadata now, stores and persists it.
+
+        Returns:
+            dict: The valid fields after the refresh.
+        """
+        info = self._fetch(ticker) or {}
+        now = self._clock()
+        with self._lock:
+            entry = {'fields': dict(info), 'fetched': {g: now for g in FIELD_GROUP_TTL}}
+            self._entries.put(ticker, entry)
+            self._save(ticker, entry)
+        return self.get(ticker)
+
+    def refresh_async(self, ticker: str, on_done: Callable[[str, dict], None],
+                      ignore: Iterable[str] = ()) -> bool:
+        """
+        Refreshes ticker in the background if any field group expired.
+
+        on_done(ticker, fields) is called on the worker thread after a
+        successful refresh. Concurrent calls for the same ticker share one
+        provider call.
+
+        Args:
+            ticker (str): Ticker symbol.
+            on_done (callable): Receives (ticker, valid fields).
+            ignore (Iterable[str]): Groups whose expiry alone does not warrant a
+                                    provider call (they are still renewed by one).
+
+        Returns:
+            bool: True if a refresh was started.
+        """
+        if not self.expired_groups(ticker) - set(ignore):
+            return False
+        with self._lock:
+            if ticker in self._refreshing:
+                return False
+            self._refreshing.add(ticker)
+        self._executor.submit(self._refresh_job, ticker, on_done)
+        return True
+
+    def _refresh_job(self, ticker: str, on_done: Callable[[str, dict], None]) -> None:
+        try:
+            fields = self.refresh(ticker)
+        except Exception as e:
+            logger.warning(f"Failed to fetch metadata for {ticker}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._refreshing.discard(ticker)
+        on_done(ticker, fields)
+
+    def _save(self, ticker: str, entry: dict) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(ticker).with_suffix(".json.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp, self._path(ticker))
+        except OSError as e:
+            logger.warning(f"Failed to persist metadata for {ticker}: {e}")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
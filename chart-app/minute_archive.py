@@ -0,0 +1,323 @@
+# minute_archive.py
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from bar_schema import BAR_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: the archive is off unless a number of days is configured
+ARCHIVE_DAYS_ENV = "CHART_MINUTE_ARCHIVE_DAYS"
+ARCHIVE_BUDGET_ENV = "CHART_MINUTE_ARCHIVE_MB" # Disk budget of the whole archive
+DEFAULT_BUDGET_MB = 256
+ARCHIVE_SUFFIX = ".min"
+ARCHIVE_TZ = "US/Eastern"
+
+# One file per ticker: an 8-byte magic, then fixed-size records sorted by time.
+# Appends write past the last record; a revised (still forming) bar is
+# overwritten in place. A torn trailing record is ignored on read.
+MAGIC = b"MINBARS1"
+HEADER_SIZE = len(MAGIC)
+RECORD = np.dtype([('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'),
+                   ('close', '<f8'), ('volume', '<f8')])
+
+# How far back the provider serves 1m bars (calendar days); older gaps stay gaps
+MINUTE_LIMIT_DAYS = 7
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _session_days(times: np.ndarray) -> np.ndarray:
+    """Session date of each epoch-ns timestamp, as days since 1970-01-01 (Eastern)."""
+    local = pd.DatetimeIndex(times.view('datetime64[ns]')).tz_localize('UTC').tz_convert(ARCHIVE_TZ)
+    return local.tz_localize(None).as_unit('ns').asi8 // NS_PER_DAY
+
+
+def _to_records(bars: pd.DataFrame) -> np.ndarray:
+    """Normalized bars -> record array (rows without a time-sorted unique index are dropped)."""
+    bars = bars[~bars.index.duplicated(keep='last')].sort_index()
+    records = np.empty(len(bars), dtype=RECORD)
+    records['time'] = pd.DatetimeIndex(bars.index).tz_convert('UTC').as_unit('ns').asi8
+    for col in BAR_COLUMNS:
+        records[col] = bars[col].to_numpy(dtype=np.float64)
+    return records
+
+
+def _to_frame(records: np.ndarray) -> pd.DataFrame:
+    index = pd.DatetimeIndex(records['time'].view('datetime64[ns]')).tz_localize('UTC').tz_convert(ARCHIVE_TZ)
+    index.name = 'Datetime'
+    return pd.DataFrame({col: records[col] for col in BAR_COLUMNS}, index=index)
+
+
+class MinuteArchive:
+    """
+    Rolling on-disk archive of 1-minute bars, one file per ticker.
+
+    Each fetch of a ticker's session is appended (bars already held are
+    replaced from the first fetched one on, like merge_bars()), so the
+    archive outlives the provider's short 1m look-back. Every ticker keeps
+    at most `days` sessions, and the archive as a whole never grows past
+    `budget_bytes`: before a write would exceed it, the oldest sessions of
+    all tickers are dropped first. Reads memory-map the file and copy only
+    the requested range.
+
+    Writes are serialized within a process; one process (the app) is
+    expected to write, while others may read.
+    """
+
+    def __init__(self, root: Path, days: int, budget_bytes: int = DEFAULT_BUDGET_MB * 2**20):
+        """
+        Args:
+            root (Path): Archive directory (created on first write).
+            days (int): Sessions kept per ticker.
+            budget_bytes (int): Maximum size of all archive files together.
+        """
+        self.root = Path(root)
+        self.days = days
+        self.budget_bytes = budget_bytes
+        self._lock = threading.Lock()
+
+    def path(self, ticker: str) -> Path:
+        return self.root / f"{ticker}{ARCHIVE_SUFFIX}"
+
+    def _map(self, path: Path) -> Optional[np.ndarray]:
+        """Read-only record view of a file, None if missing, empty or foreign."""
+        try:
+            size = path.stat().st_size
+            rows = (size - HEADER_SIZE) // RECORD.itemsize
+            if rows <= 0:
+                return None
+            with open(path, 'rb') as f:
+                if f.read(HEADER_SIZE) != MAGIC:
+                    logger.warning(f"Ignoring {path}: not a minute archive")
+                    return None
+            return np.memmap(path, dtype=RECORD, mode='r', offset=HEADER_SIZE, shape=(rows,))
+        except FileNotFoundError:
+            return None
+
+    def read(self, ticker: str, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Archived bars of a ticker from start (inclusive) on.
+
+        Returns:
+            pd.DataFrame: OHLCV bars with a US/Eastern index, empty if none.
+        """
+        records = self._map(self.path(ticker))
+        if records is None:
+            return pd.DataFrame()
+        first = 0
+        if start is not None:
+            first = int(np.searchsorted(records['time'], pd.Timestamp(start).tz_convert('UTC').value, side='left'))
+        # Copy out the requested rows so no mapping outlives the call
+        return _to_frame(np.array(records[first:]))
+
+    def last_time(self, ticker: str) -> Optional[pd.Timestamp]:
+        records = self._map(self.path(ticker))
+        if records is None:
+            return None
+        return pd.Timestamp(int(records['time'][-1]), unit='ns', tz='UTC').tz_convert(ARCHIVE_TZ)
+
+    def size_bytes(self) -> int:
+        """Current size of every archive file together."""
+        return sum(size for _, size in self._files())
+
+    def _files(self) -> List:
+        if not self.root.exists():
+            return []
+        return [(p, p.stat().st_size) for p in self.root.glob(f"*{ARCHIVE_SUFFIX}")]
+
+    def append(self, ticker: str, bars: pd.DataFrame) -> int:
+        """
+        Writes fetched 1m bars of a ticker.
+
+        Archived bars from the first fetched one on are replaced by the
+        fetched bars; older archived bars are kept.
+
+        Args:
+            ticker (str): The stock symbol.
+            bars (pd.DataFrame): Normalized 1m bars (lowercase OHLCV columns).
+
+        Returns:
+            int: Bars written (0 if nothing was, e.g. the budget cannot hold them).
+        """
+        if bars is None or bars.empty:
+            return 0
+        fresh = _to_records(bars)
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.path(ticker)
+            held = self._map(path)
+            times = np.array(held['time']) if held is not None else np.empty(0, dtype=np.int64)
+            pos = int(np.searchsorted(times, fresh['time'][0], side='left'))
+
+            # Rolling window: the `days` newest sessions of the new content
+            days = np.concatenate([_session_days(times[:pos]), _session_days(fresh['time'])])
+            sessions = np.unique(days)
+            cutoff = sessions[-self.days] if len(sessions) > self.days else None
+
+            planned = HEADER_SIZE + (pos + len(fresh)) * RECORD.itemsize
+            if cutoff is not None:
+                planned -= int((days < cutoff).sum()) * RECORD.itemsize
+            kept = days if cutoff is None else days[days >= cutoff]
+            budget_cutoff = self._make_room(path, planned, kept)
+            if budget_cutoff is not None:
+                cutoff = budget_cutoff if cutoff is None else max(cutoff, budget_cutoff)
+
+            # The file is rewritten or truncated below: release the mapping first
+            head = np.array(held[:pos]) if held is not None else fresh[:0]
+            del held
+            if cutoff is not None:
+                # Sessions drop out of this ticker: rewrite the file
+                records = np.concatenate([head, fresh])[days >= cutoff]
+                self._rewrite(path, records)
+                written = int((_session_days(fresh['time']) >= cutoff).sum())
+            else:
+                self._write_tail(path, pos, fresh)
+                written = len(fresh)
+        return written
+
+    def _write_tail(self, path: Path, pos: int, records: np.ndarray) -> None:
+        mode = 'r+b' if path.exists() else 'w+b'
+        with open(path, mode) as f:
+            if mode == 'w+b' or f.read(HEADER_SIZE) != MAGIC:
+                f.seek(0)
+                f.write(MAGIC)
+                pos = 0
+            f.seek(HEADER_SIZE + pos * RECORD.itemsize)
+            f.write(records.tobytes())
+            f.truncate()
+
+    def _rewrite(self, path: Path, records: np.ndarray) -> None:
+        if len(records) == 0:
+            path.unlink(missing_ok=True)
+            return
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+
+    def _make_room(self, target: Path, planned: int, target_days: np.ndarray) -> Optional[int]:
+        """
+        Drops the oldest sessions of every ticker until the target's planned
+        size fits the budget; returns the session cutoff for the target itself.
+        """
+        others = [(p, size) for p, size in self._files() if p != target]
+        total = planned + sum(size for _, size in others)
+        if total <= self.budget_bytes:
+            return None
+
+        # Bytes per session day across the archive, oldest first
+        per_day: Dict[int, int] = {}
+        days_of = {}
+        for p, _ in others:
+            records = self._map(p)
+            if records is None:
+                continue
+            days_of[p] = _session_days(np.array(records['time']))
+            del records
+            for day, count in zip(*np.unique(days_of[p], return_counts=True)):
+                per_day[int(day)] = per_day.get(int(day), 0) + int(count) * RECORD.itemsize
+        for day, count in zip(*np.unique(target_days, return_counts=True)):
+            per_day[int(day)] = per_day.get(int(day), 0) + int(count) * RECORD.itemsize
+
+        cutoff = None
+        for day in sorted(per_day):
+            if total <= self.budget_bytes:
+                break
+            total -= per_day[day]
+            cutoff = day + 1
+        if cutoff is None:
+            return None
+        logger.info(f"Minute archive over budget: dropping sessions before "
+                    f"{pd.Timestamp(cutoff * NS_PER_DAY).date()}")
+        for p, days in days_of.items():
+            if days[0] < cutoff:
+                records = np.array(self._map(p))
+                self._rewrite(p, records[days >= cutoff])
+        return cutoff
+
+
+def stitch_minutes(coarse: pd.DataFrame, minutes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces the newest sessions of a coarse intraday series with 1m bars.
+
+    Minutes are used from the first session after the last one they do not
+    fully cover (the minutes must span the coarse bars of that day), so the
+    result is continuous: coarse bars for older history, which warm up the
+    indicators, then 1m bars, including archived sessions newer than the
+    coarse series. Resampling the result to the coarse interval or wider
+    gives the same bars; volume profiles get 1m resolution.
+
+    Args:
+        coarse (pd.DataFrame): Normalized bars of a wider interval (e.g. 5m).
+        minutes (pd.DataFrame): Archived 1m bars of the same ticker.
+
+    Returns:
+        pd.DataFrame: OHLCV bars with coarse's attrs, or coarse unchanged if no
+                      recent session is covered.
+    """
+    if coarse is None or len(coarse) < 2 or minutes is None or minutes.empty:
+        return coarse
+    step = (coarse.index[1:] - coarse.index[:-1]).min()
+    have = minutes.index.to_series().groupby(minutes.index.normalize()).agg(['min', 'max'])
+    need = coarse.index.to_series().groupby(coarse.index.normalize()).agg(['min', 'max'])
+    need = need[need.index >= have.index[0]]
+
+    covered = need.join(have, rsuffix='_m', how='left')
+    # A thinly traded first minute may be missing: it only has to fall in the first coarse bar
+    ok = (covered['min_m'] < covered['min'] + step) & (covered['max_m'] >= covered['max'])
+    missing = ok.index[~ok.to_numpy()]
+    later = have.index[have.index > missing[-1]] if len(missing) else have.index
+    if len(later) == 0:
+        return coarse
+    start = later[0]
+    head = coarse.iloc[:coarse.index.searchsorted(start, side='left')][BAR_COLUMNS]
+    tail = minutes.iloc[minutes.index.searchsorted(start, side='left'):]
+    stitched = pd.concat([head, tail])
+    # concat drops attrs; 'refreshed' is what lets the memory cache serve a revisit
+    stitched.attrs = dict(coarse.attrs)
+    return stitched
+
+
+_archive: Optional[MinuteArchive] = None
+_archive_loaded = False
+_archive_lock = threading.Lock()
+
+
+def archive_from_env(cache_dir: Path = Path("cache")) -> Optional[MinuteArchive]:
+    """
+    Builds the archive configured by the environment, or None when it is off.
+
+    CHART_MINUTE_ARCHIVE_DAYS sets the sessions kept per ticker (unset or 0:
+    no archive); CHART_MINUTE_ARCHIVE_MB the disk budget (default 256 MB).
+    """
+    days = int(os.environ.get(ARCHIVE_DAYS_ENV, "0") or 0)
+    if days <= 0:
+        return None
+    budget_mb = float(os.environ.get(ARCHIVE_BUDGET_ENV, DEFAULT_BUDGET_MB))
+    logger.info(f"Archiving 1m bars: {days} sessions per ticker, {budget_mb:g} MB budget")
+    return MinuteArchive(Path(cache_dir) / "minutes", days, int(budget_mb * 2**20))
+
+
+def get_archive() -> Optional[MinuteArchive]:
+    """The process-wide archive (built from the environment on first use), None when off."""
+    global _archive, _archive_loaded
+    with _archive_lock:
+        if not _archive_loaded:
+            _archive = archive_from_env()
+            _archive_loaded = True
+        return _archive
+
+
+def set_archive(archive: Optional[MinuteArchive]) -> None:
+    """Replaces the process-wide archive (None: turn archiving off)."""
+    global _archive, _archive_loaded
+    with _archive_lock:
+        _archive = archive
+        _archive_loaded = True
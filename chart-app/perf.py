@@ -0,0 +1,264 @@
+# perf.py
+"""
+Timing spans for the chart pipeline.
+
+Stages are wrapped in `with perf.span("name"):` (or decorated with
+@perf.timed("name")). While recording is off,
+span() returns a shared no-op object, so instrumented code costs one
+function call per stage. When it is on, the last durations of every stage
+are kept for the app's HUD (F12), redraws are counted for its FPS figure,
+and each span can be appended to a JSON-lines file:
+
+    CHART_PERF=1 python app_stock_chart.py            # record, HUD on F12
+    CHART_PERF_LOG=perf.jsonl python app_stock_chart.py
+    python perf.py summarize perf.jsonl               # per-stage statistics
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PERF_ENV = "CHART_PERF" # "1": record spans
+PERF_LOG_ENV = "CHART_PERF_LOG" # JSON-lines export file (implies CHART_PERF)
+HISTORY = 50 # Durations kept per stage
+FPS_WINDOW_S = 2.0
+
+
+class StageTiming(NamedTuple):
+    name: str
+    last_ms: float
+    mean_ms: float
+    max_ms: float
+    count: int
+
+
+class _NullSpan:
+    """What span() returns while recording is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def note(self, **fields) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'name', 'fields', 'parent', 'start', 'wall')
+
+    def __init__(self, recorder: 'PerfRecorder', name: str, fields: Dict):
+        self.recorder = recorder
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        stack = self.recorder._stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self.name)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.recorder._stack().pop()
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.recorder.record(self.name, elapsed, self.fields, self.parent, self.wall)
+        return False
+
+    def note(self, **fields) -> None:
+        """Attaches fields (e.g. row counts) to the exported record."""
+        self.fields.update(fields)
+
+
+class PerfRecorder:
+    """
+    Collects finished spans from any thread: the last HISTORY durations per
+    stage, redraw times for the FPS figure, and optionally a JSON-lines log.
+    """
+
+    def __init__(self, log_path: Optional[Path] = None, history: int = HISTORY):
+        self.history = history
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stages: Dict[str, deque] = {}
+        self._frames = deque(maxlen=1000)
+        self._log = open(log_path, 'a', buffering=1) if log_path else None
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, **fields) -> _Span:
+        return _Span(self, name, fields)
+
+    def record(self, name: str, seconds: float, fields: Optional[Dict] = None,
+               parent: Optional[str] = None, wall: Optional[float] = None) -> None:
+        with self._lock:
+            durations = self._stages.get(name)
+            if durations is None:
+                durations = self._stages[name] = deque(maxlen=self.history)
+            durations.append(seconds)
+            if self._log is not None:
+                entry = {'t': round(wall or time.time(), 6), 'name': name, 'ms': round(seconds * 1000, 4),
+                         'thread': threading.current_thread().name}
+                if parent:
+                    entry['parent'] = parent
+                if fields:
+                    entry.update(fields)
+                self._log.write(json.dumps(entry, default=str) + "\n")
+
+    def frame(self) -> None:
+        """Marks a finished redraw (full draw or blit)."""
+        self._frames.append(time.perf_counter())
+
+    def fps(self, window: float = FPS_WINDOW_S) -> float:
+        """Redraws per second over the last `window` seconds."""
+        now = time.perf_counter()
+        recent = [t for t in list(self._frames) if now - t <= window]
+        return len(recent) / window
+
+    def summary(self) -> List[StageTiming]:
+        """Recent timings per stage, in the order the stages first ran."""
+        with self._lock:
+            stages = {name: list(d) for name, d in self._stages.items()}
+        return [StageTiming(name, d[-1] * 1000, statistics.fmean(d) * 1000, max(d) * 1000, len(d))
+                for name, d in stages.items() if d]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+_recorder: Optional[PerfRecorder] = None
+
+
+def span(name: str, **fields):
+    """
+    Context manager timing one stage.
+
+    Args:
+        name (str): Stage name (dotted, e.g. "chart.build").
+        **fields: Extra JSON fields of the exported record.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, name, fields)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            with _Span(recorder, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def frame() -> None:
+    """Counts a redraw for the FPS figure (no-op while recording is off)."""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.frame()
+
+
+def get_recorder() -> Optional[PerfRecorder]:
+    return _recorder
+
+
+def enable(log_path: Optional[Path] = None) -> PerfRecorder:
+    """Starts recording (keeps the current recorder if there is one)."""
+    global _recorder
+    if _recorder is None:
+        _recorder = PerfRecorder(log_path)
+        logger.info(f"Recording pipeline timings{f' to {log_path}' if log_path else ''}")
+    return _recorder
+
+
+def disable() -> None:
+    """Stops recording and closes the export file."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+
+
+def enable_from_env() -> Optional[PerfRecorder]:
+    """Starts recording if CHART_PERF or CHART_PERF_LOG is set."""
+    log_path = os.environ.get(PERF_LOG_ENV)
+    if log_path:
+        return enable(Path(log_path))
+    if os.environ.get(PERF_ENV, "") not in ("", "0"):
+        return enable()
+    return None
+
+
+def summarize(log_path: Path) -> List[Dict]:
+    """
+    Per-stage statistics of an exported JSON-lines file.
+
+    Returns:
+        List[dict]: name, count, total/mean/p50/p95/max ms; slowest total first.
+    """
+    durations: Dict[str, List[float]] = {}
+    with open(log_path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            durations.setdefault(entry['name'], []).append(entry['ms'])
+    rows = []
+    for name, ms in durations.items():
+        ms.sort()
+        rows.append({'name': name, 'count': len(ms), 'total_ms': sum(ms), 'mean_ms': statistics.fmean(ms),
+                     'p50_ms': ms[len(ms) // 2], 'p95_ms': ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+                     'max_ms': ms[-1]})
+    return sorted(rows, key=lambda r: r['total_ms'], reverse=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pipeline timing tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summ = sub.add_parser("summarize", help="Per-stage statistics of a CHART_PERF_LOG file")
+    summ.add_argument("log", help="JSON-lines file written with CHART_PERF_LOG")
+    args = parser.parse_args(argv)
+
+    if args.command == "summarize":
+        rows = summarize(Path(args.log))
+        print(f"{'stage':<28} {'count':>7} {'total ms':>10} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+        for r in rows:
+            print(f"{r['name']:<28} {r['count']:>7} {r['total_ms']:>10.1f} {r['mean_ms']:>9.2f} "
+                  f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['max_ms']:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+# providers.py
+import abc
+import json
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from bar_store import load_bars, save_bars, STORE_SUFFIX
+from stock_util import get_intraday_history, get_stock_histories, get_stock_history, get_stock_info
+
+logger = logging.getLogger(__name__)
+
+# Environment switches for get_provider(): replay captured responses, or record live ones
+REPLAY_DIR_ENV = "CHART_REPLAY_DIR"
+REPLAY_LATENCY_ENV = "CHART_REPLAY_LATENCY" # Seconds, or "min-max" for a uniform range
+RECORD_DIR_ENV = "CHART_RECORD_DIR"
+
+Latency = Union[float, Tuple[float, float]]
+
+
+class MarketDataProvider(abc.ABC):
+    """
+    Source of bars and metadata.
+
+    Implementations return provider-shaped data (the raw yfinance columns
+    and timezone); normalizing and caching stay with the callers. history()
+    and intraday() return an empty DataFrame when there is no data. info()
+    raises on failure, so an error is never cached as empty metadata.
+    """
+
+    @abc.abstractmethod
+    def history(self, ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+        """Bars of ticker from start (inclusive) to end (exclusive), YYYY-MM-DD."""
+
+    def history_batch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        """history() for several tickers; tickers without data are left out."""
+        histories = {ticker: self.history(ticker, start, end, interval) for ticker in tickers}
+        return {ticker: df for ticker, df in histories.items() if df is not None and not df.empty}
+
+    @abc.abstractmethod
+    def intraday(self, ticker: str, interval: str = "1m") -> pd.DataFrame:
+        """Bars of the latest session."""
+
+    def intraday_since(self, ticker: str, since: pd.Timestamp, interval: str = "1m") -> pd.DataFrame:
+        """
+        Bars of the latest session from since (inclusive, tz-aware) on.
+
+        The default fetches the whole session and slices it; providers that
+        can request a time range override it to transfer only the tail.
+        """
+        df = self.intraday(ticker, interval)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        index = pd.to_datetime(df.index, utc=True)
+        return df.iloc[index.searchsorted(since.tz_convert('UTC'), side='left'):]
+
+    @abc.abstractmethod
+    def info(self, ticker: str) -> dict:
+        """Full metadata dict (profile, fundamentals, quote)."""
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance data through stock_util."""
+
+    def history(self, ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+        return get_stock_history(ticker, start=start, end=end, interval=interval)
+
+    def history_batch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        return get_stock_histories(tickers, start=start, end=end, interval=interval)
+
+    def intraday(self, ticker: str, interval: str = "1m") -> pd.DataFrame:
+        return get_intraday_history(ticker, interval)
+
+    def intraday_since(self, ticker: str, since: pd.Timestamp, interval: str = "1m") -> pd.DataFrame:
+        return get_intraday_history(ticker, interval, start=since)
+
+    def info(self, ticker: str) -> dict:
+        return get_stock_info(ticker)
+
+
+def _history_entry(capture_dir: Path, ticker: str, interval: str) -> Path:
+    return Path(capture_dir) / "history" / f"{ticker}_{interval}{STORE_SUFFIX}"
+
+
+def _intraday_entry(capture_dir: Path, ticker: str, interval: str) -> Path:
+    return Path(capture_dir) / "intraday" / f"{ticker}_{interval}{STORE_SUFFIX}"
+
+
+def _info_entry(capture_dir: Path, ticker: str) -> Path:
+    return Path(capture_dir) / "info" / f"{ticker}.json"
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Passes calls through to another provider and captures every response
+    under capture_dir for ReplayProvider.
+
+    History responses of one (ticker, interval) are merged into a single
+    bar store entry, so a replay can serve any date range that was covered
+    by some recorded request.
+    """
+
+    def __init__(self, provider: MarketDataProvider, capture_dir: Path):
+        self.provider = provider
+        self.capture_dir = Path(capture_dir)
+        self._lock = threading.Lock()
+
+    def history(self, ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+        df = self.provider.history(ticker, start, end, interval)
+        self._record_history(ticker, interval, df)
+        return df
+
+    def history_batch(self, tickers: List[str], start: str, end: str, interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        histories = self.provider.history_batch(tickers, start, end, interval)
+        for ticker, df in histories.items():
+            self._record_history(ticker, interval, df)
+        return histories
+
+    def intraday(self, ticker: str, interval: str = "1m") -> pd.DataFrame:
+        df = self.provider.intraday(ticker, interval)
+        if df is not None and not df.empty:
+            with self._lock:
+                path = _intraday_entry(self.capture_dir, ticker, interval)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                save_bars(df, path)
+        return df
+
+    def intraday_since(self, ticker: str, since: pd.Timestamp, interval: str = "1m") -> pd.DataFrame:
+        df = self.provider.intraday_since(ticker, since, interval)
+        # Tails extend the captured session, so a replay serves the latest bars
+        self._record_bars(_intraday_entry(self.capture_dir, ticker, interval), df)
+        return df
+
+    def info(self, ticker: str) -> dict:
+        info = self.provider.info(ticker)
+        with self._lock:
+            path = _info_entry(self.capture_dir, ticker)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(info, f, default=str)
+        return info
+
+    def _record_history(self, ticker: str, interval: str, df: pd.DataFrame) -> None:
+        self._record_bars(_history_entry(self.capture_dir, ticker, interval), df)
+
+    def _record_bars(self, path: Path, df: pd.DataFrame) -> None:
+        # Merges a response into the captured entry (newer bars win)
+        if df is None or df.empty:
+            return
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            captured = load_bars(path)
+            if captured is not None and not captured.empty:
+                df = pd.concat([captured, df])
+                df = df[~df.index.duplicated(keep='last')].sort_index()
+            save_bars(df, path)
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves responses captured by RecordingProvider from local files, after
+    a simulated network latency.
+
+    Makes the whole fetch path (cache refresh, metadata, the app's
+    download worker) deterministic and runnable without network access,
+    for profiling and load tests. Requests that were never captured get
+    the provider's "no data" answer: an empty frame, or a KeyError from
+    info().
+    """
+
+    def __init__(self, capture_dir: Path, latency: Latency = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            capture_dir (Path): Directory written by RecordingProvider.
+            latency (float or tuple): Seconds per call, or a (min, max) range drawn uniformly.
+            seed (int): Seed of the latency draws.
+        """
+        self.capture_dir = Path(capture_dir)
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._frames: Dict[Path, Optional[pd.DataFrame]] = {}
+        self.calls = 0
+
+    def _wait(self) -> None:
+        with self._lock:
+            self.calls += 1
+            if isinstance(self.latency, tuple):
+                delay = self._rng.uniform(*self.latency)
+            else:
+                delay = self.latency
+        if delay > 0:
+            time.sleep(delay)
+
+    def _load(self, path: Path) -> Optional[pd.DataFrame]:
+        # Captured entries are read once and kept; callers get copies
+        with self._lock:
+            if path not in self._frames:
+                self._frames[path] = load_bars(path)
+            return self._frames[path]
+
+    def history(self, ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
+        self._wait()
+        df = self._load(_history_entry(self.capture_dir, ticker, interval))
+        if df is None:
+            logger.warning(f"No captured history for {ticker} {interval}")
+            return pd.DataFrame()
+        tz = df.index.tz
+        lo = pd.Timestamp(start).tz_localize(tz) if tz is not None else pd.Timestamp(start)
+        hi = pd.Timestamp(end).tz_localize(tz) if tz is not None else pd.Timestamp(end)
+        index = df.index
+        return df.iloc[index.searchsorted(lo, side='left'):index.searchsorted(hi, side='left')].copy()
+
+    def intraday(self, ticker: str, interval: str = "1m") -> pd.DataFrame:
+        self._wait()
+        df = self._load(_intraday_entry(self.capture_dir, ticker, interval))
+        if df is None:
+            logger.warning(f"No captured {interval} session for {ticker}")
+            return pd.DataFrame()
+        return df.copy()
+
+    def info(self, ticker: str) -> dict:
+        self._wait()
+        path = _info_entry(self.capture_dir, ticker)
+        if not path.exists():
+            raise KeyError(f"No captured metadata for {ticker}")
+        with open(path, 'r') as f:
+            return json.load(f)
+
+
+def parse_latency(text: str) -> Latency:
+    """Parses "0.2" or "0.1-0.4" (seconds)."""
+    if "-" in text.strip()[1:]:
+        lo, hi = text.split("-", 1)
+        return float(lo), float(hi)
+    return float(text)
+
+
+_provider: Optional[MarketDataProvider] = None
+_provider_lock = threading.Lock()
+
+
+def provider_from_env() -> MarketDataProvider:
+    """
+    Builds the provider selected by the environment.
+
+    CHART_REPLAY_DIR serves captured responses (with CHART_REPLAY_LATENCY
+    simulated delay); otherwise yfinance is used, recorded into
+    CHART_RECORD_DIR when that is set. Worker processes inherit the
+    environment, so the choice carries over to render_charts.py.
+    """
+    replay_dir = os.environ.get(REPLAY_DIR_ENV)
+    if replay_dir:
+        latency = parse_latency(os.environ.get(REPLAY_LATENCY_ENV, "0"))
+        logger.info(f"Replaying market data from {replay_dir} (latency {latency}s)")
+        return ReplayProvider(Path(replay_dir), latency)
+    provider = YFinanceProvider()
+    record_dir = os.environ.get(RECORD_DIR_ENV)
+    if record_dir:
+        logger.info(f"Recording market data to {record_dir}")
+        return RecordingProvider(provider, Path(record_dir))
+    return provider
+
+
+def get_provider() -> MarketDataProvider:
+    """The process-wide provider (built from the environment on first use)."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = provider_from_env()
+        return _provider
+
+
+def set_provider(provider: Optional[MarketDataProvider]) -> None:
+    """Replaces the process-wide provider (None: rebuild from the environment on next use)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
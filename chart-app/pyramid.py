@@ -0,0 +1,236 @@
+# pyramid.py
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+import perf
+from bar_schema import frame_nbytes
+from indicators import IndicatorEngine
+from lru_cache import ByteLRU
+
+logger = logging.getLogger(__name__)
+
+# Memory budget of all (ticker, interval) pyramids: bars, levels and indicators
+MEMORY_BUDGET_ENV = "CHART_MEMORY_MB"
+DEFAULT_MEMORY_MB = 256
+# The most recently used pyramids keep their levels (indicator columns);
+# older ones keep only their compact bars and rebuild levels when shown again
+LEVELED_PYRAMIDS = 3
+
+
+def resample_bars(df: pd.DataFrame, rule: Optional[str]) -> pd.DataFrame:
+    """
+    Resamples OHLCV bars for a chart resample rule.
+
+    "2D"/"3D" style rules group every N trading bars by position (so
+    weekends and holidays never produce short bars); other rules use
+    pandas time-based resampling. None returns the bars unchanged.
+
+    Args:
+        df (pd.DataFrame): Raw bars (not modified).
+        rule (str, optional): Resample rule from _get_interval_settings.
+
+    Returns:
+        pd.DataFrame: The resampled bars.
+    """
+    if not rule:
+        return df
+
+    if rule.endswith("D"):
+        # Custom Integer-based Resampling (Trading Days)
+        try:
+            n_days = int(rule[:-1])
+        except ValueError:
+            return df # Fallback if rule parsing fails
+
+        out = df.copy()
+        out.index.name = 'Date_Index'
+        out = out.reset_index()
+        out['group_id'] = out.index // n_days
+        out['period_start'] = out['Date_Index']
+        logic = {
+            'Date_Index': 'last', # Timestamp of the closed bar
+            'period_start': 'first', # Start of the bar
+            'open': 'first',
+            'high': 'max',
+            'low': 'min',
+            'close': 'last',
+            'volume': 'sum'
+        }
+        agg_dict = {k: v for k, v in logic.items() if k in out.columns}
+        out = out.groupby('group_id').agg(agg_dict)
+        out = out.set_index('Date_Index')
+        out.index.name = 'Date'
+        return out
+
+    # Standard Time-based resampling
+    logic = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    cols = {k: v for k, v in logic.items() if k in df.columns}
+    if not cols:
+        return df
+    return df.resample(rule).agg(cols).dropna()
+
+
+class BarPyramid:
+    """
+    Every resample level of one bar series, each with its indicator columns.
+
+    Levels are built on first use and then kept, so switching between
+    time windows that share an interval is a lookup. Each level has its
+    own IndicatorEngine. When the series is refreshed, a level whose
+    bars only grew or had the last bar revised is updated incrementally.
+
+    Thread-safe: grid tiles build levels on worker threads while the main
+    chart reads them.
+    """
+
+    def __init__(self, raw_df: pd.DataFrame):
+        self.raw_df = raw_df
+        self._levels: Dict[Optional[str], pd.DataFrame] = {}
+        self._engines: Dict[Optional[str], IndicatorEngine] = {}
+        self._stale = set()
+        self._lock = threading.RLock()
+
+    def update(self, raw_df: pd.DataFrame) -> None:
+        """Replaces the raw bars (a new fetch of the same series); levels refresh on next use."""
+        with self._lock:
+            if raw_df is self.raw_df:
+                return # Served from memory: the levels are still valid
+            self.raw_df = raw_df
+            self._stale = set(self._levels)
+
+    def level(self, rule: Optional[str]) -> pd.DataFrame:
+        """
+        Returns the bars for a resample rule, with indicator columns.
+
+        The returned frame is shared between callers and must not be modified.
+
+        Args:
+            rule (str, optional): Resample rule (None for the raw bars).
+
+        Returns:
+            pd.DataFrame: Resampled bars plus INDICATOR_COLUMNS.
+        """
+        with self._lock:
+            if rule in self._levels and rule not in self._stale:
+                return self._levels[rule]
+
+            engine = self._engines.setdefault(rule, IndicatorEngine())
+            with perf.span("resample", rule=rule):
+                bars = resample_bars(self.raw_df, rule)
+            # update() returns a new frame, so the shared raw bars are never extended in place
+            with perf.span("indicators", rule=rule) as span:
+                self._levels[rule] = engine.update(bars)
+                span.note(rows=len(bars), mode=engine.last_mode)
+            self._stale.discard(rule)
+            logger.debug(f"Pyramid level {rule or 'raw'}: {len(bars)} bars ({engine.last_mode})")
+            return self._levels[rule]
+
+    def release_levels(self) -> bool:
+        """Drops every level and its indicator state, keeping the raw bars; False if there were none."""
+        with self._lock:
+            if not self._levels and not self._engines:
+                return False
+            self._levels.clear()
+            self._engines.clear()
+            self._stale.clear()
+            return True
+
+    def nbytes(self) -> int:
+        """Bytes held by the raw bars and every built level (indicator columns included)."""
+        with self._lock:
+            levels = list(self._levels.items())
+        total = frame_nbytes(self.raw_df)
+        for rule, df in levels:
+            total += frame_nbytes(df)
+            if rule is None:
+                # The raw level shares the bar columns and index of raw_df
+                total -= frame_nbytes(self.raw_df)
+        return total
+
+
+class PyramidCache:
+    """
+    Bar pyramids keyed by (ticker, interval) in a ByteLRU: the least recently
+    used are dropped first once their bars and levels exceed the budget.
+
+    Only the last `leveled` pyramids used keep their resample levels, so
+    tickers in the background cost just their compact bars. A revisited
+    ticker whose bars are still current is served by current_bars()
+    without touching the disk or the network.
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None, leveled: int = LEVELED_PYRAMIDS):
+        if budget_bytes is None:
+            budget_bytes = int(float(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_MEMORY_MB)) * (1 << 20))
+        self.leveled = leveled
+        self._lru = ByteLRU(budget_bytes, sizeof=BarPyramid.nbytes)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._lru.stats
+
+    @property
+    def budget_bytes(self) -> int:
+        return self._lru.budget_bytes
+
+    def store(self, ticker: str, interval: str, raw_df: pd.DataFrame) -> BarPyramid:
+        """Registers freshly fetched bars, reusing the existing pyramid (and its indicator state)."""
+        key = (ticker, interval)
+        pyramid = self._lru.peek(key)
+        if pyramid is None:
+            pyramid = BarPyramid(raw_df)
+        else:
+            pyramid.update(raw_df)
+        self._lru.put(key, pyramid)
+        self._release_background()
+        return pyramid
+
+    def get(self, ticker: str, interval: str, rule: Optional[str]) -> Optional[pd.DataFrame]:
+        """Bars for (ticker, interval, rule), or None if that series is not in memory."""
+        key = (ticker, interval)
+        pyramid = self._lru.get(key)
+        if pyramid is None:
+            return None
+        self._release_background()
+        df = pyramid.level(rule)
+        self._lru.resize(key) # A new level may have been built
+        return df
+
+    def current_bars(self, ticker: str, interval: str, session: str) -> Optional[pd.DataFrame]:
+        """
+        The raw bars of (ticker, interval) if they are in memory and current.
+
+        Bars count as current when they were refreshed for `session`
+        (attrs['refreshed'], set by load_history). Safe to call from worker threads.
+
+        Args:
+            ticker (str): The stock symbol.
+            interval (str): Bar interval.
+            session (str): Session date (YYYY-MM-DD) the bars must be current to.
+
+        Returns:
+            Optional[pd.DataFrame]: The bars, or None (then fetch them).
+        """
+        pyramid = self._lru.get((ticker, interval))
+        if pyramid is None or pyramid.raw_df.attrs.get('refreshed') != session:
+            return None
+        return pyramid.raw_df
+
+    def _release_background(self) -> None:
+        entries = list(self._lru.items())
+        background = entries[:-self.leveled] if self.leveled > 0 else entries
+        for key, pyramid in background:
+            if pyramid.release_levels():
+                self._lru.resize(key)
+
+    def memory_usage(self) -> Dict[Tuple[str, str], int]:
+        """Bytes held per (ticker, interval), most recently used last."""
+        return {key: pyramid.nbytes() for key, pyramid in self._lru.items()}
+
+    def summary(self) -> str:
+        """Entries, bytes against the budget, hits, misses and evictions."""
+        return self._lru.summary()
@@ -0,0 +1,205 @@
+# render_charts.py
+"""
+Renders chart images for a watchlist without the GUI, e.g. an end-of-day
+chart pack:
+
+    python render_charts.py tickers.txt --windows 1Y,3M,1WK --out charts --format png --processes 4
+
+Charts are drawn by the same ChartView as the app, on the Agg backend, with
+the app's default indicators unless overridden. Each ticker is rendered by
+one worker process; the run reports throughput in charts per second per
+process.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from chart_view import ChartSettings, MA_LINES, WINDOWS, interval_settings, render_chart
+from fetch_orchestrator import orchestrator_from_env, set_orchestrator
+from history_cache import fetch_bars
+from metadata_cache import MetadataCache, title_fields
+from pyramid import BarPyramid
+from stock_util import read_tickers_from_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOWS = ["1Y"]
+FORMATS = ["png", "svg"]
+
+# One read-only metadata cache per worker process and cache directory
+_metadata_caches: Dict[Path, MetadataCache] = {}
+
+
+class RenderResult(NamedTuple):
+    ticker: str
+    window: str
+    path: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+
+
+def _metadata_cache(cache_dir: Path) -> MetadataCache:
+    """The process's metadata cache over cache_dir/info; its fetch returns nothing, so reads stay offline."""
+    info_dir = Path(cache_dir) / "info"
+    if info_dir not in _metadata_caches:
+        _metadata_caches[info_dir] = MetadataCache(lambda t: {}, info_dir)
+    return _metadata_caches[info_dir]
+
+
+def _init_worker(processes: int) -> None:
+    """Gives the worker its share of the fetch limits, so the pool as a whole keeps to them."""
+    set_orchestrator(orchestrator_from_env(processes))
+
+
+def render_ticker(ticker: str, windows: List[str], settings: ChartSettings, out_dir: Path, fmt: str = "png",
+                  figsize: Tuple[float, float] = (16, 9), dpi: int = 100, cache_dir: Path = Path("cache"),
+                  load: Callable[[str, str, Path], pd.DataFrame] = fetch_bars) -> List[RenderResult]:
+    """
+    Renders every window of one ticker to out_dir/{ticker}_{window}.{fmt}.
+
+    Windows that share a download interval share one fetch and one bar
+    pyramid. The title uses the metadata already cached by the app (no
+    network call); without it the ticker is shown.
+
+    Args:
+        ticker (str): The stock symbol.
+        windows (List[str]): Chart windows (10Y ... 1D).
+        settings (ChartSettings): Indicator and VP settings (the window field is replaced).
+        out_dir (Path): Output directory.
+        fmt (str): Image format (png or svg).
+        figsize (tuple): Figure size in inches.
+        dpi (int): Resolution of raster output.
+        cache_dir (Path): Bar store directory.
+        load (callable): Returns the bars as load(ticker, interval, cache_dir) (default fetch_bars).
+
+    Returns:
+        List[RenderResult]: One result per window.
+    """
+    info = _metadata_cache(cache_dir).get(ticker)
+    company, previous_close, current_price = title_fields(ticker, info)
+    pyramids = {}
+    results = []
+    for window in windows:
+        t0 = time.perf_counter()
+        path = Path(out_dir) / f"{ticker}_{window}.{fmt}"
+        try:
+            interval, rule = interval_settings(window)
+            if interval not in pyramids:
+                raw_df = load(ticker, interval, cache_dir)
+                pyramids[interval] = BarPyramid(raw_df) if raw_df is not None and not raw_df.empty else None
+            pyramid = pyramids[interval]
+            if pyramid is None:
+                results.append(RenderResult(ticker, window, None, time.perf_counter() - t0, "no data"))
+                continue
+            drawn = render_chart(pyramid.level(rule), settings._replace(window=window), interval, path,
+                                 raw_df=pyramid.raw_df, company=company, previous_close=previous_close,
+                                 current_price=current_price, figsize=figsize, dpi=dpi)
+            error = None if drawn else "no bars in window"
+            results.append(RenderResult(ticker, window, str(path) if drawn else None,
+                                        time.perf_counter() - t0, error))
+        except Exception as e:
+            results.append(RenderResult(ticker, window, None, time.perf_counter() - t0, str(e)))
+    return results
+
+
+def render_charts(tickers: List[str], windows: List[str], settings: ChartSettings = ChartSettings(),
+                  out_dir: Path = Path("charts"), fmt: str = "png", processes: Optional[int] = None,
+                  **kwargs) -> List[RenderResult]:
+    """
+    Renders a watchlist across a process pool (one ticker per task).
+
+    Args:
+        tickers (List[str]): Stock symbols.
+        windows (List[str]): Chart windows per ticker.
+        settings (ChartSettings): Indicator and VP settings.
+        out_dir (Path): Output directory.
+        fmt (str): Image format (png or svg).
+        processes (int): Worker processes (default: CPU count). They split the
+                         CHART_FETCH_* limits for stale entries refreshed while rendering.
+        **kwargs: Passed to render_ticker (figsize, dpi, cache_dir, load).
+
+    Returns:
+        List[RenderResult]: One result per (ticker, window), in completion order.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    results = []
+    workers = max(1, min(processes or os.cpu_count() or 1, len(tickers)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,)) as executor:
+        futures = {executor.submit(render_ticker, ticker, windows, settings, out_dir, fmt, **kwargs): ticker
+                   for ticker in tickers}
+        for future in as_completed(futures):
+            try:
+                batch = future.result()
+            except Exception as e:
+                # A worker died (e.g. out of memory): report every window of its ticker
+                batch = [RenderResult(futures[future], window, None, 0.0, str(e)) for window in windows]
+            for result in batch:
+                if result.error:
+                    logger.error(f"{result.ticker} {result.window}: {result.error}")
+            results.extend(batch)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = ChartSettings()
+    parser = argparse.ArgumentParser(description="Render chart images for a watchlist without the GUI.")
+    parser.add_argument("tickers", help="Text file with one ticker per line")
+    parser.add_argument("--windows", default=",".join(DEFAULT_WINDOWS),
+                        help=f"Comma-separated chart windows out of {','.join(WINDOWS)} (default %(default)s)")
+    parser.add_argument("--out", default="charts", help="Output directory (default %(default)s)")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Worker processes (default: CPUs); the CHART_FETCH_* limits are split between them")
+    parser.add_argument("--size", default="16x9", help="Figure size in inches, WxH (default %(default)s)")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--cache-dir", default="cache", help="Bar store directory (default %(default)s)")
+    parser.add_argument("--font-size", type=int, default=defaults.font_size)
+    parser.add_argument("--mas", default=",".join(defaults.mas),
+                        help=f"Visible moving averages out of {','.join(c for c, _, _ in MA_LINES)}")
+    parser.add_argument("--vp-bins", type=int, default=defaults.vp_bins)
+    parser.add_argument("--vp-position", choices=["Left", "Right"], default=defaults.vp_position)
+    for name in ["bbands", "volume", "macd", "rsi", "vp"]:
+        parser.add_argument(f"--no-{name}", action="store_true", help=f"Hide {name}")
+    args = parser.parse_args(argv)
+
+    windows = [w.strip() for w in args.windows.split(",") if w.strip()]
+    unknown = [w for w in windows if w not in WINDOWS]
+    if unknown:
+        parser.error(f"unknown windows: {', '.join(unknown)}")
+    tickers = read_tickers_from_file(args.tickers)
+    if not tickers:
+        return 2
+
+    settings = ChartSettings(
+        font_size=args.font_size,
+        mas=tuple(m.strip() for m in args.mas.split(",") if m.strip()),
+        show_bbands=not args.no_bbands,
+        show_volume=not args.no_volume,
+        show_macd=not args.no_macd,
+        show_rsi=not args.no_rsi,
+        show_vp=not args.no_vp,
+        vp_bins=args.vp_bins,
+        vp_position=args.vp_position,
+    )
+    figsize = tuple(float(v) for v in args.size.lower().split("x"))
+
+    t0 = time.perf_counter()
+    results = render_charts(tickers, windows, settings, Path(args.out), args.format, args.processes,
+                            figsize=figsize, dpi=args.dpi, cache_dir=Path(args.cache_dir))
+    elapsed = time.perf_counter() - t0
+
+    rendered = sum(1 for r in results if not r.error)
+    rate = rendered / elapsed if elapsed > 0 else 0.0
+    logger.info(f"Rendered {rendered}/{len(results)} charts in {elapsed:.1f}s: {rate:.2f} charts/s, "
+                f"{rate / args.processes:.2f} charts/s per process ({args.processes} processes)")
+    return 1 if rendered < len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
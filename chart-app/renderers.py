@@ -0,0 +1,133 @@
+# renderers.py
+from typing import Tuple
+
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+
+# Candle body width in bar units (matches the previous ax.bar width)
+CANDLE_WIDTH = 0.6
+
+
+def _colors(mask: np.ndarray, true_color, false_color, alpha=None) -> np.ndarray:
+    """Per-item RGBA array chosen by a boolean mask."""
+    rgba = to_rgba_array([true_color, false_color], alpha=alpha)
+    return np.where(mask[:, None], rgba[0], rgba[1])
+
+
+def _rect_verts(x: np.ndarray, bottom: np.ndarray, top: np.ndarray, width: np.ndarray) -> np.ndarray:
+    """(n, 4, 2) rectangle vertices centred on x."""
+    half = width / 2.0
+    verts = np.empty((len(x), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = x - half
+    verts[:, 2, 0] = verts[:, 3, 0] = x + half
+    verts[:, 0, 1] = verts[:, 3, 1] = bottom
+    verts[:, 1, 1] = verts[:, 2, 1] = top
+    return verts
+
+
+def set_candles(wicks: LineCollection, bodies: PolyCollection, x, open_, high, low, close,
+                width=CANDLE_WIDTH, up_color='green', down_color='red', up_face='white') -> None:
+    """
+    Replaces the candles shown by a (wicks, bodies) pair from draw_candles().
+
+    Bars with a missing price (e.g. empty 1-minute slots) are skipped.
+
+    Args:
+        wicks (LineCollection): Wick collection to update.
+        bodies (PolyCollection): Body collection to update.
+        x, open_, high, low, close (array-like): Bar positions and prices.
+        width (float or array-like): Body width in x units, per bar or shared.
+        up_color, down_color (str): Wick/edge colours of rising and falling bars.
+        up_face (str): Body fill of rising bars (falling bars are filled solid).
+    """
+    x, o, h, l, c = (np.asarray(a, dtype=float) for a in (x, open_, high, low, close))
+    width = np.broadcast_to(np.asarray(width, dtype=float), x.shape)
+    valid = np.isfinite(x) & np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(c)
+    x, o, h, l, c, width = x[valid], o[valid], h[valid], l[valid], c[valid], width[valid]
+    up = c >= o
+
+    segments = np.empty((len(x), 2, 2))
+    segments[:, :, 0] = x[:, None]
+    segments[:, 0, 1] = l
+    segments[:, 1, 1] = h
+    edge = _colors(up, up_color, down_color)
+    wicks.set_segments(segments)
+    wicks.set_color(edge)
+
+    bodies.set_verts(_rect_verts(x, np.minimum(o, c), np.maximum(o, c), width))
+    bodies.set_facecolor(_colors(up, up_face, down_color))
+    bodies.set_edgecolor(edge)
+
+
+def draw_candles(ax, x, open_, high, low, close, width=CANDLE_WIDTH,
+                 up_color='green', down_color='red', up_face='white',
+                 linewidth=1) -> Tuple[LineCollection, PolyCollection]:
+    """
+    Draws candlesticks as one LineCollection of wicks and one PolyCollection of bodies.
+
+    Args:
+        ax: Axes to draw on.
+        x, open_, high, low, close (array-like): Bar positions and prices.
+        width (float or array-like): Body width in x units, per bar or shared.
+        up_color, down_color (str): Wick/edge colours of rising and falling bars.
+        up_face (str): Body fill of rising bars (falling bars are filled solid).
+        linewidth (float): Wick and body edge width in points.
+
+    Returns:
+        tuple: (wicks, bodies) collections.
+    """
+    wicks = LineCollection([], linewidths=linewidth)
+    bodies = PolyCollection([], linewidths=linewidth)
+    set_candles(wicks, bodies, x, open_, high, low, close, width, up_color, down_color, up_face)
+    ax.add_collection(wicks, autolim=True)
+    ax.add_collection(bodies, autolim=True)
+    ax.autoscale_view()
+    return wicks, bodies
+
+
+def set_bars(bars: PolyCollection, x, heights, positive, width=CANDLE_WIDTH,
+             up_color='green', down_color='red', alpha=None) -> None:
+    """
+    Replaces the bars shown by a collection from draw_bars().
+
+    Args:
+        bars (PolyCollection): Bar collection to update.
+        x, heights (array-like): Bar positions and signed heights.
+        positive (array-like of bool): Bars drawn in up_color (others in down_color).
+        width (float or array-like): Bar width in x units, per bar or shared.
+        up_color, down_color (str): Fill colours.
+        alpha (float, optional): Fill alpha.
+    """
+    x = np.asarray(x, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    positive = np.asarray(positive, dtype=bool)
+    width = np.broadcast_to(np.asarray(width, dtype=float), x.shape)
+    valid = np.isfinite(x) & np.isfinite(heights)
+    x, heights, positive, width = x[valid], heights[valid], positive[valid], width[valid]
+
+    bars.set_verts(_rect_verts(x, np.zeros_like(heights), heights, width))
+    bars.set_facecolor(_colors(positive, up_color, down_color, alpha=alpha))
+
+
+def draw_bars(ax, x, heights, positive, width=CANDLE_WIDTH,
+              up_color='green', down_color='red', alpha=None) -> PolyCollection:
+    """
+    Draws vertical bars from zero as a single PolyCollection.
+
+    Args:
+        ax: Axes to draw on.
+        x, heights (array-like): Bar positions and signed heights.
+        positive (array-like of bool): Bars drawn in up_color (others in down_color).
+        width (float or array-like): Bar width in x units, per bar or shared.
+        up_color, down_color (str): Fill colours.
+        alpha (float, optional): Fill alpha.
+
+    Returns:
+        PolyCollection: The bars.
+    """
+    bars = PolyCollection([], edgecolors='none', linewidths=0)
+    set_bars(bars, x, heights, positive, width, up_color, down_color, alpha)
+    ax.add_collection(bars, autolim=True)
+    ax.autoscale_view()
+    return bars
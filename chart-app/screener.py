@@ -0,0 +1,288 @@
+# screener.py
+"""
+Screens every cached ticker with indicator filters in one vectorized pass.
+
+The last LOOKBACK bars of each series are read straight from the bar store
+into a (bars, tickers) panel, and the chart's indicators are computed for
+all columns at once (indicators.panel_indicators), so a 500-ticker universe
+takes well under a second and needs no network.
+
+    python screener.py "RSI < 30 and close > MA200" --top 20
+    python screener.py "close crosses above MA50" --tickers tickers.txt --sort change
+
+A filter is one or more conditions joined by "and" / "or" ("and" binds
+tighter). Each condition compares two operands, field names (case does not
+matter) or numbers, with <, <=, >, >=, "crosses above" or "crosses below".
+Comparisons look at the last bar; crosses also at the bar before it.
+Matches are ranked by how far they clear the first condition of their
+group, as a fraction of its right-hand side.
+"""
+import argparse
+import logging
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+import perf
+from bar_store import DEFAULT_TZ, STORE_SUFFIX, load_tail
+from history_cache import cache_path
+from indicators import INDICATOR_COLUMNS, panel_indicators
+from stock_util import read_tickers_from_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = '1d'
+# Bars read per ticker: MA200 plus enough warm-up that the EWM-based
+# indicators (MACD, RSI) match a full-history computation to ~1e-10
+LOOKBACK = 400
+DEFAULT_TOP = 20
+
+FIELDS = ['close', 'volume', 'change'] + INDICATOR_COLUMNS + ['bb_pos']
+COMPARISONS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+CROSSES = ('crosses above', 'crosses below')
+
+_OPERAND = r"[A-Za-z_]\w*|[-+]?(?:\d+\.?\d*|\.\d+)"
+_CONDITION = re.compile(rf"^\s*(?P<left>{_OPERAND})\s*(?P<op><=|>=|<|>|crosses\s+above|crosses\s+below)"
+                        rf"\s*(?P<right>{_OPERAND})\s*$", re.IGNORECASE)
+
+
+class Panel(NamedTuple):
+    tickers: List[str]
+    index: pd.DatetimeIndex        # Bar times shared by every column
+    fields: Dict[str, np.ndarray]  # FIELDS, each (bars, tickers)
+    current: np.ndarray            # Per ticker: has a bar at index[-1]
+    missing: List[str]             # Tickers without a usable cache entry
+
+
+class Condition(NamedTuple):
+    left: Union[str, float]
+    op: str
+    right: Union[str, float]
+
+
+class ScreenResult(NamedTuple):
+    ticker: str
+    score: float
+    close: float
+    change: float
+    rsi: float
+    bb_pos: float
+
+
+def cached_tickers(cache_dir: Path = Path("cache"), interval: str = DEFAULT_INTERVAL) -> List[str]:
+    """Returns every ticker with a bar store entry for the interval."""
+    suffix = f"_{interval}{STORE_SUFFIX}"
+    return sorted(p.name[:-len(suffix)] for p in Path(cache_dir).glob(f"*{suffix}"))
+
+
+def load_panel(tickers: List[str], interval: str = DEFAULT_INTERVAL, cache_dir: Path = Path("cache"),
+               lookback: int = LOOKBACK) -> Panel:
+    """
+    Builds the screening panel from the bar store.
+
+    Tickers are aligned on the union of their bar times (the last lookback
+    of them). Bars a ticker lacks inside its history (halts, listings on
+    other calendars) repeat its previous close with zero volume; bars before
+    its first one stay NaN. Tickers whose last bar is older than the panel's
+    are kept but flagged as not current, and never match a filter.
+
+    Args:
+        tickers (List[str]): Ticker symbols.
+        interval (str): Bar interval of the cache entries.
+        cache_dir (Path): Bar store directory.
+        lookback (int): Bars per ticker.
+
+    Returns:
+        Panel: Prices, indicators and bb_pos for every loaded ticker.
+    """
+    with perf.span("screener.load", tickers=len(tickers)):
+        loaded, missing = [], []
+        for ticker in tickers:
+            tail = load_tail(cache_path(cache_dir, ticker, interval), ['close', 'volume'], lookback)
+            if tail is None or len(tail[0]) == 0:
+                missing.append(ticker)
+            else:
+                loaded.append((ticker, tail))
+
+        stamps = np.unique(np.concatenate([t[0] for _, t in loaded])) if loaded else np.empty(0, np.int64)
+        stamps = stamps[-lookback:]
+        close = np.full((len(stamps), len(loaded)), np.nan)
+        volume = np.zeros((len(stamps), len(loaded)))
+        current = np.zeros(len(loaded), dtype=bool)
+        for j, (_, (times, data)) in enumerate(loaded):
+            pos = np.searchsorted(stamps, times)
+            keep = (pos < len(stamps)) & (stamps[np.minimum(pos, len(stamps) - 1)] == times)
+            close[pos[keep], j] = data['close'][keep]
+            volume[pos[keep], j] = data['volume'][keep]
+            current[j] = times[-1] == stamps[-1]
+
+        # Forward-fill holes: each row takes the last row with a close
+        rows = np.where(np.isnan(close), 0, np.arange(len(stamps))[:, None])
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        close = close[rows, np.arange(len(loaded))]
+
+    with perf.span("screener.indicators", tickers=len(loaded), bars=len(stamps)):
+        fields = panel_indicators(close)
+        fields['close'] = close
+        fields['volume'] = volume
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.full(close.shape, np.nan)
+            change[1:] = (close[1:] / close[:-1] - 1) * 100
+            fields['change'] = change
+            fields['bb_pos'] = (close - fields['bb_lower']) / (fields['bb_upper'] - fields['bb_lower'])
+
+    index = pd.DatetimeIndex(stamps.view("datetime64[ns]")).tz_localize("UTC").tz_convert(DEFAULT_TZ)
+    return Panel([ticker for ticker, _ in loaded], index, fields, current, missing)
+
+
+def _operand(token: str) -> Union[str, float]:
+    if not (token[0].isalpha() or token[0] == '_'):
+        return float(token)
+    name = token.lower()
+    if name not in FIELDS:
+        raise ValueError(f"Unknown field '{token}' (fields: {', '.join(FIELDS)})")
+    return name
+
+
+def parse_filter(expression: str) -> List[List[Condition]]:
+    """
+    Parses a filter into groups of conditions: any group matches if all of its conditions do.
+
+    Args:
+        expression (str): e.g. "RSI < 30 and close > MA200 or close crosses above MA50".
+
+    Returns:
+        List[List[Condition]]: The "or" groups of "and" conditions.
+
+    Raises:
+        ValueError: If a condition cannot be parsed or names an unknown field.
+    """
+    groups = []
+    for group in re.split(r"\s+or\s+", expression.strip(), flags=re.IGNORECASE):
+        conditions = []
+        for text in re.split(r"\s+and\s+", group, flags=re.IGNORECASE):
+            match = _CONDITION.match(text)
+            if not match:
+                raise ValueError(f"Cannot parse '{text.strip()}': expected <field or number> "
+                                 f"<, <=, >, >=, crosses above or crosses below <field or number>")
+            op = " ".join(match.group('op').lower().split())
+            conditions.append(Condition(_operand(match.group('left')), op, _operand(match.group('right'))))
+        groups.append(conditions)
+    return groups
+
+
+def _values(panel: Panel, operand: Union[str, float], row: int) -> np.ndarray:
+    if isinstance(operand, str):
+        return panel.fields[operand][row]
+    return np.full(len(panel.tickers), operand)
+
+
+def _evaluate(panel: Panel, condition: Condition):
+    """Returns (matches, margin) per ticker for one condition."""
+    left, right = _values(panel, condition.left, -1), _values(panel, condition.right, -1)
+    if condition.op in CROSSES:
+        if len(panel.index) < 2:
+            return np.zeros(len(panel.tickers), dtype=bool), np.full(len(panel.tickers), np.nan)
+        before = _values(panel, condition.left, -2) - _values(panel, condition.right, -2)
+        if condition.op == 'crosses above':
+            matches = (before <= 0) & (left > right)
+        else:
+            matches = (before >= 0) & (left < right)
+    else:
+        matches = COMPARISONS[condition.op](left, right)
+    sign = 1.0 if condition.op in ('>', '>=', 'crosses above') else -1.0
+    scale = np.abs(right)
+    with np.errstate(invalid='ignore'):
+        margin = sign * (left - right) / np.where(scale > 0, scale, 1.0)
+    return matches, margin
+
+
+def screen(panel: Panel, expression: str, sort: Optional[str] = None, ascending: bool = False,
+           limit: Optional[int] = None) -> List[ScreenResult]:
+    """
+    Returns the current tickers matching a filter, best first.
+
+    Args:
+        panel (Panel): Built by load_panel.
+        expression (str): Filter, see parse_filter.
+        sort (str): Rank by this field's last value instead of the filter margin.
+        ascending (bool): Smallest first.
+        limit (int): Keep only the first results.
+
+    Returns:
+        List[ScreenResult]: The matches with their score and a few last values.
+
+    Raises:
+        ValueError: If the filter or sort field is invalid.
+    """
+    groups = parse_filter(expression)
+    if sort is not None:
+        sort = _operand(sort)
+        if not isinstance(sort, str):
+            raise ValueError(f"Cannot sort by a number: {sort}")
+    if len(panel.index) == 0:
+        return []
+    with perf.span("screener.filter", tickers=len(panel.tickers)):
+        score = np.full(len(panel.tickers), -np.inf)
+        matched = np.zeros(len(panel.tickers), dtype=bool)
+        for group in groups:
+            evaluated = [_evaluate(panel, condition) for condition in group]
+            matches = np.logical_and.reduce([panel.current] + [m for m, _ in evaluated])
+            # A ticker matching several groups keeps its best margin
+            score = np.where(matches, np.fmax(score, evaluated[0][1]), score)
+            matched |= matches
+        hits = np.flatnonzero(matched)
+
+        key = panel.fields[sort][-1] if sort else score
+        key = key[hits] if ascending else -key[hits]
+        hits = hits[np.argsort(np.nan_to_num(key, nan=np.inf), kind='stable')][:limit]
+
+    last = {name: panel.fields[name][-1] for name in ('close', 'change', 'rsi', 'bb_pos')}
+    return [ScreenResult(panel.tickers[j], float(score[j]), *(float(last[name][j]) for name in last))
+            for j in hits]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Screen cached tickers with indicator filters.")
+    parser.add_argument("filter", help='e.g. "RSI < 30 and close > MA200"')
+    parser.add_argument("--tickers", help="Text file with one ticker per line (default: every cached ticker)")
+    parser.add_argument("--interval", default=DEFAULT_INTERVAL, help="Bar interval (default %(default)s)")
+    parser.add_argument("--cache-dir", default="cache", help="Store directory (default %(default)s)")
+    parser.add_argument("--sort", help="Rank by this field instead of the filter margin")
+    parser.add_argument("--ascending", action="store_true", help="Smallest first")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Results shown (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        tickers = read_tickers_from_file(args.tickers)
+    else:
+        tickers = cached_tickers(Path(args.cache_dir), args.interval)
+    if not tickers:
+        logger.error("No tickers to screen")
+        return 2
+
+    t0 = time.perf_counter()
+    panel = load_panel(tickers, args.interval, Path(args.cache_dir))
+    try:
+        results = screen(panel, args.filter, sort=args.sort, ascending=args.ascending)
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+    elapsed = time.perf_counter() - t0
+
+    for r in results[:args.top]:
+        print(f"{r.ticker:<8} score {r.score:8.3f}  close {r.close:10.2f}  change {r.change:6.2f}%  "
+              f"RSI {r.rsi:5.1f}  BB {r.bb_pos:5.2f}")
+    logger.info(f"{len(results)} matches among {int(panel.current.sum())} current tickers "
+                f"({len(panel.missing)} missing) in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,12 @@
 # stock_util.py
 import logging
 import time
-from typing import List, Optional
+from typing import Dict, List, Optional
 import yfinance as yf
 import pandas as pd
 
+from fetch_orchestrator import get_orchestrator
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -12,6 +14,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rate limit bucket shared by every Yahoo request (query1 / query2 are one service)
+YAHOO_HOST = "query.finance.yahoo.com"
+
 def read_tickers_from_file(file_path: str) -> List[str]:
     """
     Reads a list of stock tickers from a text file.
@@ -34,10 +39,23 @@ def read_tickers_from_file(file_path: str) -> List[str]:
         logger.error(f"Error reading ticker file: {e}")
         return []
 
+def _download_history(ticker: str, start: str, end: str, interval: str) -> pd.DataFrame:
+    # Use auto_adjust=False to match visual trading prices
+    return yf.Ticker(ticker).history(start=start, end=end, interval=interval, auto_adjust=False)
+
+def _download_intraday(ticker: str, interval: str, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+    # Use auto_adjust=False to get RAW price (matches IBKR/Screen)
+    if start is not None:
+        return yf.Ticker(ticker).history(start=start, interval=interval, auto_adjust=False)
+    return yf.Ticker(ticker).history(period="1d", interval=interval, auto_adjust=False)
+
 def get_stock_history(ticker: str, start: str, end: str, interval: str = "1d") -> pd.DataFrame:
     """
     Downloads historical stock data for a given ticker.
 
+    The request goes through the shared fetch orchestrator (concurrency
+    cap, Yahoo rate limit, retries with backoff, timeout).
+
     Args:
         ticker (str): The stock symbol (e.g., 'AAPL').
         start (str): Start date string (YYYY-MM-DD).
@@ -49,9 +67,7 @@ def get_stock_history(ticker: str, start: str, end: str, interval: str = "1d") -
                       Returns empty DataFrame on failure.
     """
     try:
-        stock = yf.Ticker(ticker)
-        # Use auto_adjust=False to match visual trading prices
-        history = stock.history(start=start, end=end, interval=interval, auto_adjust=False)
+        history = get_orchestrator().run(YAHOO_HOST, _download_history, ticker, start, end, interval)
         
         if history.empty:
             logger.warning(f"No data returned for {ticker} from {start} to {end}")
@@ -59,4 +75,61 @@ def get_stock_history(ticker: str, start: str, end: str, interval: str = "1d") -
         return history
     except Exception as e:
         logger.error(f"Failed to fetch history for {ticker}: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+def get_intraday_history(ticker: str, interval: str = "1m", start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Downloads the bars of the latest session for a given ticker.
+
+    Args:
+        ticker (str): The stock symbol (e.g., 'AAPL').
+        interval (str): Data interval (default 1m).
+        start (pd.Timestamp): Only bars from this time on (default: the whole session).
+
+    Returns:
+        pd.DataFrame: DataFrame containing the session's bars.
+                      Returns empty DataFrame on failure.
+    """
+    try:
+        return get_orchestrator().run(YAHOO_HOST, _download_intraday, ticker, interval, start)
+    except Exception as e:
+        logger.error(f"Failed to fetch intraday history for {ticker}: {e}")
+        return pd.DataFrame()
+
+def get_stock_histories(tickers: List[str], start: str, end: str, interval: str = "1d") -> Dict[str, pd.DataFrame]:
+    """
+    Downloads historical data for several tickers concurrently.
+
+    Makes one request per ticker instead of a single batched yf.download
+    call, and fans them out through the fetch orchestrator, so a batch runs
+    as wide as its concurrency and rate limits allow.
+
+    Args:
+        tickers (List[str]): Stock symbols.
+        start (str): Start date string (YYYY-MM-DD).
+        end (str): End date string (YYYY-MM-DD).
+        interval (str): Data interval (default 1d).
+
+    Returns:
+        Dict[str, pd.DataFrame]: Bars per ticker; tickers without data are left out.
+    """
+    results = get_orchestrator().map(YAHOO_HOST, _download_history,
+                                     [(ticker, start, end, interval) for ticker in tickers])
+    histories = {}
+    for ticker, history in zip(tickers, results):
+        if isinstance(history, Exception):
+            logger.error(f"Failed to fetch history for {ticker}: {history}")
+        elif history is not None and not history.empty:
+            histories[ticker] = history
+    if not histories:
+        logger.warning(f"No data returned for {len(tickers)} tickers from {start} to {end}")
+    return histories
+
+def get_stock_info(ticker: str) -> dict:
+    """
+    Downloads the full metadata dict (profile, fundamentals, quote) of a ticker.
+
+    Raises:
+        Exception: The last attempt's error, once the retries are used up.
+    """
+    return get_orchestrator().run(YAHOO_HOST, lambda: yf.Ticker(ticker).info)
@@ -0,0 +1,168 @@
+# warm_cache.py
+"""
+Fills the local bar cache for a watchlist, so the app opens every ticker
+from disk.
+
+Meant to run unattended (cron / Task Scheduler) after the close:
+
+    python warm_cache.py tickers.txt --intervals 1d,1h,5m --workers 4
+
+Exit status is 0 when every series was refreshed, 1 if any failed and
+2 if the ticker file is empty or missing.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from history_cache import load_history, refresh_start, session_date
+from providers import MarketDataProvider, get_provider
+from stock_util import read_tickers_from_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVALS = ["1d", "1h", "5m"]
+DEFAULT_WORKERS = 4
+# Tickers per batched provider call
+DEFAULT_BATCH_SIZE = 20
+
+
+class WarmResult(NamedTuple):
+    ticker: str
+    interval: str
+    bars: int
+    seconds: float # Store update plus this ticker's share of its batch download
+    error: Optional[str] = None
+
+
+def _prefetched(provider: MarketDataProvider, batch: Dict[str, pd.DataFrame], batch_start: str) -> Callable[..., pd.DataFrame]:
+    """fetch() for load_history that serves the batch result and falls back to a single download."""
+    def fetch(ticker, start, end, interval="1d"):
+        if start == batch_start and ticker in batch:
+            return batch.pop(ticker)
+        # Not in the batch, or a full reload after a history rewrite
+        return provider.history(ticker, start=start, end=end, interval=interval)
+    return fetch
+
+
+def _warm_batch(provider: MarketDataProvider, tickers: List[str], interval: str, start: str, today_str: str,
+                cache_dir: Path) -> List[WarmResult]:
+    batch, batch_share = {}, 0.0
+    if len(tickers) > 1:
+        t0 = time.perf_counter()
+        try:
+            batch = provider.history_batch(tickers, start=start, end=today_str, interval=interval)
+        except Exception as e:
+            logger.warning(f"Batch download of {len(tickers)} {interval} series failed, fetching singly: {e}")
+        batch_share = (time.perf_counter() - t0) / len(tickers)
+    fetch = _prefetched(provider, batch, start)
+
+    results = []
+    for ticker in tickers:
+        t0 = time.perf_counter()
+        try:
+            df = load_history(ticker, interval, today_str, cache_dir, fetch=fetch)
+            error = None if not df.empty else "no data"
+            bars = len(df)
+        except Exception as e:
+            error, bars = str(e), 0
+        results.append(WarmResult(ticker, interval, bars, time.perf_counter() - t0 + batch_share, error))
+    return results
+
+
+def warm_cache(tickers: List[str], intervals: List[str] = DEFAULT_INTERVALS, cache_dir: Path = Path("cache"),
+               provider: Optional[MarketDataProvider] = None, workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE,
+               today_str: Optional[str] = None) -> List[WarmResult]:
+    """
+    Refreshes the cached history of every (ticker, interval) pair.
+
+    Series that need bars from the same start date are downloaded
+    together in batches of batch_size (one history_batch call each)
+    and the batches run on a pool of workers threads.
+    Series that are already current are skipped without a download.
+
+    Args:
+        tickers (List[str]): Stock symbols.
+        intervals (List[str]): Bar intervals to cache (1m is never cached).
+        cache_dir (Path): Store directory.
+        provider (MarketDataProvider): Data source (default: the configured provider).
+        workers (int): Concurrent batches.
+        batch_size (int): Tickers per batched provider call.
+        today_str (str): Session date to refresh to (default today, weekends snap to Friday).
+
+    Returns:
+        List[WarmResult]: One result per (ticker, interval), in completion order.
+    """
+    provider = provider or get_provider()
+    today_str = today_str or session_date()
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    groups = defaultdict(list)
+    for interval in intervals:
+        if interval == '1m':
+            logger.warning("Skipping 1m: minute bars are never cached")
+            continue
+        for ticker in tickers:
+            start = refresh_start(ticker, interval, today_str, cache_dir)
+            if start is None:
+                results.append(WarmResult(ticker, interval, 0, 0.0))
+            else:
+                groups[(interval, start)].append(ticker)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm") as executor:
+        futures = [executor.submit(_warm_batch, provider, group[i:i + batch_size], interval, start,
+                                   today_str, cache_dir)
+                   for (interval, start), group in groups.items()
+                   for i in range(0, len(group), batch_size)]
+        for future in as_completed(futures):
+            for result in future.result():
+                if result.error:
+                    logger.error(f"{result.ticker} {result.interval}: {result.error}")
+                else:
+                    logger.info(f"{result.ticker} {result.interval}: {result.bars} bars in {result.seconds:.2f}s")
+                results.append(result)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Warm the local bar cache for a watchlist.")
+    parser.add_argument("tickers", help="Text file with one ticker per line")
+    parser.add_argument("--intervals", default=",".join(DEFAULT_INTERVALS),
+                        help="Comma-separated bar intervals (default %(default)s)")
+    parser.add_argument("--cache-dir", default="cache", help="Store directory (default %(default)s)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Concurrent batches")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Tickers per provider call")
+    parser.add_argument("--report", help="Write the per-ticker results to this JSON file")
+    args = parser.parse_args(argv)
+
+    tickers = read_tickers_from_file(args.tickers)
+    if not tickers:
+        return 2
+    intervals = [iv.strip() for iv in args.intervals.split(",") if iv.strip()]
+
+    today_str = session_date()
+    t0 = time.perf_counter()
+    results = warm_cache(tickers, intervals, Path(args.cache_dir), workers=args.workers,
+                         batch_size=args.batch_size, today_str=today_str)
+    elapsed = time.perf_counter() - t0
+
+    failed = [r for r in results if r.error]
+    logger.info(f"Warmed {len(results) - len(failed)}/{len(results)} series in {elapsed:.1f}s, {len(failed)} failed")
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'session': today_str, 'seconds': elapsed,
+                       'results': [r._asdict() for r in results]}, f, indent=1)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())